@@ -0,0 +1,109 @@
+# Cache memoization untuk hasil agregasi per kombinasi filter.
+# Kunci cache = (nama fungsi agregasi, tuple filter yang dinormalisasi, argumen tambahan).
+# Cache dibatasi jumlah entri dan total memori (LRU); entri paling lama tidak dipakai dibuang
+# lebih dulu. Statistik hit/miss ditampilkan di panel admin dashboard.
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024 # 64 MB
+DEFAULT_MAX_ENTRIES = 512
+
+
+def normalize_filter_key(start_date, end_date, years, seasons, weathers, user_type, hours=None):
+    # Urutan pilihan multiselect tidak memengaruhi hasil, jadi diurutkan agar kuncinya stabil
+    return (
+        None if start_date is None else pd.Timestamp(start_date).isoformat(),
+        None if end_date is None else pd.Timestamp(end_date).isoformat(),
+        tuple(sorted(str(y) for y in years or [])),
+        tuple(sorted(seasons or [])),
+        tuple(sorted(weathers or [])),
+        user_type,
+        tuple(sorted(int(h) for h in hours or [])),
+    )
+
+
+def estimate_nbytes(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(v) for v in value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class AggregationCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def __contains__(self, key):
+        # Cek keberadaan kunci tanpa mengubah urutan LRU maupun statistik hit/miss
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, value):
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return # Terlalu besar untuk di-cache, tetap dikembalikan ke pemanggil
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def warm(self, items):
+        # Mengisi cache dari daftar (kunci, fungsi hitung) tanpa mengubah statistik hit/miss;
+        # dipakai untuk pre-compute di thread latar belakang
+        for key, compute in items:
+            if key not in self:
+                self.put(key, compute())
+
+    def items(self):
+        # Salinan (kunci, nilai) seluruh entri tanpa mengubah urutan LRU, mis. untuk snapshot warm-start
+        with self._lock:
+            return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size_mb': self.current_bytes / (1024 * 1024),
+                'max_size_mb': self.max_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
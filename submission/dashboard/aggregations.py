@@ -0,0 +1,115 @@
+# Fungsi agregasi di balik setiap chart dashboard.
+# Semua fungsi menerima cube OLAP yang sudah difilter dan mengembalikan DataFrame/Series baru,
+# sehingga hasilnya aman di-memoize (lihat agg_cache.py) dan tidak boleh dimodifikasi in-place.
+import pandas as pd
+
+from constants import SEASON_ORDER, TIME_OF_DAY_ORDER, WEATHER_ORDER
+from olap_cube import ROW_COUNT_COLUMN, rollup_mean, rollup_means, rollup_pivot, rollup_sums, sum_column
+
+# Nama kolom hasil rollup rata-rata per tipe pengguna
+USER_TYPE_AVG_COLUMNS = {'casual': 'avg_casual', 'registered': 'avg_registered'}
+USER_TYPE_LABELS = {'avg_casual': 'Casual', 'avg_registered': 'Registered'}
+WORKINGDAY_LABELS = {0: 'Akhir Pekan/Libur', 1: 'Hari Kerja'}
+# Pilihan jenis pengguna -> kolom jumlah penyewaan yang ditampilkan
+USER_TYPE_COUNT_COLUMNS = {'Semua': 'cnt', 'Casual': 'casual', 'Registered': 'registered'}
+
+
+# --- Tab 1 & 2: Pola waktu, musim, dan cuaca ---
+def mean_by(cube, by, count_column):
+    return rollup_mean(cube, by, count_column, name='cnt_display')
+
+
+def hourly_pattern(cube, count_column):
+    return mean_by(cube, 'hr', count_column).reset_index()
+
+
+def daily_totals(cube, count_column):
+    # Total penyewaan per tanggal (tren harian; rentang tanggal bisa dipilih langsung dari chart)
+    totals = rollup_sums(cube, 'dteday', [count_column])[sum_column(count_column)]
+    return totals.rename('cnt_display').reset_index()
+
+
+def hour_heatmap(cube, column, count_column):
+    return rollup_pivot(cube, 'hr', column, count_column)
+
+
+def weather_params(cube):
+    return rollup_means(cube, 'weather_condition', ['temp_actual', 'hum_actual']).rename(
+        columns={'temp_actual': 'avg_temp_actual', 'hum_actual': 'avg_hum_actual'}
+    ).reindex(WEATHER_ORDER).dropna().reset_index()
+
+
+# --- Tab 3: Casual vs Registered ---
+def user_type_means(cube, by):
+    return rollup_means(cube, by, ['casual', 'registered']).rename(columns=USER_TYPE_AVG_COLUMNS)
+
+
+def melt_user_types(df, id_column):
+    melted = df.melt(id_vars=id_column, value_vars=['avg_casual', 'avg_registered'], var_name='tipe_pengguna', value_name='rata_penyewaan')
+    melted['tipe_pengguna'] = melted['tipe_pengguna'].map(USER_TYPE_LABELS)
+    return melted
+
+
+def user_type_totals(cube):
+    # Total casual & registered pada periode terfilter; dari cube per jam agar filter jam ikut berlaku
+    sums = rollup_sums(cube, 'workingday', ['casual', 'registered'])
+    totals = pd.Series({user_type: sums[sum_column(user_type)].sum() for user_type in ['casual', 'registered']}, name='total_penyewaan')
+    return totals.rename_axis('tipe_pengguna')
+
+
+def user_type_by_workingday(cube):
+    workday_agg_df = user_type_means(cube, 'workingday').reset_index()
+    workday_agg_df['workingday_label'] = workday_agg_df['workingday'].map(WORKINGDAY_LABELS)
+    return melt_user_types(workday_agg_df, 'workingday_label')
+
+
+def user_type_by_season(cube):
+    user_type_season_df = user_type_means(cube, 'season_name').reindex(SEASON_ORDER).dropna().reset_index()
+    return melt_user_types(user_type_season_df, 'season_name')
+
+
+# --- Tab 4: Segmen waktu harian ---
+# Kolom 'time_of_day' sudah tersedia di cube (dihitung saat load lewat time_segments.py)
+def time_of_day_summary(cube, count_column):
+    measures = list(dict.fromkeys([count_column, 'casual', 'registered', 'temp_actual']))
+    segment_means = rollup_means(cube, 'time_of_day', measures)
+    summary = pd.DataFrame({
+        'avg_total_users': segment_means[count_column], 'avg_casual_users': segment_means['casual'],
+        'avg_registered_users': segment_means['registered'], 'avg_temp_actual': segment_means['temp_actual']
+    }).reindex(TIME_OF_DAY_ORDER).dropna(how='all')
+    summary.index.name = 'time_of_day'
+    return summary
+
+
+def weather_shares_by_time_of_day(cube):
+    # Persentase jam per kondisi cuaca dalam tiap segmen waktu (jumlah jam ternormalisasi per segmen)
+    hours = rollup_sums(cube, ['time_of_day', 'weather_condition'], [])[ROW_COUNT_COLUMN].unstack('weather_condition', fill_value=0)
+    shares = hours.div(hours.sum(axis=1), axis=0) * 100
+    return shares.reindex(
+        index=[t for t in TIME_OF_DAY_ORDER if t in shares.index],
+        columns=[w for w in WEATHER_ORDER if w in shares.columns]
+    )
+
+
+# --- Registri agregasi ---
+def report_aggregates(count_column):
+    # Agregasi yang sama dengan yang ditampilkan di dashboard: nama -> (fungsi, argumen tambahan)
+    return {
+        'hourly_pattern': (hourly_pattern, (count_column,)),
+        'daily_trend': (daily_totals, (count_column,)),
+        'season_pattern': (mean_by, ('season_name', count_column)),
+        'weekday_pattern': (mean_by, ('weekday_name', count_column)),
+        'month_pattern': (mean_by, ('month_name', count_column)),
+        'hour_weekday_heatmap': (hour_heatmap, ('weekday_name', count_column)),
+        'hour_month_heatmap': (hour_heatmap, ('month_name', count_column)),
+        'hour_season_heatmap': (hour_heatmap, ('season_name', count_column)),
+        'weather_impact': (mean_by, ('weather_condition', count_column)),
+        'weather_params': (weather_params, ()),
+        'hour_weather_heatmap': (hour_heatmap, ('weather_condition', count_column)),
+        'user_type_totals': (user_type_totals, ()),
+        'user_type_hourly': (user_type_means, ('hr',)),
+        'user_type_workingday': (user_type_by_workingday, ()),
+        'user_type_season': (user_type_by_season, ()),
+        'time_of_day_summary': (time_of_day_summary, (count_column,)),
+        'weather_shares_by_time_of_day': (weather_shares_by_time_of_day, ()),
+    }
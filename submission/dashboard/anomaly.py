@@ -0,0 +1,251 @@
+# Deteksi anomali streaming pada penyewaan per jam.
+# Setiap baris per jam dibandingkan dengan baseline profil (kota, jam, hari, kondisi cuaca) -- dimensi
+# yang sama dengan heatmap dashboard. Baseline berupa rata-rata & varians bergerak eksponensial (EWMA)
+# dari log1p(cnt) dan diperbarui O(1) per baris, sehingga baris baru diberi skor tanpa menghitung ulang
+# seluruh histori. Jam dengan |z| >= Z_THRESHOLD dan selisih minimal MIN_COUNT_DEVIATION penyewaan
+# (agar jam sepi seperti 7 vs 1 penyewaan dini hari tidak ditandai) dicatat sebagai kejadian
+# (lonjakan/penurunan) dan ditambahkan ke anomaly/events.csv; nilai yang ikut ke baseline dipotong di
+# batas ambang agar satu kejadian (mis. stasiun mati) tidak menggeser profil normal. State baseline disimpan ke
+# anomaly/baselines.pkl dan hanya baris dengan instant lebih besar dari baris terakhir yang sudah
+# diproses (per kota) yang diproses pada sinkronisasi berikutnya.
+#
+# Proses baris baru / proses ulang seluruh histori (dari direktori `submission`):
+#     python dashboard/anomaly.py
+#     python dashboard/anomaly.py --rebuild
+import argparse
+import math
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_store import SCRIPT_DIR
+from partitions import CITY_COLUMN, DEFAULT_CITY, PartitionedDataset, has_partitions
+
+ANOMALY_DIR = os.path.join(SCRIPT_DIR, 'anomaly')
+STATE_PATH = os.path.join(ANOMALY_DIR, 'baselines.pkl')
+EVENT_LOG_PATH = os.path.join(ANOMALY_DIR, 'events.csv')
+# Naikkan jika susunan state atau parameter skor berubah, agar state lama diproses ulang
+STATE_VERSION = 1
+BASELINE_COLUMNS = ['hr', 'weekday_name', 'weather_condition']
+COUNT_COLUMN = 'cnt'
+
+# Bobot observasi terbaru; untuk satu (jam, hari) ~1 observasi per minggu, jadi profil mengikuti
+# perubahan musiman dalam beberapa bulan
+EWMA_ALPHA = 0.1
+MIN_OBSERVATIONS = 8 # baseline yang lebih muda belum dipakai memberi skor
+Z_THRESHOLD = 4.0
+MIN_STD = 0.15 # batas bawah simpangan baku (skala log1p) untuk profil yang sangat stabil
+MIN_COUNT_DEVIATION = 25
+
+EVENT_COLUMNS = [
+    'city', 'instant', 'timestamp', 'dteday', 'hr', 'weekday_name', 'weather_condition',
+    'cnt', 'expected', 'z_score', 'direction', 'detected_at',
+]
+DIRECTION_LABELS = {True: 'lonjakan', False: 'penurunan'}
+
+
+def record_cities(hour_data):
+    # Baris tanpa kolom kota (hour_data_clean.csv) dianggap milik kota default
+    if CITY_COLUMN not in hour_data.columns:
+        return [(DEFAULT_CITY, hour_data)]
+    return [(str(city), rows) for city, rows in hour_data.groupby(CITY_COLUMN, observed=True, sort=True)]
+
+
+def read_events(path=EVENT_LOG_PATH):
+    # Kejadian ditulis ke log sebelum state disimpan; jika proses berhenti di antaranya, baris yang sama
+    # diproses & ditulis ulang pada sinkronisasi berikutnya, jadi duplikat (kota, instant) dibuang di sini
+    try:
+        events = pd.read_csv(path, parse_dates=['timestamp', 'dteday', 'detected_at'])
+    except (OSError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    return events.drop_duplicates(['city', 'instant'], keep='last', ignore_index=True)
+
+
+class AnomalyDetector:
+    def __init__(self, path=STATE_PATH, event_log_path=EVENT_LOG_PATH):
+        self.path = path
+        self.event_log_path = event_log_path
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.baselines = {} # (kota, jam, hari, cuaca) -> [jumlah observasi, rata-rata, varians]
+        self.processed_until = {} # kota -> instant terakhir yang sudah diproses
+        self.processed_until_date = None
+        self.records_seen = 0
+        self.events_flagged = 0
+        self.updated_at = None
+        self.last_update = None # 'full' / 'incremental' / 'loaded'
+
+    @property
+    def is_ready(self):
+        return bool(self.processed_until)
+
+    def load(self):
+        # State dibuat oleh dashboard/CLI di server sendiri (bukan input pengguna), jadi aman di-unpickle
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+        if state.get('state_version') != STATE_VERSION:
+            return False
+        self.baselines, self.processed_until = state['baselines'], state['processed_until']
+        self.processed_until_date, self.records_seen = state['processed_until_date'], state['records_seen']
+        self.events_flagged, self.updated_at = state['events_flagged'], state['updated_at']
+        self.last_update = 'loaded'
+        return True
+
+    def save(self):
+        # Ditulis ke file sementara lalu di-rename, agar proses lain tidak memuat file setengah jadi
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'state_version': STATE_VERSION, 'baselines': self.baselines, 'processed_until': self.processed_until,
+                'processed_until_date': self.processed_until_date, 'records_seen': self.records_seen,
+                'events_flagged': self.events_flagged, 'updated_at': self.updated_at,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def observe(self, key, value):
+        # Skor satu observasi (skala log1p) terhadap baseline-nya lalu perbarui baseline, O(1).
+        # Mengembalikan (z, rata-rata sebelum diperbarui); z None selama baseline belum cukup observasi.
+        state = self.baselines.get(key)
+        if state is None:
+            self.baselines[key] = [1, value, 0.0]
+            return None, value
+        n, mean, var = state
+        z = None
+        if n >= MIN_OBSERVATIONS:
+            std = max(math.sqrt(var), MIN_STD)
+            z = (value - mean) / std
+            if abs(z) >= Z_THRESHOLD:
+                value = mean + math.copysign(Z_THRESHOLD * std, z)
+        # Observasi awal memakai rata-rata kumulatif (alpha = 1/n) sampai bobot EWMA lebih besar
+        alpha = max(EWMA_ALPHA, 1.0 / (n + 1))
+        diff = value - mean
+        increment = alpha * diff
+        state[0], state[1], state[2] = n + 1, mean + increment, (1 - alpha) * (var + diff * increment)
+        return z, mean
+
+    def process(self, rows, city):
+        # Baris harus urut menurut instant (urutan stream); mengembalikan kejadian yang ditandai
+        counts = rows[COUNT_COLUMN].to_numpy(dtype=float)
+        keys = zip(*(rows[col].astype(object).tolist() for col in BASELINE_COLUMNS))
+        flagged = []
+        for i, (key, count, value) in enumerate(zip(keys, counts.tolist(), np.log1p(counts).tolist())):
+            z, expected = self.observe((city,) + key, value)
+            if z is not None and abs(z) >= Z_THRESHOLD and abs(count - math.expm1(expected)) >= MIN_COUNT_DEVIATION:
+                flagged.append((i, z, expected))
+
+        self.processed_until[city] = int(rows['instant'].iloc[-1])
+        last_date = rows['dteday'].iloc[-1]
+        self.processed_until_date = last_date if self.processed_until_date is None else max(self.processed_until_date, last_date)
+        self.records_seen += len(rows)
+        self.events_flagged += len(flagged)
+        return self._events(rows, city, flagged)
+
+    def _events(self, rows, city, flagged):
+        positions = [i for i, _, _ in flagged]
+        events = rows.iloc[positions]
+        z_scores = np.array([z for _, z, _ in flagged])
+        return pd.DataFrame({
+            'city': city,
+            'instant': events['instant'].to_numpy(),
+            'timestamp': (events['dteday'] + pd.to_timedelta(events['hr'].astype(int), unit='h')).to_numpy(),
+            'dteday': events['dteday'].to_numpy(),
+            'hr': events['hr'].to_numpy(),
+            'weekday_name': events['weekday_name'].astype(object).to_numpy(),
+            'weather_condition': events['weather_condition'].astype(object).to_numpy(),
+            'cnt': events[COUNT_COLUMN].to_numpy(),
+            'expected': np.expm1([mean for _, _, mean in flagged]).round().astype(int),
+            'z_score': z_scores.round(2),
+            'direction': [DIRECTION_LABELS[z > 0] for z in z_scores],
+            'detected_at': datetime.now(),
+        }, columns=EVENT_COLUMNS)
+
+    def append_events(self, events, rewrite=False):
+        os.makedirs(os.path.dirname(self.event_log_path), exist_ok=True)
+        if rewrite or not os.path.exists(self.event_log_path):
+            events.to_csv(self.event_log_path, index=False)
+        elif not events.empty:
+            events.to_csv(self.event_log_path, mode='a', header=False, index=False)
+
+    def sync(self, hour_data):
+        # Memastikan state mengikuti data: dimuat dari file jika ada, diproses ulang dari awal jika belum
+        # ada atau data ditulis ulang (instant terakhir mundur), dan hanya baris baru yang diproses jika
+        # data bertambah. Mengembalikan jenis pembaruan ('full'/'incremental'/'loaded') atau None.
+        with self._lock:
+            loaded = False
+            if not self.is_ready:
+                loaded = self.load()
+            streams = record_cities(hour_data)
+            rewritten = any(
+                city in self.processed_until and int(rows['instant'].iloc[-1]) < self.processed_until[city]
+                for city, rows in streams if not rows.empty
+            )
+            if not self.is_ready or rewritten:
+                self.reset()
+                events = [self.process(rows, city) for city, rows in streams if not rows.empty]
+                self.append_events(pd.concat(events, ignore_index=True) if events else pd.DataFrame(columns=EVENT_COLUMNS), rewrite=True)
+                self._mark_updated('full')
+                return 'full'
+            events = []
+            for city, rows in streams:
+                # Baris ditambahkan di akhir dengan instant naik, jadi baris baru dicari dengan pencarian biner
+                start = np.searchsorted(rows['instant'].to_numpy(), self.processed_until.get(city, -1), side='right')
+                if start < len(rows):
+                    events.append(self.process(rows.iloc[start:], city))
+            if events:
+                self.append_events(pd.concat(events, ignore_index=True))
+                self._mark_updated('incremental')
+                return 'incremental'
+            return 'loaded' if loaded else None
+
+    def _mark_updated(self, kind):
+        self.updated_at = datetime.now()
+        self.last_update = kind
+        self.save()
+
+    def events(self):
+        return read_events(self.event_log_path)
+
+
+def main():
+    from data_version import LiveDataset
+
+    parser = argparse.ArgumentParser(description="Deteksi anomali streaming pada penyewaan per jam.")
+    parser.add_argument('--rebuild', action='store_true', help="Hapus state baseline & log kejadian lalu proses ulang seluruh histori.")
+    args = parser.parse_args()
+
+    # Sama seperti dashboard: semua kota jika dataset terpartisi sudah dibangun
+    hour_data = PartitionedDataset().snapshot().hour_data if has_partitions() else LiveDataset().snapshot.hour_data
+    detector = AnomalyDetector()
+    if args.rebuild:
+        for path in (detector.path, detector.event_log_path):
+            if os.path.exists(path):
+                os.remove(path)
+    records_before, events_before = (detector.records_seen, detector.events_flagged) if detector.load() else (0, 0)
+    start = time.perf_counter()
+    update = detector.sync(hour_data)
+    elapsed = time.perf_counter() - start
+    if update in ('full', 'incremental'):
+        records, events = detector.records_seen, detector.events_flagged
+        if update == 'incremental':
+            records, events = records - records_before, events - events_before
+        print(
+            f"{records} baris diproses ({update}) dalam {elapsed:.2f} detik ({records / max(elapsed, 1e-9):,.0f} baris/detik), "
+            f"{events} kejadian baru -> {detector.event_log_path}"
+        )
+    else:
+        print(f"Tidak ada baris baru; data s.d. {detector.processed_until_date:%d %b %Y} sudah diproses.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# Mode batch (tanpa Streamlit) untuk menghitung seluruh agregasi dashboard.
+# Setiap preset filter (rentang tanggal, tahun, musim, cuaca, jenis pengguna) dijalankan pada cube
+# OLAP yang sama secara paralel di process pool, lalu hasilnya ditulis ke
+# <output>/<preset>/<agregasi>.parquet|json beserta manifest.json. Cocok dijalankan terjadwal
+# (mis. cron malam hari) untuk banyak preset sekaligus tanpa membuka sesi browser.
+#
+# Penggunaan (dari direktori `submission`):
+#     python dashboard/batch_report.py --presets presets.json --output reports --format parquet
+#
+# Format presets.json berupa daftar objek, mis.:
+#     [{"name": "casual_musim_panas_2012", "start_date": "2012-06-01", "end_date": "2012-08-31",
+#       "year": [2012], "season_name": ["Summer"], "weather_condition": [], "hr": [7, 8, 9],
+#       "user_type": "Casual"}]
+# Semua kunci selain "name" opsional; filter yang kosong atau tidak diisi berarti tanpa filter.
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from aggregations import USER_TYPE_COUNT_COLUMNS, report_aggregates
+from data_store import load_tables, read_clean_csv
+from filter_engine import FILTER_COLUMNS, FilterIndex
+from olap_cube import build_cube
+from time_segments import add_time_of_day
+
+DEFAULT_PRESETS = [{'name': 'semua'}]
+OUTPUT_FORMATS = ['parquet', 'json']
+
+
+# --- Preset filter ---
+def load_presets(path):
+    with open(path) as f:
+        presets = json.load(f)
+    names = [preset['name'] for preset in presets]
+    if len(set(names)) != len(names):
+        raise ValueError("Nama preset harus unik.")
+    for preset in presets:
+        user_type = preset.get('user_type', 'Semua')
+        if user_type not in USER_TYPE_COUNT_COLUMNS:
+            raise ValueError(f"Jenis pengguna '{user_type}' pada preset '{preset['name']}' tidak dikenal.")
+    return presets
+
+
+def preset_selection(preset):
+    # Argumen untuk FilterIndex.select/apply (sama seperti filter sidebar)
+    selection = {col: preset.get(col) or [] for col in FILTER_COLUMNS}
+    # Tahun & jam di data berupa integer, tetapi boleh ditulis sebagai string di file preset
+    selection['year'] = [int(year) for year in selection['year']]
+    selection['hr'] = [int(hour) for hour in selection['hr']]
+    return dict(start_date=preset.get('start_date'), end_date=preset.get('end_date'), **selection)
+
+
+def preset_slug(name):
+    return re.sub(r'[^0-9A-Za-z_-]+', '_', name).strip('_') or 'preset'
+
+
+# --- Perhitungan & penulisan ---
+def compute_report(cube, preset, filter_index=None):
+    # Menghitung semua agregasi untuk satu preset; mengembalikan dict kosong jika tidak ada data
+    if filter_index is None:
+        filter_index = FilterIndex(cube)
+    filtered = filter_index.apply(cube, **preset_selection(preset))
+    if filtered.empty:
+        return {}
+    count_column = USER_TYPE_COUNT_COLUMNS[preset.get('user_type', 'Semua')]
+    return {name: func(filtered, *args) for name, (func, args) in report_aggregates(count_column).items()}
+
+
+def to_table(result):
+    # Index dan nama kolom diratakan (mis. kolom pivot heatmap) agar bisa ditulis ke Parquet/JSON
+    if isinstance(result, pd.Series):
+        result = result.to_frame()
+    result = result.copy()
+    result.columns = [str(col) for col in result.columns]
+    if not isinstance(result.index, pd.RangeIndex):
+        result = result.reset_index()
+    return result
+
+
+def write_table(table, path, output_format):
+    if output_format == 'parquet':
+        table.to_parquet(path, index=False)
+    else:
+        table.to_json(path, orient='records', date_format='iso', indent=2)
+
+
+# --- Worker process pool ---
+# Cube dan indeks filter dikirim sekali per worker (lewat initializer), bukan sekali per preset
+_worker_cube = None
+_worker_index = None
+
+
+def _init_worker(cube):
+    global _worker_cube, _worker_index
+    _worker_cube = cube
+    _worker_index = FilterIndex(cube)
+
+
+def run_preset(preset, output_dir, output_format):
+    report = compute_report(_worker_cube, preset, _worker_index)
+    preset_dir = os.path.join(output_dir, preset_slug(preset['name']))
+    os.makedirs(preset_dir, exist_ok=True)
+
+    files = {}
+    for name, result in report.items():
+        path = os.path.join(preset_dir, f'{name}.{output_format}')
+        write_table(to_table(result), path, output_format)
+        files[name] = os.path.relpath(path, output_dir)
+    return {'name': preset['name'], 'preset': preset, 'empty': not report, 'files': files}
+
+
+def run_batch(cube, presets, output_dir, output_format='parquet', workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    if workers == 1:
+        _init_worker(cube)
+        results = [run_preset(preset, output_dir, output_format) for preset in presets]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cube,)) as executor:
+            futures = [executor.submit(run_preset, preset, output_dir, output_format) for preset in presets]
+            results = [future.result() for future in futures]
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'format': output_format,
+        'presets': results,
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hitung semua agregasi dashboard untuk daftar preset filter.")
+    parser.add_argument('--presets', help="File JSON berisi daftar preset filter (default: satu preset tanpa filter).")
+    parser.add_argument('--output', default='reports', help="Direktori output laporan.")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='parquet')
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses worker (default: jumlah CPU).")
+    parser.add_argument('--hour-csv', help="File *_clean.csv per jam lain (default: data store dashboard).")
+    args = parser.parse_args()
+
+    presets = load_presets(args.presets) if args.presets else DEFAULT_PRESETS
+    if args.hour_csv:
+        hour_data = read_clean_csv(args.hour_csv)
+        add_time_of_day(hour_data)
+    else:
+        hour_data, _ = load_tables()
+
+    manifest = run_batch(build_cube(hour_data), presets, args.output, args.format, args.workers)
+    for result in manifest['presets']:
+        status = "tidak ada data" if result['empty'] else f"{len(result['files'])} agregasi"
+        print(f"[{result['name']}] {status}")
+    print(f"Manifest ditulis ke {os.path.join(args.output, 'manifest.json')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+# Benchmark jalur panas dashboard: load data, filter sidebar, agregasi tiap chart, dan render figure
+# di setiap backend chart (Plotly: pembentukan figure + to_json; Matplotlib: draw + savefig PNG).
+# Tabel per jam & per hari disintesis dari *_clean.csv dengan skema yang sama pada kelipatan ukuran
+# tertentu (default 10x, 100x, 1000x), lalu setiap tahap diukur waktunya (beberapa ulangan) dan
+# puncak alokasi memorinya (tracemalloc, pada satu run terpisah agar tidak mengganggu waktu).
+# Hasil disimpan sebagai JSON sehingga dua run dapat dibandingkan untuk mendeteksi regresi.
+#
+# Penggunaan (dari direktori `submission`):
+#     python dashboard/benchmark.py --scales 10 100 --repeat 3
+#     python dashboard/benchmark.py --scales 10 --compare benchmark_results/baseline.json
+#     python dashboard/benchmark.py --scales 10 --chart-backends plotly
+# Catatan: skala 1000x (~17 juta baris per jam) membutuhkan beberapa GB RAM dan ruang disk sementara.
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+
+from aggregations import USER_TYPE_COUNT_COLUMNS, report_aggregates
+from batch_report import preset_selection
+from chart_backend import CHART_BACKENDS, chart_function
+from constants import MONTH_ORDER, SEASON_ORDER, WEATHER_ORDER, WEEKDAY_ORDER
+from data_store import DAY_CSV_PATH, HOUR_CSV_PATH, load_tables, optimize_dtypes, read_clean_csv
+from figure_cache import figure_to_png
+from filter_engine import FilterIndex
+from ingest import BASE_YEAR, MONTH_MAP, WEEKDAY_MAP
+from olap_cube import build_cube
+
+DEFAULT_SCALES = [10, 100, 1000]
+DEFAULT_REPEAT = 3
+DEFAULT_OUTPUT_DIR = 'benchmark_results'
+DEFAULT_THRESHOLD = 1.25 # rasio median waktu/memori yang dianggap regresi
+MAX_SYNTHETIC_YEAR = 2200 # batas aman datetime64[ns] (maks. 2262)
+
+
+# --- Sintesis data ---
+def synthesize_table(base, scale, seed=0):
+    # Salinan ke-k digeser per periode sepanjang rentang data asli (kolom kalender dihitung ulang).
+    # Jika periode sudah mencapai batas datetime64, salinan berikutnya menempati tanggal yang sama
+    # (seperti data beberapa stasiun pada jam yang sama). Counter diberi noise Poisson.
+    rng = np.random.default_rng(seed)
+    span_days = (base['dteday'].max() - base['dteday'].min()).days + 1
+    span_years = -(-span_days // 365)
+    max_periods = max(1, (MAX_SYNTHETIC_YEAR - base['dteday'].dt.year.max()) // span_years + 1)
+    n_periods = min(scale, max_periods)
+
+    copies = sorted(range(scale), key=lambda k: (k % n_periods, k))
+    periods = np.repeat(np.array(copies) % n_periods, len(base))
+    synthetic = base.iloc[np.tile(np.arange(len(base)), scale)].reset_index(drop=True)
+
+    synthetic['instant'] = np.arange(1, len(synthetic) + 1)
+    synthetic['dteday'] = synthetic['dteday'] + pd.to_timedelta(periods * span_days, unit='D')
+    dates = synthetic['dteday'].dt
+    synthetic['yr'] = dates.year - BASE_YEAR
+    synthetic['year'] = dates.year
+    synthetic['mnth'] = dates.month
+    synthetic['month_name'] = synthetic['mnth'].map(MONTH_MAP)
+    synthetic['weekday'] = (dates.dayofweek + 1) % 7 # dataset asli: 0 = Minggu
+    synthetic['weekday_name'] = synthetic['weekday'].map(WEEKDAY_MAP)
+
+    synthetic['casual'] = rng.poisson(synthetic['casual'].to_numpy())
+    synthetic['registered'] = rng.poisson(synthetic['registered'].to_numpy())
+    synthetic['cnt'] = synthetic['casual'] + synthetic['registered']
+    synthetic['total_users'] = synthetic['cnt']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        synthetic['casual_proportion'] = synthetic['casual'] / synthetic['total_users'] * 100
+        synthetic['registered_proportion'] = synthetic['registered'] / synthetic['total_users'] * 100
+    return optimize_dtypes(synthetic[base.columns])
+
+
+def write_synthetic_dataset(hour_base, day_base, scale, workdir):
+    paths = {
+        'hour_csv': os.path.join(workdir, 'hour_data_clean.csv'),
+        'day_csv': os.path.join(workdir, 'day_data_clean.csv'),
+        'hour_store': os.path.join(workdir, 'hour_data.parquet'),
+        'day_store': os.path.join(workdir, 'day_data.parquet'),
+    }
+    for table, base in [('hour', hour_base), ('day', day_base)]:
+        synthetic = synthesize_table(base, scale)
+        synthetic.to_csv(paths[f'{table}_csv'], index=False, date_format='%Y-%m-%d')
+        synthetic.to_parquet(paths[f'{table}_store'], index=False) # ditulis setelah CSV agar dianggap fresh
+    return paths
+
+
+# --- Pengukuran ---
+def measure(func, repeat, track_memory=True):
+    # Waktu diukur pada `repeat` run; puncak memori diukur pada satu run tambahan dengan tracemalloc
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+        del result
+    stage = {'seconds': seconds, 'min': min(seconds), 'median': statistics.median(seconds)}
+    if track_memory:
+        tracemalloc.start()
+        try:
+            func()
+            stage['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return stage
+
+
+def benchmark_presets(hour_data):
+    # Tiga pola filter: tanpa filter, tahun+musim, dan seperempat rentang tanggal+cuaca cerah
+    dates = hour_data['dteday']
+    quarter_end = dates.min() + (dates.max() - dates.min()) / 4
+    return [
+        {'name': 'semua'},
+        {'name': 'tahun_musim', 'year': [int(dates.dt.year.min())], 'season_name': ['Summer', 'Fall']},
+        {'name': 'rentang_cuaca', 'start_date': str(dates.min().date()), 'end_date': str(quarter_end.date()),
+         'weather_condition': [WEATHER_ORDER[0]]},
+    ]
+
+
+def chart_inputs(report, user_type):
+    # Argumen tiap chart disiapkan seperti di dashboard.py (reindex urutan kategori, reset index); mencakup
+    # semua chart tampilan yang dibentuk dari agregasi filter. Chart prakiraan & anomali tidak ikut karena
+    # bergantung pada model dan log kejadian, bukan pada agregasi cube.
+    def ordered_columns(df, order):
+        return df.reindex(columns=[c for c in order if c in df.columns])
+
+    return {
+        'hourly_pattern': (report['hourly_pattern'], user_type),
+        'season_pattern': (report['season_pattern'].reindex(SEASON_ORDER).dropna().reset_index(), user_type),
+        'weekday_pattern': (report['weekday_pattern'].reindex(WEEKDAY_ORDER).dropna().reset_index(), user_type),
+        'month_pattern': (report['month_pattern'].reindex(MONTH_ORDER).dropna().reset_index(), user_type),
+        'daily_trend': (report['daily_trend'], user_type),
+        'hour_weekday_heatmap': (ordered_columns(report['hour_weekday_heatmap'], WEEKDAY_ORDER), user_type),
+        'hour_month_heatmap': (ordered_columns(report['hour_month_heatmap'], MONTH_ORDER), user_type),
+        'hour_season_heatmap': (ordered_columns(report['hour_season_heatmap'], SEASON_ORDER), user_type),
+        'weather_impact': (report['weather_impact'].reindex(WEATHER_ORDER).dropna().reset_index(), user_type),
+        'hour_weather_heatmap': (ordered_columns(report['hour_weather_heatmap'], WEATHER_ORDER), user_type),
+        'user_proportion_pie': (report['user_type_totals'],),
+        'user_type_hourly': (report['user_type_hourly'].reset_index(),),
+        'user_type_workingday': (report['user_type_workingday'],),
+        'user_type_season': (report['user_type_season'],),
+        'user_specific_hourly': (report['hourly_pattern'], user_type),
+        'time_of_day_summary': (report['time_of_day_summary'], report['weather_shares_by_time_of_day'], user_type),
+    }
+
+
+def render_chart(backend, chart_id, args):
+    # Keluaran yang disimpan FigureCache per backend: JSON untuk Plotly, PNG untuk Matplotlib
+    fig = chart_function(backend, chart_id)(*args)
+    return fig.to_json() if backend == 'plotly' else figure_to_png(fig)
+
+
+def run_scale(hour_base, day_base, scale, repeat, track_memory, workdir, chart_backends):
+    with tempfile.TemporaryDirectory(dir=workdir) as scale_dir:
+        start = time.perf_counter()
+        paths = write_synthetic_dataset(hour_base, day_base, scale, scale_dir)
+        synth_seconds = time.perf_counter() - start
+
+        stages = {}
+        missing_store = os.path.join(scale_dir, 'missing.parquet')
+        stages['load_csv'] = measure(lambda: load_tables(missing_store, missing_store, paths['hour_csv'], paths['day_csv']), repeat, track_memory)
+        stages['load_parquet'] = measure(lambda: load_tables(paths['hour_store'], paths['day_store'], paths['hour_csv'], paths['day_csv']), repeat, track_memory)
+
+        hour_data, day_data = load_tables(paths['hour_store'], paths['day_store'], paths['hour_csv'], paths['day_csv'])
+        stages['build_cube'] = measure(lambda: build_cube(hour_data), repeat, track_memory)
+        cube = build_cube(hour_data)
+        stages['build_filter_index'] = measure(lambda: (FilterIndex(hour_data), FilterIndex(day_data), FilterIndex(cube)), repeat, track_memory)
+        indexes = [(FilterIndex(hour_data), hour_data), (FilterIndex(day_data), day_data), (FilterIndex(cube), cube)]
+
+        for preset in benchmark_presets(hour_data):
+            selection = preset_selection(preset)
+            stages[f"filter_{preset['name']}"] = measure(
+                lambda: [index.apply(df, **selection) for index, df in indexes], repeat, track_memory
+            )
+
+        # Agregasi & render diukur pada data tanpa filter (kasus terberat) untuk semua pengguna
+        user_type = 'Semua'
+        report = {}
+        for name, (func, args) in report_aggregates(USER_TYPE_COUNT_COLUMNS[user_type]).items():
+            stages[f'agg_{name}'] = measure(lambda: func(cube, *args), repeat, track_memory)
+            report[name] = func(cube, *args)
+
+        for backend in chart_backends:
+            for chart_id, args in chart_inputs(report, user_type).items():
+                stages[f'render_{backend}_{chart_id}'] = measure(lambda: render_chart(backend, chart_id, args), repeat, track_memory)
+
+    return {
+        'scale': scale,
+        'hour_rows': len(hour_data),
+        'day_rows': len(day_data),
+        'cube_rows': len(cube),
+        'synthesize_seconds': synth_seconds,
+        'stages': stages,
+    }
+
+
+# --- Perbandingan hasil ---
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    # Mengembalikan daftar (skala, tahap, metrik, nilai lama, nilai baru, rasio) yang melewati ambang
+    baseline_by_scale = {result['scale']: result['stages'] for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old_stages = baseline_by_scale.get(result['scale'], {})
+        for stage, values in result['stages'].items():
+            for metric in ['median', 'peak_mb']:
+                old, new = old_stages.get(stage, {}).get(metric), values.get(metric)
+                if old and new and new / old > threshold:
+                    regressions.append((result['scale'], stage, metric, old, new, new / old))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark load, filter, agregasi, dan render dashboard pada data sintetis.")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help="Kelipatan ukuran data asli.")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Jumlah ulangan per tahap.")
+    parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran puncak memori (tracemalloc).")
+    parser.add_argument('--no-render', action='store_true', help="Lewati pengukuran render figure.")
+    parser.add_argument('--chart-backends', nargs='+', choices=CHART_BACKENDS, default=CHART_BACKENDS, help="Backend chart yang dirender.")
+    parser.add_argument('--workdir', default=None, help="Direktori sementara untuk file sintetis.")
+    parser.add_argument('--output', default=None, help="File JSON hasil (default: benchmark_results/benchmark_<waktu>.json).")
+    parser.add_argument('--compare', default=None, help="File JSON hasil sebelumnya sebagai baseline.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    hour_base, day_base = read_clean_csv(HOUR_CSV_PATH), read_clean_csv(DAY_CSV_PATH)
+    output = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'base_rows': {'hour': len(hour_base), 'day': len(day_base)},
+        'repeat': args.repeat,
+        'results': [],
+    }
+    for scale in args.scales:
+        print(f"Skala {scale}x ({len(hour_base) * scale:,} baris per jam)...", flush=True)
+        chart_backends = [] if args.no_render else args.chart_backends
+        result = run_scale(hour_base, day_base, scale, args.repeat, not args.no_memory, args.workdir, chart_backends)
+        for stage, values in result['stages'].items():
+            peak = f" | puncak {values['peak_mb']:.1f} MB" if 'peak_mb' in values else ''
+            print(f"  {stage:<40} median {values['median'] * 1000:10.2f} ms{peak}")
+        output['results'].append(result)
+    # Puncak RSS proses (KB di Linux) sebagai pelengkap tracemalloc yang hanya melihat alokasi Python/NumPy
+    output['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    output_path = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Hasil benchmark ditulis ke {output_path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(output, json.load(f), args.threshold)
+        for scale, stage, metric, old, new, ratio in regressions:
+            print(f"REGRESI {scale}x {stage} [{metric}]: {old:.4f} -> {new:.4f} ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"Tidak ada regresi di atas {args.threshold:.2f}x dibanding {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# Pemilihan backend chart dan pemanggilan fungsi chart secara lazy.
+# Modul chart (plotly_charts.py atau charts.py) beserta library plotting-nya baru diimpor saat sebuah
+# chart benar-benar dibentuk, sehingga worker baru yang menyajikan figure dari cache/warm-start (lihat
+# warm_start.py) tidak pernah memuat Matplotlib/Seaborn maupun plotly.express. Pada backend plotly, rentang yang dipilih
+# (box select) di chart per jam dan tren harian dikembalikan ke dashboard sebagai filter jam/tanggal.
+#
+# Backend chart dipilih lewat environment variable (default plotly):
+#     DASHBOARD_CHART_BACKEND=matplotlib streamlit run dashboard/dashboard.py
+import importlib
+import os
+
+import pandas as pd
+
+CHART_BACKEND_ENV = 'DASHBOARD_CHART_BACKEND'
+CHART_BACKENDS = ['plotly', 'matplotlib']
+DEFAULT_CHART_BACKEND = 'plotly'
+# Backend -> (modul, awalan nama fungsi); fungsi chart bernama <awalan><id chart>
+CHART_MODULES = {'plotly': ('plotly_charts', 'figure_'), 'matplotlib': ('charts', 'draw_')}
+
+# Chart yang pilihannya menjadi filter: id chart -> kolom yang dipilih
+BRUSH_COLUMNS = {'hourly_pattern': 'hr', 'user_specific_hourly': 'hr', 'daily_trend': 'dteday'}
+
+
+def selected_chart_backend():
+    backend = os.environ.get(CHART_BACKEND_ENV, DEFAULT_CHART_BACKEND).strip().lower()
+    if backend not in CHART_BACKENDS:
+        raise ValueError(f"{CHART_BACKEND_ENV}='{backend}' tidak dikenal. Pilihan: {', '.join(CHART_BACKENDS)}.")
+    return backend
+
+
+def chart_function(backend, chart_id):
+    module_name, prefix = CHART_MODULES[backend]
+    return getattr(importlib.import_module(module_name), prefix + chart_id)
+
+
+def figure_from_json(payload):
+    # Figure Plotly dari JSON hasil cache (lihat FigureCache.get_or_render dengan output='json')
+    import plotly.io as pio
+
+    return pio.from_json(payload)
+
+
+def selected_range(selection, column, lower=None, upper=None):
+    # Nilai minimum & maksimum dari titik yang dipilih (box/klik), dibatasi ke [lower, upper];
+    # None jika tidak ada titik
+    points = (selection or {}).get('points') or []
+    if not points:
+        return None
+    if column == 'hr':
+        values = [int(round(point['x'])) for point in points]
+    else:
+        values = [pd.Timestamp(point['x']).date() for point in points]
+        lower = None if lower is None else pd.Timestamp(lower).date()
+        upper = None if upper is None else pd.Timestamp(upper).date()
+    low, high = min(values), max(values)
+    return (low if lower is None else max(low, lower)), (high if upper is None else min(high, upper))
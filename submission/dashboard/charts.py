@@ -0,0 +1,209 @@
+# Fungsi penggambar chart dashboard (Matplotlib/Seaborn).
+# Setiap fungsi menerima data hasil agregasi dan mengembalikan objek Figure; dashboard
+# merender Figure tersebut menjadi PNG melalui figure_cache.py lalu menutupnya.
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from constants import SEASON_ORDER, TIME_OF_DAY_ORDER, WEATHER_ORDER, WEEKDAY_ORDER
+
+
+# --- Tab 1: Pola Waktu & Musiman ---
+def draw_hourly_pattern(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.lineplot(x='hr', y='cnt_display', data=data, marker='o', linewidth=2, ax=ax, color='dodgerblue')
+    ax.set_title('Rata-rata Penyewaan Sepeda berdasarkan Jam', fontsize=15)
+    ax.set_xlabel('Jam dalam Sehari', fontsize=12)
+    ax.set_ylabel(f'Rata-rata Penyewaan ({user_type})', fontsize=12)
+    ax.set_xticks(range(0, 24))
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
+
+
+def draw_daily_trend(data, user_type):
+    fig, ax = plt.subplots(figsize=(12, 4))
+    ax.plot(data['dteday'], data['cnt_display'], color='dodgerblue', linewidth=1)
+    ax.set_title('Total Penyewaan Sepeda per Hari', fontsize=15)
+    ax.set_xlabel('Tanggal', fontsize=12)
+    ax.set_ylabel(f'Total Penyewaan ({user_type})', fontsize=12)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
+
+
+def draw_season_pattern(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.barplot(x='season_name', y='cnt_display', data=data, palette='viridis', ax=ax, order=[s for s in SEASON_ORDER if s in data['season_name'].values])
+    ax.set_title('Rata-rata Penyewaan Sepeda berdasarkan Musim', fontsize=15)
+    ax.set_xlabel('Musim', fontsize=12)
+    ax.set_ylabel(f'Rata-rata Penyewaan ({user_type})', fontsize=12)
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+    return fig
+
+
+def draw_weekday_pattern(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.barplot(x='weekday_name', y='cnt_display', data=data, palette='crest', ax=ax, order=[wd for wd in WEEKDAY_ORDER if wd in data['weekday_name'].values])
+    ax.set_title('Rata-rata Penyewaan Sepeda berdasarkan Hari dalam Seminggu', fontsize=15)
+    ax.set_xlabel('Hari', fontsize=12)
+    ax.set_ylabel(f'Rata-rata Penyewaan ({user_type})', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+    return fig
+
+
+def draw_month_pattern(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.lineplot(x='month_name', y='cnt_display', data=data, marker='o', linewidth=2, color='mediumseagreen', sort=False, ax=ax)
+    ax.set_title('Rata-rata Penyewaan Sepeda berdasarkan Bulan', fontsize=15)
+    ax.set_xlabel('Bulan', fontsize=12)
+    ax.set_ylabel(f'Rata-rata Penyewaan ({user_type})', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
+
+
+def draw_hour_weekday_heatmap(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 7))
+    sns.heatmap(data, cmap='viridis', annot=False, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({user_type})'}, ax=ax)
+    ax.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Hari dalam Seminggu', fontsize=14)
+    ax.set_xlabel('Hari dalam Seminggu', fontsize=11); ax.set_ylabel('Jam dalam Sehari', fontsize=11)
+    return fig
+
+
+def draw_hour_month_heatmap(data, user_type):
+    fig, ax = plt.subplots(figsize=(12, 7))
+    sns.heatmap(data, cmap='YlGnBu', annot=False, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({user_type})'}, ax=ax)
+    ax.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Bulan', fontsize=14)
+    ax.set_xlabel('Bulan', fontsize=11); ax.set_ylabel('Jam dalam Sehari', fontsize=11)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
+    return fig
+
+
+def draw_hour_season_heatmap(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 7))
+    sns.heatmap(data, cmap='coolwarm', annot=True, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({user_type})'}, ax=ax)
+    ax.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Musim', fontsize=16)
+    ax.set_xlabel('Musim', fontsize=14); ax.set_ylabel('Jam dalam Sehari', fontsize=14)
+    return fig
+
+
+# --- Tab 2: Pengaruh Cuaca ---
+def draw_weather_impact(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(x='weather_condition', y='cnt_display', data=data, palette='coolwarm', ax=ax, order=[w for w in WEATHER_ORDER if w in data['weather_condition'].values])
+    ax.set_title('Pengaruh Kondisi Cuaca terhadap Rata-rata Penyewaan', fontsize=15)
+    ax.set_xlabel('Kondisi Cuaca', fontsize=12)
+    ax.set_ylabel(f'Rata-rata Penyewaan ({user_type})', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=15, ha="right", rotation_mode="anchor")
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+    return fig
+
+
+def draw_hour_weather_heatmap(data, user_type):
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(data, cmap='magma_r', annot=True, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({user_type})'}, ax=ax)
+    ax.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Kondisi Cuaca', fontsize=16)
+    ax.set_xlabel('Kondisi Cuaca', fontsize=12); ax.set_ylabel('Jam dalam Sehari', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=15, ha="right", rotation_mode="anchor")
+    return fig
+
+
+# --- Tab 3: Analisis Pengguna ---
+def draw_user_proportion_pie(data):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.pie(data, labels=['Casual', 'Registered'], autopct='%1.1f%%', startangle=140, colors=['#ff9999','#66b3ff'], wedgeprops={'edgecolor': 'grey'})
+    ax.set_title('Proporsi Total Penyewaan: Casual vs Registered', fontsize=15)
+    ax.axis('equal')
+    return fig
+
+
+def draw_user_type_hourly(data):
+    fig, ax = plt.subplots(figsize=(10,5))
+    ax.plot(data['hr'], data['avg_casual'], label='Casual', marker='o', color='skyblue', linewidth=2)
+    ax.plot(data['hr'], data['avg_registered'], label='Registered', marker='x', color='darkblue', linewidth=2)
+    ax.set_title('Rata-rata Penyewaan per Jam', fontsize=14); ax.set_xlabel('Jam', fontsize=11); ax.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11)
+    ax.set_xticks(range(0,24,2)); ax.legend(); ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
+
+
+def draw_user_type_workingday(data):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    sns.barplot(x='workingday_label', y='rata_penyewaan', hue='tipe_pengguna', data=data, palette={'Casual': 'skyblue', 'Registered': 'darkblue'}, ax=ax)
+    ax.set_title('Penyewaan di Hari Kerja vs Akhir Pekan', fontsize=14); ax.set_xlabel('Status Hari', fontsize=11); ax.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11); ax.legend(title="Tipe Pengguna")
+    return fig
+
+
+def draw_user_type_season(data):
+    fig, ax = plt.subplots(figsize=(10,5))
+    sns.barplot(x='season_name', y='rata_penyewaan', hue='tipe_pengguna', data=data, palette={'Casual': 'skyblue', 'Registered': 'darkblue'}, ax=ax, order=[s for s in SEASON_ORDER if s in data['season_name'].values])
+    ax.set_title('Rata-rata Penyewaan per Musim', fontsize=14); ax.set_xlabel('Musim', fontsize=11); ax.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11); ax.legend(title="Tipe Pengguna")
+    return fig
+
+
+def draw_user_specific_hourly(data, user_type):
+    fig, ax = plt.subplots(figsize=(10,5))
+    sns.lineplot(x='hr', y='cnt_display', data=data, marker='o', ax=ax, label=user_type)
+    ax.set_title(f'Rata-rata Penyewaan per Jam ({user_type})', fontsize=14); ax.set_xlabel('Jam', fontsize=11); ax.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11); ax.legend(); ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
+
+
+# --- Tab 4: Analisis Lanjutan (Segmen Waktu) ---
+def draw_time_of_day_summary(data, weather_proportions_by_time, user_type):
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle(f'Karakteristik Penyewaan Sepeda per Segmen Waktu Harian ({user_type})', fontsize=18, y=1.02)
+
+    sns.barplot(x=data.index, y='avg_total_users', data=data, ax=axes[0,0], palette='Blues_r', order=[t for t in TIME_OF_DAY_ORDER if t in data.index])
+    axes[0,0].set_title('Rata-rata Total Penyewaan per Segmen Waktu', fontsize=14); axes[0,0].set_xlabel('time_of_day', fontsize=12); axes[0,0].set_ylabel(f'Rata-rata Penyewaan ({user_type})', fontsize=12)
+    plt.setp(axes[0,0].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
+    axes[0,0].grid(True, axis='y', linestyle='--', alpha=0.7)
+
+    if user_type == "Semua":
+        time_of_day_melted_adv = data[['avg_casual_users', 'avg_registered_users']].reset_index().melt(id_vars='time_of_day', var_name='user_type', value_name='avg_users')
+        time_of_day_melted_adv['user_type'] = time_of_day_melted_adv['user_type'].map({'avg_casual_users':'Casual', 'avg_registered_users':'Registered'})
+        if not time_of_day_melted_adv.empty:
+            sns.barplot(x='time_of_day', y='avg_users', hue='user_type', data=time_of_day_melted_adv, ax=axes[0,1], palette={'Casual': 'lightcoral', 'Registered': 'steelblue'}, order=[t for t in TIME_OF_DAY_ORDER if t in time_of_day_melted_adv['time_of_day'].values])
+            axes[0,1].legend(title="Tipe Pengguna")
+        else: axes[0,1].text(0.5, 0.5, 'Data pengguna tidak cukup', ha='center', va='center', transform=axes[0,1].transAxes)
+    else:
+        axes[0,1].text(0.5, 0.5, f'Menampilkan data untuk\n{user_type}', ha='center', va='center', transform=axes[0,1].transAxes, fontsize=12)
+    axes[0,1].set_title('Rata-rata Pengguna Casual vs Registered per Segmen Waktu', fontsize=14); axes[0,1].set_xlabel('time_of_day', fontsize=12); axes[0,1].set_ylabel('Rata-rata Penyewaan (Semua)', fontsize=12)
+    plt.setp(axes[0,1].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
+    axes[0,1].grid(True, axis='y', linestyle='--', alpha=0.7)
+
+    sns.barplot(x=data.index, y='avg_temp_actual', data=data, ax=axes[1,0], palette='Oranges_r', order=[t for t in TIME_OF_DAY_ORDER if t in data.index])
+    axes[1,0].set_title('Rata-rata Suhu Aktual (°C) per Segmen Waktu', fontsize=14); axes[1,0].set_xlabel('time_of_day', fontsize=12); axes[1,0].set_ylabel('Rata-rata Suhu (°C)', fontsize=12)
+    plt.setp(axes[1,0].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
+    axes[1,0].grid(True, axis='y', linestyle='--', alpha=0.7)
+
+    if not weather_proportions_by_time.empty and not weather_proportions_by_time.isnull().all().all():
+        weather_proportions_by_time.plot(kind='bar', stacked=True, ax=axes[1,1], colormap='Spectral', width=0.8)
+        axes[1,1].set_title('Proporsi Kondisi Cuaca (%) per Segmen Waktu', fontsize=14); axes[1,1].set_xlabel('time_of_day', fontsize=12); axes[1,1].set_ylabel('Persentase (%)', fontsize=12)
+        plt.setp(axes[1,1].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
+        axes[1,1].legend(title='Kondisi Cuaca', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize='small'); axes[1,1].grid(True, axis='y', linestyle='--', alpha=0.7)
+    else: axes[1,1].text(0.5, 0.5, 'Tidak ada data proporsi cuaca', ha='center', va='center', transform=axes[1,1].transAxes)
+    fig.tight_layout(rect=[0, 0, 1, 0.97])
+    return fig
+
+
+# --- Prakiraan Permintaan ---
+def draw_demand_forecast(data, count_column, user_type):
+    fig, ax = plt.subplots(figsize=(12, 5))
+    sns.lineplot(x='timestamp', y=count_column, hue='scenario', data=data, ax=ax, linewidth=1.5)
+    ax.set_title(f'Prakiraan Penyewaan per Jam ({user_type})', fontsize=15)
+    ax.set_xlabel('Waktu', fontsize=12); ax.set_ylabel('Prakiraan Jumlah Penyewaan', fontsize=12)
+    ax.legend(title='Skenario', fontsize='small'); ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
+
+
+# --- Deteksi Anomali ---
+def draw_anomaly_events(data):
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.vlines(data['timestamp'], data['expected'], data['cnt'], color='grey', alpha=0.5, linewidth=1)
+    ax.scatter(data['timestamp'], data['expected'], marker='_', color='grey', s=60, label='Perkiraan normal')
+    for direction, color in [('lonjakan', 'crimson'), ('penurunan', 'darkorange')]:
+        rows = data[data['direction'] == direction]
+        if not rows.empty:
+            ax.scatter(rows['timestamp'], rows['cnt'], color=color, s=30, label=direction.capitalize(), zorder=3)
+    ax.set_title('Jam dengan Penyewaan Tidak Biasa', fontsize=15)
+    ax.set_xlabel('Waktu', fontsize=12); ax.set_ylabel('Jumlah Penyewaan', fontsize=12)
+    ax.legend(fontsize='small'); ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
@@ -0,0 +1,18 @@
+import calendar
+
+# --- Konstanta Urutan ---
+# Order konstanta untuk plot, filter, dan kategori pada data store
+WEEKDAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTH_ORDER = calendar.month_name[1:] # January to December
+SEASON_ORDER = ['Spring', 'Summer', 'Fall', 'Winter']
+WEATHER_ORDER = ['Clear/Few clouds', 'Mist/Cloudy', 'Light Snow/Rain', 'Heavy Rain/Snow/Fog']
+
+# Segmen waktu harian: (label, jam mulai, jam selesai), inklusif dan boleh melewati tengah malam.
+# Ubah daftar ini untuk mendefinisikan segmen/shift sendiri; setiap jam 0-23 harus masuk tepat satu segmen.
+TIME_OF_DAY_SEGMENTS = [
+    ('Pagi (05-10)', 5, 10),
+    ('Siang (11-15)', 11, 15),
+    ('Sore (16-20)', 16, 20),
+    ('Malam (21-04)', 21, 4),
+]
+TIME_OF_DAY_ORDER = [label for label, _, _ in TIME_OF_DAY_SEGMENTS]
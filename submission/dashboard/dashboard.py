@@ -1,10 +1,24 @@
 # Import library
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-import calendar
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+
+import streamlit as st
+
+from agg_cache import AggregationCache, normalize_filter_key
+from anomaly import MIN_COUNT_DEVIATION, Z_THRESHOLD, AnomalyDetector
+from aggregations import USER_TYPE_COUNT_COLUMNS, daily_totals, hour_heatmap, hourly_pattern, mean_by, report_aggregates, time_of_day_summary, user_type_by_season, user_type_by_workingday, user_type_means, user_type_totals, weather_params, weather_shares_by_time_of_day
+from chart_backend import BRUSH_COLUMNS, chart_function, figure_from_json, selected_chart_backend, selected_range
+from constants import MONTH_ORDER, SEASON_ORDER, WEATHER_ORDER, WEEKDAY_ORDER
+from data_version import LiveDataset
+from figure_cache import FigureCache
+from partitions import PartitionedDataset, has_partitions
+from perf import metrics_from_env, perf_run, profile_report, stage_rows, start_profiler, start_run, stop_profiler, timed, version_comparison_rows
+from query_backend import aggregation_source, selected_backend
+from table_view import DAY_TABLE_COLUMNS, EXPORT_FORMATS, HOUR_TABLE_COLUMNS, PAGE_SIZES, export_table, page_count, page_rows, read_export, search_positions, sort_positions
+from warm_start import is_building, save_entries, seed_caches
 
 # Konfigurasi halaman
 st.set_page_config(page_title="Dashboard Penyewaan Sepeda", layout="wide")
@@ -23,62 +37,97 @@ st.markdown(
     h1, h2, h3 {
         color: #2c3e50; /* Warna judul yang lebih gelap dan modern */
     }
-    .stTabs [data-baseweb="tab-list"] {
-		gap: 24px; /* Jarak antar tab */
-	}
-	.stTabs [data-baseweb="tab"] {
-		height: 50px;
-        white-space: pre-wrap;
-		background-color: #e0e0e0; /* Warna tab tidak aktif */
-		border-radius: 4px 4px 0px 0px;
-		gap: 1px;
-		padding-top: 10px;
-		padding-bottom: 10px;
-        color: #4a4a4a; /* Warna teks tab tidak aktif */
-	}
-	.stTabs [aria-selected="true"] {
-  		background-color: #007bff; /* Warna tab aktif (biru cerah) */
-        color: white; /* Warna teks tab aktif */
-	}
     </style>
     """,
     unsafe_allow_html=True
 )
 
 # --- Fungsi dan Konstanta ---
-# Order konstanta untuk plot dan filter
-WEEKDAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-MONTH_ORDER = calendar.month_name[1:] # January to December
-SEASON_ORDER = ['Spring', 'Summer', 'Fall', 'Winter']
-WEATHER_ORDER = ['Clear/Few clouds', 'Mist/Cloudy', 'Light Snow/Rain', 'Heavy Rain/Snow/Fog']
-TIME_OF_DAY_ORDER = ['Pagi (05-10)', 'Siang (11-15)', 'Sore (16-20)', 'Malam (21-04)']
-
-# Fungsi untuk memuat data
-@st.cache_data
-def load_data():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    hour_data_path = os.path.join(script_dir, 'hour_data_clean.csv')
-    day_data_path = os.path.join(script_dir, 'day_data_clean.csv')
-    
-    hour_data = pd.read_csv(hour_data_path)
-    day_data = pd.read_csv(day_data_path)
-    
-    # Konversi kolom tanggal ke datetime
-    hour_data['dteday'] = pd.to_datetime(hour_data['dteday'])
-    day_data['dteday'] = pd.to_datetime(day_data['dteday'])
-    
-    return hour_data, day_data
-
-hour_df, day_df = load_data()
+REFRESH_KIND_LABELS = {'full': 'penuh', 'incremental': 'bertahap', 'partitioned': 'terpartisi'}
+FORECAST_UPDATE_LABELS = {'full': 'dilatih penuh', 'incremental': 'dilatih bertahap', 'loaded': 'dimuat dari file'}
+MAX_FORECAST_DAYS = 14
+ANOMALY_UPDATE_LABELS = {'full': 'diproses ulang penuh', 'incremental': 'diperbarui bertahap', 'loaded': 'dimuat dari file'}
+QUERY_BACKEND = selected_backend()
+CHART_BACKEND = selected_chart_backend()
+ALL_HOURS = (0, 23)
+
+# Dataset live: data, cube OLAP, dan indeks filter dimuat sekali lalu diperbarui bertahap
+# saat file *_clean.csv berubah (mis. setelah ingest.py menambahkan data harian baru)
+@st.cache_resource
+def get_live_dataset():
+    return LiveDataset()
+
+# Dataset terpartisi kota/tahun/bulan (dipakai jika direktori partitions/ sudah dibangun)
+@st.cache_resource
+def get_partitioned_dataset():
+    return PartitionedDataset()
+
+# Cache LRU hasil agregasi, dipakai bersama oleh semua sesi di proses ini
+@st.cache_resource
+def get_aggregation_cache():
+    return AggregationCache()
+
+# Executor satu thread untuk menghitung agregasi tampilan lain di latar belakang
+@st.cache_resource
+def get_warmup_executor():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='view-warmup')
+
+# Cache PNG hasil render chart, dipakai bersama oleh semua sesi di proses ini
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+# Model prakiraan permintaan: dimuat/dilatih sekali per proses lalu diperbarui bertahap (lihat forecasting.py).
+# forecasting (scikit-learn) baru diimpor saat tampilan prakiraan dibuka agar tidak memperlambat cold start.
+@st.cache_resource
+def get_forecaster():
+    from forecasting import DemandForecaster
+    return DemandForecaster()
+
+# Baseline deteksi anomali: dimuat sekali per proses, lalu hanya baris baru yang diproses (lihat anomaly.py)
+@st.cache_resource
+def get_anomaly_detector():
+    return AnomalyDetector()
+
+# Agregasi & figure filter default dari snapshot warm-start (lihat warm_start.py), dimuat sekali per versi data
+@st.cache_resource
+def seed_warm_start(version):
+    return seed_caches(version, get_aggregation_cache(), get_figure_cache())
+
+# Metrik performa per proses (panel admin, log JSON, endpoint Prometheus; lihat perf.py)
+@st.cache_resource
+def get_perf_metrics():
+    return metrics_from_env()
+
+# Setiap rerun dicatat sebagai satu run bernama; ?profile=1 menjalankan cProfile untuk satu rerun saja
+perf_metrics = get_perf_metrics()
+profiler = start_profiler(st.query_params.get("profile") == "1")
+if profiler is not None:
+    # Parameter langsung dihapus agar hanya rerun ini yang diprofil, juga jika rerun berakhir lebih awal
+    del st.query_params["profile"]
+perf = start_run('rerun', backend=QUERY_BACKEND, charts=CHART_BACKEND)
+
+# Tanpa partisi, dashboard memakai *_clean.csv satu kota. Dengan partisi, snapshot baru dibentuk setelah
+# filter kota/tahun/tanggal dipilih sehingga partisi yang tidak relevan tidak pernah dibaca.
+with timed('load_data'):
+    partitioned_dataset = get_partitioned_dataset() if has_partitions() else None
+    if partitioned_dataset is None:
+        snapshot = get_live_dataset().refresh()
+        data_available = not snapshot.hour_data.empty and not snapshot.day_data.empty
+        if data_available:
+            min_date_val, max_date_val = snapshot.day_data['dteday'].min(), snapshot.day_data['dteday'].max()
+            available_years = sorted(snapshot.hour_data['year'].unique())
+    else:
+        partitioned_dataset.refresh()
+        min_date_val, max_date_val = partitioned_dataset.date_bounds()
+        available_years = partitioned_dataset.years
+        data_available = min_date_val is not None
 
 # --- Sidebar untuk Filter Interaktif ---
-if not hour_df.empty and not day_df.empty:
+if data_available:
     st.sidebar.header("⚙️ Filter Data Interaktif")
 
     st.sidebar.markdown("**Pilih Rentang Tanggal**")
-    min_date_val = day_df['dteday'].min()
-    max_date_val = day_df['dteday'].max()
-
     date_range = st.sidebar.date_input(
         "Periode Analisis:",
         value=(min_date_val, max_date_val),
@@ -91,11 +140,23 @@ if not hour_df.empty and not day_df.empty:
         start_date = date_range[0]
         end_date = max_date_val
 
-    unique_years_from_data = sorted(hour_df['year'].unique())
+    if partitioned_dataset is not None:
+        selected_city = st.sidebar.multiselect(
+            "Kota:", options=partitioned_dataset.cities, default=partitioned_dataset.cities, key="city_filter"
+        )
+
     selected_year = st.sidebar.multiselect(
-        "Tahun:", options=unique_years_from_data, default=unique_years_from_data, key="year_filter"
+        "Tahun:", options=available_years, default=available_years, key="year_filter"
     )
 
+    # Satu snapshot dipakai untuk seluruh rerun agar tabel, cube, dan indeks selalu konsisten
+    if partitioned_dataset is not None:
+        with timed('partition_snapshot'):
+            snapshot = partitioned_dataset.snapshot(selected_city, selected_year, start_date, end_date)
+    perf.labels['data_version'] = snapshot.version
+    hour_df, day_df, cube_df = snapshot.hour_data, snapshot.day_data, snapshot.cube
+    hour_filter_index, day_filter_index, cube_filter_index = snapshot.hour_index, snapshot.day_index, snapshot.cube_index
+
     available_seasons_in_order = [s for s in SEASON_ORDER if s in hour_df['season_name'].unique()]
     selected_season = st.sidebar.multiselect(
         "Musim:", options=available_seasons_in_order, default=available_seasons_in_order, key="season_filter"
@@ -106,48 +167,110 @@ if not hour_df.empty and not day_df.empty:
         "Kondisi Cuaca:", options=available_weather_in_order, default=available_weather_in_order, key="weather_filter"
     )
 
+    # Rentang jam juga bisa dipilih dengan menyeret (box select) pada chart per jam
+    hour_range = st.sidebar.slider(
+        "Jam:", min_value=ALL_HOURS[0], max_value=ALL_HOURS[1], value=ALL_HOURS, key="hour_filter"
+    )
+    selected_hours = [] if tuple(hour_range) == ALL_HOURS else list(range(hour_range[0], hour_range[1] + 1))
+
     selected_user_type = st.sidebar.radio(
-        "Jenis Pengguna:", options=['Semua', 'Casual', 'Registered'], index=0, key="user_type_filter"
+        "Jenis Pengguna:", options=list(USER_TYPE_COUNT_COLUMNS), index=0, key="user_type_filter"
     )
 
     # --- Proses Filter Data ---
-    hour_data_filtered = hour_df.copy()
-    day_data_filtered = day_df.copy()
+    # Semua filter digabung sebagai operasi bitmap, lalu tiap tabel dipotong satu kali
+    filter_selection = dict(
+        start_date=start_date if start_date and end_date else None,
+        end_date=end_date if start_date and end_date else None,
+        year=selected_year, season_name=selected_season, weather_condition=selected_weather, hr=selected_hours
+    )
+    # Tabel per jam/harian tidak disalin per sesi: cukup posisi baris di atas tabel bersama snapshot
+    with timed('filter'):
+        hour_positions = hour_filter_index.positions(**filter_selection)
+        day_positions = day_filter_index.positions(**filter_selection)
+        has_hour_data, has_day_data = len(hour_positions) > 0, len(day_positions) > 0
+        cube_filtered = cube_filter_index.apply(cube_df, **filter_selection)
+    # Sumber agregasi chart: cube pandas terfilter, atau DuckDB langsung di atas file snapshot
+    # (dipilih lewat env DASHBOARD_QUERY_BACKEND, lihat query_backend.py)
+    query_source = aggregation_source(QUERY_BACKEND, snapshot, cube_filtered, filter_selection)
+
+    count_column_to_display = USER_TYPE_COUNT_COLUMNS[selected_user_type]
+
+    # Agregasi di-memoize berdasarkan versi data dan kombinasi filter yang dinormalisasi;
+    # entri versi lama tidak pernah dipakai lagi dan akan tergeser oleh LRU
+    aggregation_cache = get_aggregation_cache()
+    warm_start_entries = seed_warm_start(snapshot.version)
+    filter_key = (snapshot.version,) + normalize_filter_key(
+        filter_selection['start_date'], filter_selection['end_date'],
+        selected_year, selected_season, selected_weather, selected_user_type, hours=selected_hours
+    )
 
-    if start_date and end_date:
-        hour_data_filtered = hour_data_filtered[
-            (hour_data_filtered['dteday'] >= pd.to_datetime(start_date)) &
-            (hour_data_filtered['dteday'] <= pd.to_datetime(end_date))
-        ]
-        day_data_filtered = day_data_filtered[
-            (day_data_filtered['dteday'] >= pd.to_datetime(start_date)) &
-            (day_data_filtered['dteday'] <= pd.to_datetime(end_date))
+    def aggregate_key(agg_func, *args):
+        return (agg_func.__name__, filter_key) + args
+
+    def cached_aggregate(agg_func, *args):
+        with timed(f"{agg_func.__name__}({', '.join(map(str, args))})", 'aggregation') as entry:
+            entry['cache'] = 'hit'
+            def compute():
+                entry['cache'] = 'miss'
+                return agg_func(query_source, *args)
+            return aggregation_cache.get_or_compute(aggregate_key(agg_func, *args), compute)
+
+    # Agregasi tampilan yang tidak aktif dihitung di thread latar belakang (tanpa render figure,
+    # karena pyplot tidak thread-safe), sehingga saat tampilan dibuka datanya sudah ada di cache
+    def warm_aggregates(aggregate_names):
+        aggregates = report_aggregates(count_column_to_display)
+        pending = [
+            (aggregate_key(agg_func, *args), partial(agg_func, query_source, *args))
+            for agg_func, args in (aggregates[name] for name in aggregate_names)
         ]
-
-    if selected_year:
-        hour_data_filtered = hour_data_filtered[hour_data_filtered['year'].isin(selected_year)]
-        day_data_filtered = day_data_filtered[day_data_filtered['year'].isin(selected_year)]
-    if selected_season:
-        hour_data_filtered = hour_data_filtered[hour_data_filtered['season_name'].isin(selected_season)]
-        day_data_filtered = day_data_filtered[day_data_filtered['season_name'].isin(selected_season)]
-    if selected_weather:
-        hour_data_filtered = hour_data_filtered[hour_data_filtered['weather_condition'].isin(selected_weather)]
-        day_data_filtered = day_data_filtered[day_data_filtered['weather_condition'].isin(selected_weather)]
-
-    count_column_to_display = 'cnt'
-    if selected_user_type == 'Casual':
-        count_column_to_display = 'casual'
-    elif selected_user_type == 'Registered':
-        count_column_to_display = 'registered'
-
-    if not hour_data_filtered.empty:
-        hour_data_filtered['cnt_display'] = hour_data_filtered[count_column_to_display]
-    else:
-        hour_data_filtered = pd.DataFrame(columns=hour_df.columns.tolist() + ['cnt_display'])
-    if not day_data_filtered.empty:
-        day_data_filtered['cnt_display'] = day_data_filtered[count_column_to_display]
-    else:
-        day_data_filtered = pd.DataFrame(columns=day_df.columns.tolist() + ['cnt_display'])
+        pending = [(key, compute) for key, compute in pending if key not in aggregation_cache]
+        if pending:
+            get_warmup_executor().submit(aggregation_cache.warm, pending)
+
+    # Backend plotly: hanya data agregat chart yang dikirim ke browser dan dirender di sana (hover/zoom
+    # tanpa rerun); Figure disimpan di cache sebagai JSON. Backend matplotlib: chart dirender menjadi PNG.
+    # Keduanya dibentuk sekali per (id chart, filter) lalu disajikan dari cache. Dipilih lewat env
+    # DASHBOARD_CHART_BACKEND; modul chart & library plotting-nya baru diimpor saat chart pertama
+    # benar-benar dibentuk (lihat chart_backend.py).
+    figure_cache = get_figure_cache()
+
+    # Pilihan (box select) pada chart per jam / tren harian diterapkan ke filter sidebar. Callback berjalan
+    # di dalam rerun fragment, jadi rerun penuh diminta lewat flag agar sidebar & filter ikut diperbarui.
+    def apply_chart_selection(chart_key, column):
+        if column == 'hr':
+            selected = selected_range(st.session_state[chart_key].selection, column, *ALL_HOURS)
+        else:
+            selected = selected_range(st.session_state[chart_key].selection, column, min_date_val, max_date_val)
+        if selected is None:
+            return # Pilihan dikosongkan (klik ganda): filter tidak diubah
+        st.session_state["hour_filter" if column == 'hr' else "date_filter"] = selected
+        st.session_state["cross_filter_changed"] = True
+
+    # `figure_key` menggantikan kunci filter untuk chart yang bergantung pada input lain (mis. skenario prakiraan)
+    def show_chart(chart_id, *args, figure_key=None):
+        with timed(chart_id, 'chart') as entry:
+            entry['cache'] = 'hit'
+            def draw(*draw_args):
+                entry['cache'] = 'miss'
+                return chart_function(CHART_BACKEND, chart_id)(*draw_args)
+            figure_filter_key = filter_key if figure_key is None else figure_key
+            if CHART_BACKEND == 'plotly':
+                fig = figure_from_json(figure_cache.get_or_render(chart_id, figure_filter_key, draw, *args, output='json'))
+                chart_key = f"chart_{chart_id}"
+                brush_column = BRUSH_COLUMNS.get(chart_id)
+                with timed(f'{chart_id}:plotly', 'image'):
+                    if brush_column is None:
+                        st.plotly_chart(fig, key=chart_key)
+                    else:
+                        st.plotly_chart(
+                            fig, key=chart_key, selection_mode=("box", "points"),
+                            on_select=partial(apply_chart_selection, chart_key, brush_column)
+                        )
+                return
+            png = figure_cache.get_or_render(chart_id, figure_filter_key, draw, *args)
+            with timed(f'{chart_id}:image', 'image'):
+                st.image(png)
 
 else: # Jika data awal gagal dimuat
     st.error("Gagal memuat data awal. Tidak dapat menampilkan dashboard.")
@@ -161,116 +284,85 @@ st.markdown("""
     Gunakan filter di sidebar untuk menjelajahi data berdasarkan periode waktu, musim, cuaca, dan jenis pengguna.
 """)
 
-# --- Tab untuk Organisasi Konten ---
-tab1, tab2, tab3, tab4 = st.tabs([
-    "📈 Pola Waktu & Musiman",
-    "☀️ Pengaruh Cuaca",
-    "👥 Analisis Pengguna",
-    "🔬 Analisis Lanjutan (Segmen Waktu)"
-])
-
-with tab1:
+# --- Tampilan Analisis ---
+# Setiap tampilan adalah fungsi tersendiri; hanya tampilan yang aktif yang dihitung dan dirender
+def render_time_view():
     st.header("🕒 Pola Penggunaan Sepeda Berdasarkan Waktu dan Musim")
 
-    if not hour_data_filtered.empty:
+    if has_hour_data:
         col1a, col1b = st.columns(2)
         with col1a:
             st.subheader("Pola Penggunaan Sepeda Berdasarkan Jam")
-            hourly_pattern = hour_data_filtered.groupby('hr')['cnt_display'].mean().reset_index()
-            if not hourly_pattern.empty:
-                fig_hr, ax_hr = plt.subplots(figsize=(10, 5))
-                sns.lineplot(x='hr', y='cnt_display', data=hourly_pattern, marker='o', linewidth=2, ax=ax_hr, color='dodgerblue')
-                ax_hr.set_title('Rata-rata Penyewaan Sepeda berdasarkan Jam', fontsize=15)
-                ax_hr.set_xlabel('Jam dalam Sehari', fontsize=12)
-                ax_hr.set_ylabel(f'Rata-rata Penyewaan ({selected_user_type})', fontsize=12)
-                ax_hr.set_xticks(range(0, 24))
-                ax_hr.grid(True, linestyle='--', alpha=0.7)
-                st.pyplot(fig_hr)
+            hourly_pattern_df = cached_aggregate(hourly_pattern, count_column_to_display)
+            if not hourly_pattern_df.empty:
+                show_chart('hourly_pattern', hourly_pattern_df, selected_user_type)
             else: st.info("Tidak ada data penyewaan per jam untuk filter yang dipilih.")
+            if CHART_BACKEND == 'plotly':
+                st.caption("Seret pada chart untuk memfilter rentang jam.")
 
             st.subheader("Pola Penggunaan Sepeda Berdasarkan Musim")
-            seasonal_pattern_tab1 = hour_data_filtered.groupby('season_name')['cnt_display'].mean()
+            seasonal_pattern_tab1 = cached_aggregate(mean_by, 'season_name', count_column_to_display)
             if not seasonal_pattern_tab1.empty:
                 seasonal_pattern_tab1 = seasonal_pattern_tab1.reindex(SEASON_ORDER).dropna().reset_index()
                 if not seasonal_pattern_tab1.empty: # Check again after reindex
-                    fig_season_t1, ax_season_t1 = plt.subplots(figsize=(10, 5))
-                    sns.barplot(x='season_name', y='cnt_display', data=seasonal_pattern_tab1, palette='viridis', ax=ax_season_t1, order=[s for s in SEASON_ORDER if s in seasonal_pattern_tab1['season_name'].values])
-                    ax_season_t1.set_title('Rata-rata Penyewaan Sepeda berdasarkan Musim', fontsize=15)
-                    ax_season_t1.set_xlabel('Musim', fontsize=12)
-                    ax_season_t1.set_ylabel(f'Rata-rata Penyewaan ({selected_user_type})', fontsize=12)
-                    ax_season_t1.grid(True, axis='y', linestyle='--', alpha=0.7)
-                    st.pyplot(fig_season_t1)
+                    show_chart('season_pattern', seasonal_pattern_tab1, selected_user_type)
                 else: st.info("Tidak ada data penyewaan per musim yang valid setelah reindex.")
             else: st.info("Tidak ada data penyewaan per musim untuk filter yang dipilih.")
         with col1b:
             st.subheader("Pola Penggunaan Sepeda Berdasarkan Hari dalam Seminggu")
-            daily_pattern_weekday = hour_data_filtered.groupby('weekday_name')['cnt_display'].mean()
+            daily_pattern_weekday = cached_aggregate(mean_by, 'weekday_name', count_column_to_display)
             if not daily_pattern_weekday.empty:
                 daily_pattern_weekday = daily_pattern_weekday.reindex(WEEKDAY_ORDER).dropna().reset_index()
                 if not daily_pattern_weekday.empty:
-                    fig_day, ax_day = plt.subplots(figsize=(10, 5))
-                    sns.barplot(x='weekday_name', y='cnt_display', data=daily_pattern_weekday, palette='crest', ax=ax_day, order=[wd for wd in WEEKDAY_ORDER if wd in daily_pattern_weekday['weekday_name'].values])
-                    ax_day.set_title('Rata-rata Penyewaan Sepeda berdasarkan Hari dalam Seminggu', fontsize=15)
-                    ax_day.set_xlabel('Hari', fontsize=12)
-                    ax_day.set_ylabel(f'Rata-rata Penyewaan ({selected_user_type})', fontsize=12)
-                    plt.setp(ax_day.get_xticklabels(), rotation=30, ha="right")
-                    ax_day.grid(True, axis='y', linestyle='--', alpha=0.7)
-                    st.pyplot(fig_day)
+                    show_chart('weekday_pattern', daily_pattern_weekday, selected_user_type)
                 else: st.info("Tidak ada data penyewaan per hari yang valid setelah reindex.")
             else: st.info("Tidak ada data penyewaan per hari untuk filter yang dipilih.")
 
             st.subheader("Pola Penggunaan Sepeda Berdasarkan Bulan")
-            monthly_pattern = hour_data_filtered.groupby('month_name')['cnt_display'].mean()
+            monthly_pattern = cached_aggregate(mean_by, 'month_name', count_column_to_display)
             if not monthly_pattern.empty:
                 monthly_pattern = monthly_pattern.reindex(MONTH_ORDER).dropna().reset_index()
                 if not monthly_pattern.empty:
-                    fig_month, ax_month = plt.subplots(figsize=(10, 5))
-                    sns.lineplot(x='month_name', y='cnt_display', data=monthly_pattern, marker='o', linewidth=2, color='mediumseagreen', sort=False, ax=ax_month)
-                    ax_month.set_title('Rata-rata Penyewaan Sepeda berdasarkan Bulan', fontsize=15)
-                    ax_month.set_xlabel('Bulan', fontsize=12)
-                    ax_month.set_ylabel(f'Rata-rata Penyewaan ({selected_user_type})', fontsize=12)
-                    plt.setp(ax_month.get_xticklabels(), rotation=45, ha="right")
-                    ax_month.grid(True, linestyle='--', alpha=0.7)
-                    st.pyplot(fig_month)
+                    show_chart('month_pattern', monthly_pattern, selected_user_type)
                 else: st.info("Tidak ada data penyewaan per bulan yang valid setelah reindex.")
             else: st.info("Tidak ada data penyewaan per bulan untuk filter yang dipilih.")
 
+        st.markdown("---")
+        st.subheader("Tren Penyewaan Harian")
+        daily_trend_df = cached_aggregate(daily_totals, count_column_to_display)
+        if not daily_trend_df.empty:
+            show_chart('daily_trend', daily_trend_df, selected_user_type)
+            if CHART_BACKEND == 'plotly':
+                st.caption("Seret pada chart untuk memfilter rentang tanggal.")
+        else: st.info("Tidak ada data penyewaan harian untuk filter yang dipilih.")
+
         st.markdown("---")
         st.subheader("Heatmap Pola Penyewaan")
         col_hm1, col_hm2 = st.columns(2)
         with col_hm1:
             st.markdown("##### Jam vs Hari dalam Seminggu")
-            if not hour_data_filtered.empty:
-                hour_weekday_heatmap_df = hour_data_filtered.pivot_table(index='hr', columns='weekday_name', values='cnt_display', aggfunc='mean')
+            if has_hour_data:
+                hour_weekday_heatmap_df = cached_aggregate(hour_heatmap, 'weekday_name', count_column_to_display)
                 if not hour_weekday_heatmap_df.empty and not hour_weekday_heatmap_df.isnull().all().all():
                     ordered_weekdays = [wd for wd in WEEKDAY_ORDER if wd in hour_weekday_heatmap_df.columns]
                     if ordered_weekdays:
                         df_to_plot = hour_weekday_heatmap_df.reindex(columns=ordered_weekdays)
                         if not df_to_plot.empty and not df_to_plot.isnull().all().all():
-                            fig_hm_day, ax_hm_day = plt.subplots(figsize=(10, 7))
-                            sns.heatmap(df_to_plot, cmap='viridis', annot=False, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({selected_user_type})'}, ax=ax_hm_day)
-                            ax_hm_day.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Hari dalam Seminggu', fontsize=14)
-                            ax_hm_day.set_xlabel('Hari dalam Seminggu', fontsize=11); ax_hm_day.set_ylabel('Jam dalam Sehari', fontsize=11)
-                            st.pyplot(fig_hm_day)
+                            show_chart('hour_weekday_heatmap', df_to_plot, selected_user_type)
                         else: st.info("Tidak ada data heatmap jam vs hari yang valid untuk filter (setelah reindex).")
                     else: st.info("Tidak ada kolom hari yang relevan dalam data pivot heatmap jam vs hari.")
                 else: st.info("Tidak ada data heatmap jam vs hari (pivot kosong atau semua NaN).")
             else: st.info("Data utama kosong untuk heatmap jam vs hari.")
         with col_hm2:
             st.markdown("##### Jam vs Bulan")
-            if not hour_data_filtered.empty:
-                hour_month_heatmap_df = hour_data_filtered.pivot_table(index='hr', columns='month_name', values='cnt_display', aggfunc='mean')
+            if has_hour_data:
+                hour_month_heatmap_df = cached_aggregate(hour_heatmap, 'month_name', count_column_to_display)
                 if not hour_month_heatmap_df.empty and not hour_month_heatmap_df.isnull().all().all():
                     ordered_months = [m for m in MONTH_ORDER if m in hour_month_heatmap_df.columns]
                     if ordered_months:
                         df_to_plot = hour_month_heatmap_df.reindex(columns=ordered_months)
                         if not df_to_plot.empty and not df_to_plot.isnull().all().all():
-                            fig_hm_month, ax_hm_month = plt.subplots(figsize=(12, 7))
-                            sns.heatmap(df_to_plot, cmap='YlGnBu', annot=False, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({selected_user_type})'}, ax=ax_hm_month)
-                            ax_hm_month.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Bulan', fontsize=14)
-                            ax_hm_month.set_xlabel('Bulan', fontsize=11); ax_hm_month.set_ylabel('Jam dalam Sehari', fontsize=11)
-                            plt.setp(ax_hm_month.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
-                            st.pyplot(fig_hm_month)
+                            show_chart('hour_month_heatmap', df_to_plot, selected_user_type)
                         else: st.info("Tidak ada data heatmap jam vs bulan yang valid untuk filter (setelah reindex).")
                     else: st.info("Tidak ada kolom bulan yang relevan dalam data pivot heatmap jam vs bulan.")
                 else: st.info("Tidak ada data heatmap jam vs bulan (pivot kosong atau semua NaN).")
@@ -278,45 +370,34 @@ with tab1:
 
         st.markdown("---")
         st.markdown("##### Jam vs Musim")
-        if not hour_data_filtered.empty:
-            hour_season_heatmap_df = hour_data_filtered.pivot_table(index='hr', columns='season_name', values='cnt_display', aggfunc='mean')
+        if has_hour_data:
+            hour_season_heatmap_df = cached_aggregate(hour_heatmap, 'season_name', count_column_to_display)
             if not hour_season_heatmap_df.empty and not hour_season_heatmap_df.isnull().all().all():
                 ordered_seasons = [s for s in SEASON_ORDER if s in hour_season_heatmap_df.columns]
                 if ordered_seasons:
                     df_to_plot = hour_season_heatmap_df.reindex(columns=ordered_seasons)
                     if not df_to_plot.empty and not df_to_plot.isnull().all().all():
-                        fig_hm_season, ax_hm_season = plt.subplots(figsize=(10, 7))
-                        sns.heatmap(df_to_plot, cmap='coolwarm', annot=True, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({selected_user_type})'}, ax=ax_hm_season)
-                        ax_hm_season.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Musim', fontsize=16)
-                        ax_hm_season.set_xlabel('Musim', fontsize=14); ax_hm_season.set_ylabel('Jam dalam Sehari', fontsize=14)
-                        st.pyplot(fig_hm_season)
+                        show_chart('hour_season_heatmap', df_to_plot, selected_user_type)
                     else: st.info("Tidak ada data heatmap jam vs musim yang valid (setelah reindex).")
                 else: st.info("Tidak ada kolom musim yang relevan dalam data pivot heatmap jam vs musim.")
             else: st.info("Tidak ada data heatmap jam vs musim (pivot kosong atau semua NaN).")
         else: st.info("Data utama kosong untuk heatmap jam vs musim.")
     else:
-        st.warning("Tidak ada data untuk ditampilkan di tab Pola Waktu & Musiman berdasarkan filter Anda.")
+        st.warning("Tidak ada data untuk ditampilkan di tampilan Pola Waktu & Musiman berdasarkan filter Anda.")
 
-with tab2:
+def render_weather_view():
     st.header("☀️ Pengaruh Kondisi Cuaca terhadap Penyewaan")
-    if not hour_data_filtered.empty:
+    if has_hour_data:
         col2a, col2b = st.columns([6, 4])
         with col2a:
             st.subheader("Rata-rata Penyewaan berdasarkan Kondisi Cuaca")
-            weather_impact_df = hour_data_filtered.groupby('weather_condition')['cnt_display'].mean()
+            weather_impact_df = cached_aggregate(mean_by, 'weather_condition', count_column_to_display)
             if not weather_impact_df.empty:
                 weather_impact_df = weather_impact_df.reindex(WEATHER_ORDER).dropna().reset_index()
                 if not weather_impact_df.empty:
-                    fig_weather, ax_weather = plt.subplots(figsize=(10, 6))
-                    sns.barplot(x='weather_condition', y='cnt_display', data=weather_impact_df, palette='coolwarm', ax=ax_weather, order=[w for w in WEATHER_ORDER if w in weather_impact_df['weather_condition'].values])
-                    ax_weather.set_title('Pengaruh Kondisi Cuaca terhadap Rata-rata Penyewaan', fontsize=15)
-                    ax_weather.set_xlabel('Kondisi Cuaca', fontsize=12)
-                    ax_weather.set_ylabel(f'Rata-rata Penyewaan ({selected_user_type})', fontsize=12)
-                    plt.setp(ax_weather.get_xticklabels(), rotation=15, ha="right", rotation_mode="anchor")
-                    ax_weather.grid(True, axis='y', linestyle='--', alpha=0.7)
-                    st.pyplot(fig_weather)
-
-                    weather_params_df = hour_data_filtered.groupby('weather_condition').agg(avg_temp_actual=('temp_actual', 'mean'), avg_hum_actual=('hum_actual', 'mean')).reindex(WEATHER_ORDER).dropna().reset_index()
+                    show_chart('weather_impact', weather_impact_df, selected_user_type)
+
+                    weather_params_df = cached_aggregate(weather_params)
                     if not weather_params_df.empty:
                         st.markdown("##### Parameter Cuaca Rata-rata per Kondisi:")
                         st.dataframe(weather_params_df.set_index('weather_condition').style.format("{:.2f}"))
@@ -325,167 +406,277 @@ with tab2:
 
         st.markdown("---")
         st.subheader("Heatmap Penyewaan: Jam vs Kondisi Cuaca")
-        if not hour_data_filtered.empty:
-            hour_weather_heatmap_df = hour_data_filtered.pivot_table(index='hr', columns='weather_condition', values='cnt_display', aggfunc='mean')
+        if has_hour_data:
+            hour_weather_heatmap_df = cached_aggregate(hour_heatmap, 'weather_condition', count_column_to_display)
             if not hour_weather_heatmap_df.empty and not hour_weather_heatmap_df.isnull().all().all():
                 ordered_weather_cols = [w for w in WEATHER_ORDER if w in hour_weather_heatmap_df.columns]
                 if ordered_weather_cols:
                     df_to_plot = hour_weather_heatmap_df.reindex(columns=ordered_weather_cols)
                     if not df_to_plot.empty and not df_to_plot.isnull().all().all():
-                        fig_hm_weather, ax_hm_weather = plt.subplots(figsize=(10, 8))
-                        sns.heatmap(df_to_plot, cmap='magma_r', annot=True, fmt=".0f", linewidths=.5, cbar_kws={'label': f'Rata-rata Penyewaan ({selected_user_type})'}, ax=ax_hm_weather)
-                        ax_hm_weather.set_title('Heatmap Rata-rata Penyewaan Sepeda: Jam vs Kondisi Cuaca', fontsize=16)
-                        ax_hm_weather.set_xlabel('Kondisi Cuaca', fontsize=12); ax_hm_weather.set_ylabel('Jam dalam Sehari', fontsize=12)
-                        plt.setp(ax_hm_weather.get_xticklabels(), rotation=15, ha="right", rotation_mode="anchor")
-                        st.pyplot(fig_hm_weather)
+                        show_chart('hour_weather_heatmap', df_to_plot, selected_user_type)
                     else: st.info("Tidak ada data heatmap jam vs cuaca yang valid (setelah reindex).")
                 else: st.info("Tidak ada kolom kondisi cuaca yang relevan dalam data pivot heatmap jam vs cuaca.")
             else: st.info("Tidak ada data heatmap jam vs kondisi cuaca (pivot kosong atau semua NaN).")
         else: st.info("Data utama kosong untuk heatmap jam vs kondisi cuaca.")
     else:
-        st.warning("Tidak ada data untuk ditampilkan di tab Pengaruh Cuaca berdasarkan filter Anda.")
+        st.warning("Tidak ada data untuk ditampilkan di tampilan Pengaruh Cuaca berdasarkan filter Anda.")
 
-with tab3:
+def render_user_view():
     st.header("👥 Analisis Berdasarkan Jenis Pengguna")
-    if selected_user_type == "Semua" and not day_data_filtered.empty and 'casual' in day_data_filtered and 'registered' in day_data_filtered:
+    if selected_user_type == "Semua" and has_hour_data:
         st.subheader("Proporsi Pengguna Casual vs Registered (Periode Terfilter)")
-        total_users_pie_data = day_data_filtered[['casual', 'registered']].sum()
+        total_users_pie_data = cached_aggregate(user_type_totals)
         if total_users_pie_data.sum() > 0:
-            fig_pie_users, ax_pie_users = plt.subplots(figsize=(8, 5))
-            ax_pie_users.pie(total_users_pie_data, labels=['Casual', 'Registered'], autopct='%1.1f%%', startangle=140, colors=['#ff9999','#66b3ff'], wedgeprops={'edgecolor': 'grey'})
-            ax_pie_users.set_title('Proporsi Total Penyewaan: Casual vs Registered', fontsize=15)
-            ax_pie_users.axis('equal')
-            st.pyplot(fig_pie_users)
+            show_chart('user_proportion_pie', total_users_pie_data)
         else: st.info("Tidak ada data penyewaan untuk diagram proporsi.")
     elif selected_user_type != "Semua":
         st.info(f"Menampilkan data spesifik untuk pengguna {selected_user_type}. Diagram proporsi keseluruhan tidak ditampilkan.")
-    else: st.info("Data harian tidak cukup atau kolom casual/registered tidak ada untuk menampilkan proporsi pengguna.")
+    else: st.info("Data per jam tidak cukup untuk menampilkan proporsi pengguna.")
 
     st.markdown("---")
-    if not hour_data_filtered.empty and 'casual' in hour_data_filtered and 'registered' in hour_data_filtered:
+    if has_hour_data and 'casual' in hour_df and 'registered' in hour_df:
         if selected_user_type == "Semua":
             st.subheader("Perbandingan Pola Penggunaan: Casual vs Registered")
             col3a, col3b = st.columns(2)
             with col3a:
                 st.markdown("##### Berdasarkan Jam")
-                user_type_hourly_df = hour_data_filtered.groupby('hr').agg(avg_casual=('casual', 'mean'), avg_registered=('registered', 'mean')).reset_index()
+                user_type_hourly_df = cached_aggregate(user_type_means, 'hr').reset_index()
                 if not user_type_hourly_df.empty:
-                    fig_user_hr, ax_user_hr = plt.subplots(figsize=(10,5))
-                    ax_user_hr.plot(user_type_hourly_df['hr'], user_type_hourly_df['avg_casual'], label='Casual', marker='o', color='skyblue', linewidth=2)
-                    ax_user_hr.plot(user_type_hourly_df['hr'], user_type_hourly_df['avg_registered'], label='Registered', marker='x', color='darkblue', linewidth=2)
-                    ax_user_hr.set_title('Rata-rata Penyewaan per Jam', fontsize=14); ax_user_hr.set_xlabel('Jam', fontsize=11); ax_user_hr.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11)
-                    ax_user_hr.set_xticks(range(0,24,2)); ax_user_hr.legend(); ax_user_hr.grid(True, linestyle='--', alpha=0.7)
-                    st.pyplot(fig_user_hr)
+                    show_chart('user_type_hourly', user_type_hourly_df)
                 else: st.info("Tidak ada data perbandingan pengguna per jam.")
 
                 st.markdown("##### Berdasarkan Hari Kerja vs Akhir Pekan/Libur")
-                workday_agg_df = hour_data_filtered.groupby('workingday').agg(avg_casual=('casual', 'mean'),avg_registered=('registered', 'mean')).reset_index()
-                if not workday_agg_df.empty:
-                    workday_agg_df['workingday_label'] = workday_agg_df['workingday'].map({0: 'Akhir Pekan/Libur', 1: 'Hari Kerja'})
-                    workday_melted = workday_agg_df.melt(id_vars='workingday_label', value_vars=['avg_casual', 'avg_registered'], var_name='tipe_pengguna', value_name='rata_penyewaan')
-                    workday_melted['tipe_pengguna'] = workday_melted['tipe_pengguna'].map({'avg_casual': 'Casual', 'avg_registered': 'Registered'})
-                    if not workday_melted.empty:
-                        fig_workday, ax_workday = plt.subplots(figsize=(8, 5))
-                        sns.barplot(x='workingday_label', y='rata_penyewaan', hue='tipe_pengguna', data=workday_melted, palette={'Casual': 'skyblue', 'Registered': 'darkblue'}, ax=ax_workday)
-                        ax_workday.set_title('Penyewaan di Hari Kerja vs Akhir Pekan', fontsize=14); ax_workday.set_xlabel('Status Hari', fontsize=11); ax_workday.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11); ax_workday.legend(title="Tipe Pengguna")
-                        st.pyplot(fig_workday)
-                    else: st.info("Tidak ada data perbandingan pengguna berdasarkan status hari (setelah diolah).")
+                workday_melted = cached_aggregate(user_type_by_workingday)
+                if not workday_melted.empty:
+                    show_chart('user_type_workingday', workday_melted)
                 else: st.info("Tidak ada data perbandingan pengguna berdasarkan status hari.")
             with col3b:
                 st.markdown("##### Berdasarkan Musim")
-                user_type_season_df = hour_data_filtered.groupby('season_name').agg(avg_casual=('casual', 'mean'),avg_registered=('registered', 'mean'))
-                if not user_type_season_df.empty:
-                    user_type_season_df = user_type_season_df.reindex(SEASON_ORDER).dropna().reset_index()
-                    if not user_type_season_df.empty:
-                        user_type_season_melted = user_type_season_df.melt(id_vars='season_name', value_vars=['avg_casual', 'avg_registered'], var_name='tipe_pengguna', value_name='rata_penyewaan')
-                        user_type_season_melted['tipe_pengguna'] = user_type_season_melted['tipe_pengguna'].map({'avg_casual': 'Casual', 'avg_registered': 'Registered'})
-                        if not user_type_season_melted.empty:
-                            fig_user_season, ax_user_season = plt.subplots(figsize=(10,5))
-                            sns.barplot(x='season_name', y='rata_penyewaan', hue='tipe_pengguna', data=user_type_season_melted, palette={'Casual': 'skyblue', 'Registered': 'darkblue'}, ax=ax_user_season, order=[s for s in SEASON_ORDER if s in user_type_season_melted['season_name'].values])
-                            ax_user_season.set_title('Rata-rata Penyewaan per Musim', fontsize=14); ax_user_season.set_xlabel('Musim', fontsize=11); ax_user_season.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11); ax_user_season.legend(title="Tipe Pengguna")
-                            st.pyplot(fig_user_season)
-                        else: st.info("Tidak ada data perbandingan pengguna per musim (setelah diolah).")
-                    else: st.info("Tidak ada data perbandingan pengguna per musim (setelah reindex).")
+                user_type_season_melted = cached_aggregate(user_type_by_season)
+                if not user_type_season_melted.empty:
+                    show_chart('user_type_season', user_type_season_melted)
                 else: st.info("Tidak ada data perbandingan pengguna per musim.")
-        elif selected_user_type != "Semua" and not hour_data_filtered.empty:
+        elif selected_user_type != "Semua" and has_hour_data:
             st.subheader(f"Pola Penggunaan untuk Pengguna {selected_user_type}")
-            user_specific_hourly = hour_data_filtered.groupby('hr')['cnt_display'].mean().reset_index()
+            user_specific_hourly = cached_aggregate(hourly_pattern, count_column_to_display)
             if not user_specific_hourly.empty:
-                fig_user_spec_hr, ax_user_spec_hr = plt.subplots(figsize=(10,5))
-                sns.lineplot(x='hr', y='cnt_display', data=user_specific_hourly, marker='o', ax=ax_user_spec_hr, label=selected_user_type)
-                ax_user_spec_hr.set_title(f'Rata-rata Penyewaan per Jam ({selected_user_type})', fontsize=14); ax_user_spec_hr.set_xlabel('Jam', fontsize=11); ax_user_spec_hr.set_ylabel('Rata-rata Jumlah Penyewaan', fontsize=11); ax_user_spec_hr.legend(); ax_user_spec_hr.grid(True, linestyle='--', alpha=0.7)
-                st.pyplot(fig_user_spec_hr)
+                show_chart('user_specific_hourly', user_specific_hourly, selected_user_type)
             else: st.info(f"Tidak ada data pola per jam untuk pengguna {selected_user_type} dengan filter saat ini.")
     else:
-        st.warning("Tidak ada data untuk ditampilkan di tab Analisis Pengguna berdasarkan filter Anda.")
+        st.warning("Tidak ada data untuk ditampilkan di tampilan Analisis Pengguna berdasarkan filter Anda.")
 
-with tab4:
+def render_time_of_day_view():
     st.header("🔬 Analisis Lanjutan: Segmentasi Pengguna Berdasarkan Waktu Penggunaan Harian")
     st.markdown("Analisis ini mengelompokkan jam dalam sehari menjadi empat segmen waktu...")
-    if not hour_data_filtered.empty and not hour_data_filtered[['hr', 'cnt_display', 'casual', 'registered', 'temp_actual', 'weather_condition']].isnull().all().all():
-        def assign_time_of_day(hr_val):
-            if 5 <= hr_val <= 10: return 'Pagi (05-10)'
-            elif 11 <= hr_val <= 15: return 'Siang (11-15)'
-            elif 16 <= hr_val <= 20: return 'Sore (16-20)'
-            else: return 'Malam (21-04)'
-        adv_analysis_df = hour_data_filtered.copy()
-        adv_analysis_df['time_of_day'] = adv_analysis_df['hr'].apply(assign_time_of_day)
-
-        time_of_day_analysis_df = adv_analysis_df.groupby('time_of_day').agg(
-            avg_total_users=('cnt_display', 'mean'), avg_casual_users=('casual', 'mean'),
-            avg_registered_users=('registered', 'mean'), avg_temp_actual=('temp_actual', 'mean')
-        ).reindex(TIME_OF_DAY_ORDER).dropna(how='all')
+    if has_hour_data and not hour_df[['hr', count_column_to_display, 'casual', 'registered', 'temp_actual', 'weather_condition']].take(hour_positions).isnull().all().all():
+        time_of_day_analysis_df = cached_aggregate(time_of_day_summary, count_column_to_display)
 
         if not time_of_day_analysis_df.empty:
-            fig_adv, axes = plt.subplots(2, 2, figsize=(16, 12))
-            fig_adv.suptitle(f'Karakteristik Penyewaan Sepeda per Segmen Waktu Harian ({selected_user_type})', fontsize=18, y=1.02)
-
-            sns.barplot(x=time_of_day_analysis_df.index, y='avg_total_users', data=time_of_day_analysis_df, ax=axes[0,0], palette='Blues_r', order=[t for t in TIME_OF_DAY_ORDER if t in time_of_day_analysis_df.index])
-            axes[0,0].set_title('Rata-rata Total Penyewaan per Segmen Waktu', fontsize=14); axes[0,0].set_xlabel('time_of_day', fontsize=12); axes[0,0].set_ylabel(f'Rata-rata Penyewaan ({selected_user_type})', fontsize=12)
-            plt.setp(axes[0,0].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
-            axes[0,0].grid(True, axis='y', linestyle='--', alpha=0.7)
-
-            if selected_user_type == "Semua":
-                time_of_day_melted_adv = time_of_day_analysis_df[['avg_casual_users', 'avg_registered_users']].reset_index().melt(id_vars='time_of_day', var_name='user_type', value_name='avg_users')
-                time_of_day_melted_adv['user_type'] = time_of_day_melted_adv['user_type'].map({'avg_casual_users':'Casual', 'avg_registered_users':'Registered'})
-                if not time_of_day_melted_adv.empty:
-                    sns.barplot(x='time_of_day', y='avg_users', hue='user_type', data=time_of_day_melted_adv, ax=axes[0,1], palette={'Casual': 'lightcoral', 'Registered': 'steelblue'}, order=[t for t in TIME_OF_DAY_ORDER if t in time_of_day_melted_adv['time_of_day'].values])
-                    axes[0,1].legend(title="Tipe Pengguna")
-                else: axes[0,1].text(0.5, 0.5, 'Data pengguna tidak cukup', ha='center', va='center', transform=axes[0,1].transAxes)
-            else:
-                axes[0,1].text(0.5, 0.5, f'Menampilkan data untuk\n{selected_user_type}', ha='center', va='center', transform=axes[0,1].transAxes, fontsize=12)
-            axes[0,1].set_title('Rata-rata Pengguna Casual vs Registered per Segmen Waktu', fontsize=14); axes[0,1].set_xlabel('time_of_day', fontsize=12); axes[0,1].set_ylabel('Rata-rata Penyewaan (Semua)', fontsize=12)
-            plt.setp(axes[0,1].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
-            axes[0,1].grid(True, axis='y', linestyle='--', alpha=0.7)
-
-            sns.barplot(x=time_of_day_analysis_df.index, y='avg_temp_actual', data=time_of_day_analysis_df, ax=axes[1,0], palette='Oranges_r', order=[t for t in TIME_OF_DAY_ORDER if t in time_of_day_analysis_df.index])
-            axes[1,0].set_title('Rata-rata Suhu Aktual (°C) per Segmen Waktu', fontsize=14); axes[1,0].set_xlabel('time_of_day', fontsize=12); axes[1,0].set_ylabel('Rata-rata Suhu (°C)', fontsize=12)
-            plt.setp(axes[1,0].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
-            axes[1,0].grid(True, axis='y', linestyle='--', alpha=0.7)
-
-            weather_counts_by_time = adv_analysis_df.groupby(['time_of_day', 'weather_condition']).size().unstack(fill_value=0)
-            if not weather_counts_by_time.empty:
-                ordered_weather_cols_adv = [w for w in WEATHER_ORDER if w in weather_counts_by_time.columns]
-                weather_counts_by_time = weather_counts_by_time.reindex(columns=ordered_weather_cols_adv, fill_value=0)
-                weather_proportions_by_time = weather_counts_by_time.apply(lambda x: x / x.sum() * 100 if x.sum() > 0 else x, axis=1).reindex(TIME_OF_DAY_ORDER).dropna(how='all')
-                if not weather_proportions_by_time.empty and not weather_proportions_by_time.isnull().all().all():
-                    weather_proportions_by_time.plot(kind='bar', stacked=True, ax=axes[1,1], colormap='Spectral', width=0.8)
-                    axes[1,1].set_title('Proporsi Kondisi Cuaca (%) per Segmen Waktu', fontsize=14); axes[1,1].set_xlabel('time_of_day', fontsize=12); axes[1,1].set_ylabel('Persentase (%)', fontsize=12)
-                    plt.setp(axes[1,1].get_xticklabels(), rotation=20, ha="right", rotation_mode="anchor")
-                    axes[1,1].legend(title='Kondisi Cuaca', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize='small'); axes[1,1].grid(True, axis='y', linestyle='--', alpha=0.7)
-                else: axes[1,1].text(0.5, 0.5, 'Tidak ada data proporsi cuaca', ha='center', va='center', transform=axes[1,1].transAxes)
-            else: axes[1,1].text(0.5, 0.5, 'Tidak ada data proporsi cuaca (pivot)', ha='center', va='center', transform=axes[1,1].transAxes)
-            plt.tight_layout(rect=[0, 0, 1, 0.97]); st.pyplot(fig_adv)
+            weather_proportions_by_time = cached_aggregate(weather_shares_by_time_of_day)
+            show_chart('time_of_day_summary', time_of_day_analysis_df, weather_proportions_by_time, selected_user_type)
         else:
             st.info("Tidak ada data yang cukup untuk analisis lanjutan berdasarkan segmen waktu dengan filter saat ini.")
     else:
         st.warning("Tidak ada data atau kolom yang dibutuhkan untuk Analisis Lanjutan berdasarkan filter Anda.")
 
+def render_forecast_view():
+    from forecasting import climatology, scenario_grid, scenario_summary
+
+    st.header("🔮 Prakiraan Permintaan per Jam")
+    st.markdown(
+        "Prakiraan penyewaan per jam untuk beberapa hari ke depan dari model yang dilatih pada seluruh data per jam "
+        "(filter sidebar selain jenis pengguna tidak berlaku di sini). Setiap skenario adalah kombinasi kondisi cuaca "
+        "dan selisih suhu terhadap rata-rata historis pada bulan & jam yang sama."
+    )
+    # Model dilatih dari hour_data_clean.csv, juga saat dashboard memakai dataset terpartisi
+    live_snapshot = snapshot if partitioned_dataset is None else get_live_dataset().refresh()
+    forecaster = get_forecaster()
+    with timed('forecast:sync', 'forecast'):
+        forecaster.sync(live_snapshot.hour_data)
+    climate = aggregation_cache.get_or_compute(
+        ('forecast_climatology', live_snapshot.version), lambda: climatology(live_snapshot.hour_data)
+    )
+
+    col_start, col_days, col_weather, col_temp = st.columns([2, 1, 3, 2])
+    forecast_start = col_start.date_input(
+        "Mulai tanggal:", value=(forecaster.trained_until_date + timedelta(days=1)).date(), key="forecast_start"
+    )
+    forecast_days = col_days.number_input("Jumlah hari:", min_value=1, max_value=MAX_FORECAST_DAYS, value=7, key="forecast_days")
+    forecast_weather = col_weather.multiselect(
+        "Kondisi cuaca:", options=WEATHER_ORDER, default=WEATHER_ORDER[:3], key="forecast_weather"
+    )
+    temp_range = col_temp.slider("Selisih suhu (°C):", min_value=-10, max_value=10, value=(-4, 4), key="forecast_temp")
+    if not forecast_weather:
+        st.info("Pilih minimal satu kondisi cuaca untuk membuat skenario.")
+        return
+
+    # Seluruh grid skenario diprediksi dalam satu panggilan (satu perkalian matriks untuk casual & registered)
+    with timed('forecast:predict', 'forecast'):
+        predict_start = time.perf_counter()
+        grid = scenario_grid(forecast_start, forecast_days, forecast_weather, range(temp_range[0], temp_range[1] + 1), climate)
+        forecast = forecaster.predict(grid)
+        predict_ms = (time.perf_counter() - predict_start) * 1000
+    n_scenarios = grid['scenario'].nunique()
+    st.caption(
+        f"{n_scenarios} skenario x {forecast_days * 24} jam = {len(grid)} prediksi dalam {predict_ms:.0f} ms | "
+        f"Model: data s.d. {forecaster.trained_until_date:%d %b %Y}, {forecaster.rows_seen} baris, "
+        f"{FORECAST_UPDATE_LABELS.get(forecaster.last_update, '-')} (pelatihan terakhir {forecaster.trained_at:%d %b %H:%M})"
+    )
+
+    scenarios = list(dict.fromkeys(grid['scenario']))
+    baseline_scenarios = list(dict.fromkeys(grid.loc[grid['temp_offset'] == 0, 'scenario']))
+    shown_scenarios = st.multiselect(
+        "Skenario pada chart:", options=scenarios, default=baseline_scenarios or scenarios[:1], key="forecast_shown"
+    )
+    if shown_scenarios:
+        forecast_key = (
+            'forecast', live_snapshot.version, forecaster.trained_until, forecaster.rows_seen,
+            str(forecast_start), forecast_days, tuple(shown_scenarios), count_column_to_display
+        )
+        show_chart(
+            'demand_forecast', forecast[forecast['scenario'].isin(shown_scenarios)],
+            count_column_to_display, selected_user_type, figure_key=forecast_key
+        )
+
+    st.markdown("##### Total per Hari & Jam Puncak per Skenario")
+    st.dataframe(scenario_summary(forecast, count_column_to_display), hide_index=True)
+
+def render_anomaly_view():
+    st.header("🚨 Deteksi Anomali Penyewaan per Jam")
+    st.markdown(
+        "Setiap jam dibandingkan dengan profil normal untuk kombinasi jam, hari, dan kondisi cuaca yang sama "
+        "(rata-rata & varians bergerak dari total penyewaan). Jam yang menyimpang jauh dari profilnya ditandai sebagai "
+        "lonjakan (mis. acara) atau penurunan (mis. libur atau gangguan stasiun). Filter tanggal, kota, cuaca, dan jam berlaku."
+    )
+    # Baseline per kota: pada dataset terpartisi seluruh kota dipantau (snapshot semua partisi, terlepas dari
+    # filter sidebar), selain itu hour_data_clean.csv. Baris baru diproses bertahap saat data bertambah.
+    stream_data = snapshot.hour_data if partitioned_dataset is None else partitioned_dataset.snapshot().hour_data
+    detector = get_anomaly_detector()
+    with timed('anomaly:sync', 'anomaly'):
+        detector.sync(stream_data)
+    events = aggregation_cache.get_or_compute(
+        ('anomaly_events', detector.updated_at, detector.records_seen, detector.events_flagged), detector.events
+    )
+    st.caption(
+        f"{detector.records_seen} jam diproses s.d. {detector.processed_until_date:%d %b %Y}, "
+        f"{detector.events_flagged} kejadian ditandai (|z| ≥ {Z_THRESHOLD:g} dan selisih ≥ {MIN_COUNT_DEVIATION} penyewaan) | "
+        f"{ANOMALY_UPDATE_LABELS.get(detector.last_update, '-')} (pembaruan terakhir {detector.updated_at:%d %b %H:%M})"
+    )
+
+    col_direction, col_z = st.columns([2, 1])
+    directions = col_direction.multiselect(
+        "Jenis kejadian:", options=['lonjakan', 'penurunan'], default=['lonjakan', 'penurunan'], key="anomaly_directions"
+    )
+    min_z = col_z.slider("|z| minimum:", min_value=Z_THRESHOLD, max_value=15.0, value=Z_THRESHOLD, step=0.5, key="anomaly_min_z")
+    mask = events['direction'].isin(directions) & (events['z_score'].abs() >= min_z)
+    if filter_selection['start_date'] and filter_selection['end_date']:
+        event_dates = events['dteday'].dt.date
+        mask &= (event_dates >= filter_selection['start_date']) & (event_dates <= filter_selection['end_date'])
+    if partitioned_dataset is not None:
+        mask &= events['city'].isin(selected_city)
+    mask &= events['weather_condition'].isin(selected_weather)
+    if selected_hours:
+        mask &= events['hr'].isin(selected_hours)
+    shown = events[mask]
+
+    col_spike, col_drop = st.columns(2)
+    col_spike.metric("Lonjakan", int((shown['direction'] == 'lonjakan').sum()))
+    col_drop.metric("Penurunan", int((shown['direction'] == 'penurunan').sum()))
+    if shown.empty:
+        st.info("Tidak ada kejadian anomali untuk filter yang dipilih.")
+    else:
+        anomaly_key = ('anomaly', detector.updated_at, detector.records_seen, filter_key, tuple(directions), min_z)
+        show_chart('anomaly_events', shown, figure_key=anomaly_key)
+        st.markdown("##### Kejadian Paling Menyimpang")
+        st.dataframe(
+            shown.reindex(shown['z_score'].abs().sort_values(ascending=False).index)[
+                ['timestamp', 'weekday_name', 'weather_condition', 'cnt', 'expected', 'z_score', 'direction']
+            ],
+            hide_index=True,
+        )
+    if not events.empty:
+        st.download_button(
+            "⬇️ Unduh log kejadian (CSV)", data=events.to_csv(index=False), file_name="anomaly_events.csv",
+            mime="text/csv", key="anomaly_download"
+        )
+
+VIEWS = {
+    "📈 Pola Waktu & Musiman": (render_time_view, [
+        'hourly_pattern', 'season_pattern', 'weekday_pattern', 'month_pattern', 'daily_trend',
+        'hour_weekday_heatmap', 'hour_month_heatmap', 'hour_season_heatmap',
+    ]),
+    "☀️ Pengaruh Cuaca": (render_weather_view, ['weather_impact', 'weather_params', 'hour_weather_heatmap']),
+    "👥 Analisis Pengguna": (render_user_view, ['user_type_totals', 'user_type_hourly', 'user_type_workingday', 'user_type_season', 'hourly_pattern']),
+    "🔬 Analisis Lanjutan (Segmen Waktu)": (render_time_of_day_view, ['time_of_day_summary', 'weather_shares_by_time_of_day']),
+    "🔮 Prakiraan Permintaan": (render_forecast_view, []),
+    "🚨 Deteksi Anomali": (render_anomaly_view, []),
+}
+
+# Pemilih tampilan berada di dalam fragment: berpindah tampilan hanya menjalankan ulang fragment ini,
+# sedangkan perubahan filter di sidebar menjalankan ulang seluruh skrip (tetap hanya tampilan aktif)
+@st.fragment
+def render_active_view():
+    if st.session_state.pop("cross_filter_changed", False):
+        st.rerun() # Rerun penuh: filter dari pilihan chart berlaku untuk sidebar, tabel, dan semua chart
+    with perf_run('active_view', perf_metrics, backend=QUERY_BACKEND, charts=CHART_BACKEND, data_version=snapshot.version):
+        active_view = st.radio(
+            "Tampilan:", options=list(VIEWS), horizontal=True, key="active_view", label_visibility="collapsed"
+        )
+        render_view, _ = VIEWS[active_view]
+        render_view()
+        warm_aggregates([name for view, (_, names) in VIEWS.items() if view != active_view for name in names])
+
+render_active_view()
+
+# --- Info Versi Data ---
+st.sidebar.markdown("---")
+data_age_minutes = int((datetime.now() - snapshot.loaded_at).total_seconds() // 60)
+st.sidebar.caption(
+    f"🗂️ Versi data: `{snapshot.version}` ({REFRESH_KIND_LABELS[snapshot.refresh_kind]})  \n"
+    f"Data s.d. {'-' if snapshot.data_until is None else f'{snapshot.data_until:%d %b %Y}'} | "
+    f"Dimuat {snapshot.loaded_at:%H:%M:%S} ({data_age_minutes} menit lalu)  \n"
+    f"Backend query: `{QUERY_BACKEND}` | Chart: `{CHART_BACKEND}`"
+)
+
 # --- Kesimpulan dan Rekomendasi ---
 st.sidebar.markdown("---")
 st.sidebar.info("Dashboard ini dibuat berdasarkan analisis dari Proyek Akhir Analisis Data Dicoding.")
 st.sidebar.markdown("Nama: Muhammad Husain Fadhlillah") # Ganti dengan nama Anda
 
+# --- Panel Admin (aktif dengan query parameter ?admin=1) ---
+if st.query_params.get("admin") == "1":
+    with st.sidebar.expander("🛠️ Panel Admin: Cache"):
+        for cache_label, cache in [("Agregasi", aggregation_cache), ("Figure", figure_cache)]:
+            cache_stats = cache.stats()
+            st.metric(f"Hit Rate {cache_label}", f"{cache_stats['hit_rate']:.1%}")
+            st.caption(
+                f"Hit: {cache_stats['hits']} | Miss: {cache_stats['misses']} | Eviction: {cache_stats['evictions']}"
+            )
+            st.caption(
+                f"Entri: {cache_stats['entries']} | Ukuran: {cache_stats['size_mb']:.2f} / {cache_stats['max_size_mb']:.0f} MB"
+            )
+        st.caption(f"Entri warm-start dimuat untuk versi data ini: {warm_start_entries}")
+        if st.button("Kosongkan Cache", key="clear_caches"):
+            aggregation_cache.clear()
+            figure_cache.clear()
+
+    with st.sidebar.expander("⏱️ Panel Admin: Performa"):
+        last_run = perf_metrics.last_run()
+        if last_run is None:
+            st.caption("Belum ada run yang selesai dicatat.")
+        else:
+            st.caption(
+                f"Run terakhir yang selesai: `{last_run['run']}` ({last_run['started_at']}) | "
+                f"{last_run['seconds'] * 1000:.0f} ms | Cache hit/miss: {last_run['cache']['hits']}/{last_run['cache']['misses']}"
+                + ("" if last_run['rss_mb'] is None else f" | RSS {last_run['rss_mb']:.0f} MB")
+            )
+            st.dataframe(stage_rows(last_run), hide_index=True)
+        regressions = version_comparison_rows(perf_metrics)
+        if regressions:
+            st.markdown("**Perbandingan dua versi data terakhir** (rasio > 1 berarti melambat)")
+            st.dataframe(regressions, hide_index=True)
+        st.caption("Tambahkan `&profile=1` pada URL untuk menjalankan cProfile pada satu rerun.")
+
 st.header("📌 Kesimpulan Utama & Rekomendasi Bisnis")
 with st.expander("Lihat Detail Kesimpulan dan Rekomendasi Strategis"):
     st.markdown("""
@@ -507,18 +698,83 @@ with st.expander("Lihat Detail Kesimpulan dan Rekomendasi Strategis"):
     1.  **Optimalisasi Operasional:** Fokus ketersediaan sepeda pada jam sibuk komuter (Registered) dan area rekreasi akhir pekan (Casual).
     2.  **Program Loyalitas & Akuisisi:** Konversi Casual ke Registered, program loyalitas untuk Registered.
     3.  **Inisiatif Musiman & Adaptasi Cuaca:** Promosi musim ramai, diskon musim sepi, mitigasi cuaca buruk.
-    4.  **Penempatan & Alokasi Armada Cerdas:** Gunakan data heatmap untuk optimasi distribusi.
+    4.  **Penempatan & Alokasi Armada Cerdas:** Gunakan data heatmap dan tampilan Prakiraan Permintaan (per skenario cuaca) untuk optimasi distribusi.
+    5.  **Pemantauan Operasional:** Tindak lanjuti jam yang ditandai di tampilan Deteksi Anomali (penurunan tajam dapat menandakan gangguan stasiun, lonjakan menandakan acara).
     """)
 
-with st.expander("Tampilkan Data Tabel yang Telah Difilter"):
-    st.markdown("#### Data Per Jam (Filtered)")
-    if not hour_data_filtered.empty:
-        st.dataframe(hour_data_filtered[['dteday', 'season_name', 'year', 'month_name', 'hr', 'weekday_name', 'weather_condition', 'temp_actual', 'hum_actual', 'casual', 'registered', 'cnt_display']].head())
-        st.caption(f"Menampilkan {len(hour_data_filtered)} baris data per jam yang telah difilter.")
-    else: st.info("Tidak ada data per jam untuk ditampilkan berdasarkan filter yang dipilih.")
-
-    st.markdown("#### Data Harian (Filtered)")
-    if not day_data_filtered.empty:
-        st.dataframe(day_data_filtered[['dteday', 'season_name', 'year', 'month_name', 'weekday_name', 'weather_condition', 'temp_actual', 'hum_actual', 'casual', 'registered', 'cnt_display']].head())
-        st.caption(f"Menampilkan {len(day_data_filtered)} baris data harian yang telah difilter.")
-    else: st.info("Tidak ada data harian untuk ditampilkan berdasarkan filter yang dipilih.")
\ No newline at end of file
+# Tabel data dipaginasi di server: hanya satu halaman (kolom yang ditampilkan saja) yang dikirim ke browser
+def show_paged_table(title, table_id, df, filtered_positions, columns):
+    st.markdown(f"#### {title}")
+    if len(filtered_positions) == 0:
+        st.info("Tidak ada data untuk ditampilkan berdasarkan filter yang dipilih.")
+        return
+
+    col_search, col_sort, col_order, col_size = st.columns([3, 2, 1, 1])
+    query = col_search.text_input("Cari:", key=f"{table_id}_search", placeholder="mis. Summer, 2012-06, 17")
+    sort_column = col_sort.selectbox(
+        "Urutkan berdasarkan:", options=[None] + columns, key=f"{table_id}_sort",
+        format_func=lambda col: "(urutan asli)" if col is None else col
+    )
+    ascending = col_order.radio("Urutan:", options=["Naik", "Turun"], key=f"{table_id}_order") == "Naik"
+    page_size = col_size.selectbox("Baris/halaman:", options=PAGE_SIZES, key=f"{table_id}_page_size")
+
+    # Posisi baris hasil cari + urut di-cache per filter, sehingga pindah halaman hanya memotong array
+    table_signature = (table_id, filter_key, query.strip().lower(), sort_column, ascending)
+    with timed(f'{table_id}:positions', 'table'):
+        positions = aggregation_cache.get_or_compute(
+            ('table_positions',) + table_signature,
+            lambda: sort_positions(df, search_positions(df, query, columns, filtered_positions), sort_column, ascending)
+        )
+    n_pages = page_count(len(positions), page_size)
+    # Kunci halaman ikut jumlah halaman agar kembali ke halaman 1 saat hasil pencarian berubah
+    page = st.number_input(
+        f"Halaman (dari {n_pages}):", min_value=1, max_value=n_pages, value=1, step=1, key=f"{table_id}_page_{n_pages}"
+    )
+    with timed(f'{table_id}:page', 'table'):
+        st.dataframe(page_rows(df, positions, columns, count_column_to_display, page, page_size), hide_index=True)
+    st.caption(f"Menampilkan halaman {page} dari {n_pages} ({len(positions)} dari {len(filtered_positions)} baris yang telah difilter).")
+
+    # Ekspor penuh dibuat hanya saat diminta, ditulis per chunk ke file sementara
+    export_state_key = f"{table_id}_export"
+    col_format, col_export = st.columns([1, 3])
+    export_format = col_format.selectbox("Format ekspor:", options=EXPORT_FORMATS, key=f"{table_id}_export_format")
+    if col_export.button(f"Siapkan ekspor {len(positions)} baris", key=f"{table_id}_export_button"):
+        previous_export = st.session_state.pop(export_state_key, None)
+        if previous_export and os.path.exists(previous_export['path']):
+            os.remove(previous_export['path'])
+        st.session_state[export_state_key] = {
+            'path': export_table(df, positions, columns, count_column_to_display, export_format),
+            'signature': table_signature + (export_format,),
+        }
+    export = st.session_state.get(export_state_key)
+    if export and export['signature'] == table_signature + (export_format,) and os.path.exists(export['path']):
+        # File baru dibaca saat tombol diklik, bukan di setiap rerun fragment tabel
+        col_export.download_button(
+            f"⬇️ Unduh {export_format.upper()}", data=partial(read_export, export['path']), file_name=f"{table_id}_filtered.{export_format}",
+            mime="text/csv" if export_format == 'csv' else "application/octet-stream", key=f"{table_id}_download"
+        )
+
+# Tabel data hanya dibuat saat toggle aktif; interaksi tabel hanya menjalankan ulang fragment ini
+@st.fragment
+def render_filtered_tables():
+    if not st.toggle("Tampilkan Data Tabel yang Telah Difilter", key="show_tables"):
+        return
+    with perf_run('tables', perf_metrics, backend=QUERY_BACKEND, charts=CHART_BACKEND, data_version=snapshot.version):
+        show_paged_table("Data Per Jam (Filtered)", "hour_data", hour_df, hour_positions, HOUR_TABLE_COLUMNS)
+        # Tabel harian tidak punya kolom jam, jadi tidak ditampilkan selama filter rentang jam aktif
+        if selected_hours:
+            st.markdown("#### Data Harian (Filtered)")
+            st.info("Data harian berisi total per hari sehingga tidak dapat difilter per jam. Kosongkan filter jam (0-23) untuk menampilkannya.")
+        else:
+            show_paged_table("Data Harian (Filtered)", "day_data", day_df, day_positions, DAY_TABLE_COLUMNS)
+
+render_filtered_tables()
+
+# --- Akhir Rerun: Catat Performa ---
+perf_metrics.observe(perf.finish())
+if is_building():
+    save_entries(snapshot.version, filter_key, aggregation_cache, figure_cache)
+if profiler is not None:
+    stop_profiler(profiler)
+    with st.expander("🔍 Hasil cProfile (rerun ini, diurutkan berdasarkan waktu kumulatif)", expanded=True):
+        st.code(profile_report(profiler), language=None)
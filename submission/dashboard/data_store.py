@@ -0,0 +1,105 @@
+# Data store kolumnar (Parquet) untuk dashboard.
+# File CSV bersih dikonversi sekali (build step) menjadi Parquet dengan tipe data yang sudah
+# dioptimalkan: kolom teks sebagai kategori, counter sebagai integer kecil, dan 'dteday'
+# sebagai datetime asli. Dashboard membaca Parquet dan hanya kembali ke CSV jika store belum ada
+# atau lebih tua dari CSV sumbernya.
+#
+# Build step (dari direktori `submission`):
+#     python dashboard/data_store.py
+import os
+
+import pandas as pd
+
+from constants import MONTH_ORDER, SEASON_ORDER, WEATHER_ORDER, WEEKDAY_ORDER
+from time_segments import add_time_of_day
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HOUR_CSV_PATH = os.path.join(SCRIPT_DIR, 'hour_data_clean.csv')
+DAY_CSV_PATH = os.path.join(SCRIPT_DIR, 'day_data_clean.csv')
+HOUR_STORE_PATH = os.path.join(SCRIPT_DIR, 'hour_data.parquet')
+DAY_STORE_PATH = os.path.join(SCRIPT_DIR, 'day_data.parquet')
+
+# Kolom teks -> kategori (dengan urutan kategori yang sama seperti urutan plot)
+CATEGORY_ORDERS = {
+    'season_name': SEASON_ORDER,
+    'month_name': MONTH_ORDER,
+    'weekday_name': WEEKDAY_ORDER,
+    'weather_condition': WEATHER_ORDER,
+    'year': None, # Kategori diambil dari nilai yang ada di data
+}
+# Kode kategorikal dari dataset asli (nilai kecil, cukup int8)
+CODE_COLUMNS = ['season', 'yr', 'mnth', 'hr', 'holiday', 'weekday', 'workingday', 'weathersit']
+# Counter penyewaan dan id baris
+COUNTER_COLUMNS = ['instant', 'casual', 'registered', 'cnt', 'total_users']
+
+
+def optimize_dtypes(df):
+    if 'dteday' in df and not pd.api.types.is_datetime64_any_dtype(df['dteday']):
+        df['dteday'] = pd.to_datetime(df['dteday'])
+
+    for col, order in CATEGORY_ORDERS.items():
+        if col not in df:
+            continue
+        if order is None:
+            df[col] = df[col].astype('category')
+        else:
+            df[col] = df[col].astype(pd.CategoricalDtype(categories=order))
+
+    for col in CODE_COLUMNS + COUNTER_COLUMNS:
+        if col in df and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+
+    return df
+
+
+def read_clean_csv(path):
+    return optimize_dtypes(pd.read_csv(path, parse_dates=['dteday']))
+
+
+def concat_tables(base, delta):
+    # Menyamakan kategori sebelum concat agar kolom kategori tidak berubah menjadi object
+    # (mis. saat data baru membawa tahun yang belum ada di data lama)
+    for col in base.columns:
+        base_dtype, delta_dtype = base[col].dtype, delta[col].dtype
+        if isinstance(base_dtype, pd.CategoricalDtype) and isinstance(delta_dtype, pd.CategoricalDtype) and base_dtype != delta_dtype:
+            categories = base_dtype.categories.append(delta_dtype.categories.difference(base_dtype.categories, sort=False))
+            dtype = pd.CategoricalDtype(categories=categories)
+            base = base.assign(**{col: base[col].astype(dtype)})
+            delta = delta.assign(**{col: delta[col].astype(dtype)})
+    return pd.concat([base, delta], ignore_index=True)
+
+
+def store_is_fresh(store_path, csv_path):
+    # Store Parquet hanya dipakai jika tidak lebih tua dari CSV sumbernya (mis. setelah ingest baru)
+    if not os.path.exists(store_path):
+        return False
+    return not os.path.exists(csv_path) or os.path.getmtime(store_path) >= os.path.getmtime(csv_path)
+
+
+def build_store(hour_csv_path=HOUR_CSV_PATH, day_csv_path=DAY_CSV_PATH,
+                hour_store_path=HOUR_STORE_PATH, day_store_path=DAY_STORE_PATH):
+    hour_data = read_clean_csv(hour_csv_path)
+    day_data = read_clean_csv(day_csv_path)
+    hour_data.to_parquet(hour_store_path, index=False)
+    day_data.to_parquet(day_store_path, index=False)
+    return hour_store_path, day_store_path
+
+
+def load_tables(hour_store_path=HOUR_STORE_PATH, day_store_path=DAY_STORE_PATH,
+                hour_csv_path=HOUR_CSV_PATH, day_csv_path=DAY_CSV_PATH):
+    # Store Parquet sudah menyimpan tipe data final, jadi tidak perlu parsing ulang
+    if store_is_fresh(hour_store_path, hour_csv_path) and store_is_fresh(day_store_path, day_csv_path):
+        hour_data, day_data = pd.read_parquet(hour_store_path), pd.read_parquet(day_store_path)
+    else:
+        # Fallback: store belum dibangun/kedaluwarsa, baca CSV dan optimalkan tipe datanya di memori
+        hour_data, day_data = read_clean_csv(hour_csv_path), read_clean_csv(day_csv_path)
+
+    # Segmen waktu dihitung saat load (bukan disimpan di store) agar mengikuti konfigurasi segmen terbaru
+    add_time_of_day(hour_data)
+    return hour_data, day_data
+
+
+if __name__ == '__main__':
+    for path in build_store():
+        print(f"Data store dibuat: {path}")
@@ -0,0 +1,167 @@
+# Versioning data dan refresh bertahap untuk dashboard.
+# Versi data ditentukan dari sidik file *_clean.csv (ukuran, mtime, dan hash blok terakhir file).
+# Jika file hanya bertambah di bagian akhir (append dari ingest.py), hanya byte baru yang dibaca lalu
+# tabel, cube, dan indeks filter diperbarui; jika file ditulis ulang, data dimuat ulang penuh.
+# Sesi yang sedang terhubung tetap memakai snapshot lama sampai snapshot baru selesai dibangun.
+import hashlib
+import io
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from data_store import DAY_CSV_PATH, DAY_STORE_PATH, HOUR_CSV_PATH, HOUR_STORE_PATH, concat_tables, load_tables, optimize_dtypes, store_is_fresh
+from filter_engine import FilterIndex
+from olap_cube import build_cube, merge_cube
+from shared_tables import share_table
+from time_segments import add_time_of_day
+
+TAIL_SIGNATURE_BYTES = 4096
+REFRESH_CHECK_INTERVAL = 5.0 # detik, agar os.stat tidak dipanggil di setiap rerun
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def file_fingerprint(path, size=None):
+    # `size` membatasi sidik ke bagian file yang sudah dibaca (lihat read_appended_rows)
+    stat = os.stat(path)
+    size = stat.st_size if size is None else size
+    tail = _read_range(path, max(0, size - TAIL_SIGNATURE_BYTES), size)
+    return {
+        'path': path,
+        'size': size,
+        'mtime_ns': stat.st_mtime_ns,
+        'tail_hash': hashlib.sha1(tail).hexdigest(),
+    }
+
+
+def is_unchanged(old, new):
+    return old['size'] == new['size'] and old['mtime_ns'] == new['mtime_ns']
+
+
+def is_append_only(old, new):
+    # File hanya bertambah jika ukurannya naik dan blok terakhir versi lama masih sama persis
+    if new['size'] < old['size']:
+        return False
+    old_tail = _read_range(new['path'], max(0, old['size'] - TAIL_SIGNATURE_BYTES), old['size'])
+    return hashlib.sha1(old_tail).hexdigest() == old['tail_hash']
+
+
+def version_id(fingerprints):
+    raw = '|'.join(f"{fp['size']}:{fp['mtime_ns']}:{fp['tail_hash']}" for fp in fingerprints)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:10]
+
+
+def read_appended_rows(fingerprint, new_size, columns):
+    # Hanya dibaca sampai '\n' terakhir: baris yang masih ditulis ingest.py dibaca pada refresh berikutnya.
+    # Mengembalikan (baris baru atau None, offset setelah '\n' terakhir = awal pembacaan berikutnya).
+    start = fingerprint['size']
+    data = _read_range(fingerprint['path'], start, new_size)
+    end = start + data.rfind(b'\n') + 1
+    data = data[:end - start]
+    if not data.strip():
+        return None, end
+    return optimize_dtypes(pd.read_csv(io.BytesIO(data), header=None, names=columns, parse_dates=['dteday'])), end
+
+
+class DataSnapshot:
+    def __init__(self, hour_data, day_data, cube, fingerprints, refresh_kind, hour_index=None, day_index=None, cube_index=None, hour_files=None):
+        self.hour_data = hour_data
+        self.day_data = day_data
+        self.cube = cube
+        self.fingerprints = fingerprints
+        self.refresh_kind = refresh_kind # 'full' atau 'incremental'
+        self.version = version_id(fingerprints)
+        self.loaded_at = datetime.now()
+        self.data_until = day_data['dteday'].max() if not day_data.empty else None
+        self.hour_index = hour_index if hour_index is not None else FilterIndex(hour_data)
+        self.day_index = day_index if day_index is not None else FilterIndex(day_data)
+        self.cube_index = cube_index if cube_index is not None else FilterIndex(cube)
+        # File per jam di balik snapshot ini, untuk backend query yang membaca file langsung (query_backend.py)
+        self.hour_files = hour_files or []
+
+
+class LiveDataset:
+    def __init__(self, hour_csv_path=HOUR_CSV_PATH, day_csv_path=DAY_CSV_PATH, check_interval=REFRESH_CHECK_INTERVAL):
+        self.hour_csv_path = hour_csv_path
+        self.day_csv_path = day_csv_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self.snapshot = self._full_load()
+
+    def _fingerprints(self):
+        return [file_fingerprint(self.hour_csv_path), file_fingerprint(self.day_csv_path)]
+
+    def _full_load(self):
+        # Sidik diambil sebelum load; baris yang masuk selama load disaring lewat 'instant' saat refresh berikutnya
+        fingerprints = self._fingerprints()
+        store_used = store_is_fresh(HOUR_STORE_PATH, self.hour_csv_path) and store_is_fresh(DAY_STORE_PATH, self.day_csv_path)
+        hour_files = [HOUR_STORE_PATH if store_used else self.hour_csv_path]
+
+        # Tabel dasar & cube dipetakan dari file Arrow bersama, satu salinan untuk semua sesi & proses;
+        # load_tables/build_cube hanya dijalankan jika versi ini belum ditulis oleh proses lain
+        # (atau oleh build warm-start, lihat warm_start.py)
+        loaded = {}
+        def load(name):
+            if not loaded:
+                loaded['hour'], loaded['day'] = load_tables(hour_csv_path=self.hour_csv_path, day_csv_path=self.day_csv_path)
+            return loaded[name]
+        hour_data = share_table('hour', version_id(fingerprints[:1]), lambda: load('hour'))
+        day_data = share_table('day', version_id(fingerprints[1:]), lambda: load('day'))
+        cube = share_table('cube', version_id(fingerprints[:1]), lambda: build_cube(hour_data))
+        return DataSnapshot(hour_data, day_data, cube, fingerprints, 'full', hour_files=hour_files)
+
+    def _incremental_load(self, new_fingerprints):
+        old = self.snapshot
+        hour_delta, hour_end = read_appended_rows(old.fingerprints[0], new_fingerprints[0]['size'], old.hour_data.columns.drop('time_of_day'))
+        day_delta, day_end = read_appended_rows(old.fingerprints[1], new_fingerprints[1]['size'], old.day_data.columns)
+        # Sidik snapshot hanya mencakup baris lengkap yang sudah dibaca, sehingga versi data dan awal
+        # pembacaan berikutnya tidak melewati baris yang terpotong
+        new_fingerprints = [file_fingerprint(self.hour_csv_path, hour_end), file_fingerprint(self.day_csv_path, day_end)]
+        if hour_delta is None and day_delta is None:
+            return old # hanya ada baris yang belum lengkap
+
+        hour_data, day_data, cube = old.hour_data, old.day_data, old.cube
+        if hour_delta is not None:
+            hour_delta = hour_delta[hour_delta['instant'] > hour_data['instant'].max()]
+        if hour_delta is not None and not hour_delta.empty:
+            add_time_of_day(hour_delta)
+            hour_data = share_table('hour', version_id(new_fingerprints[:1]), lambda: concat_tables(old.hour_data, hour_delta))
+            cube = merge_cube(cube, build_cube(hour_delta))
+        if day_delta is not None:
+            day_delta = day_delta[day_delta['instant'] > day_data['instant'].max()]
+        if day_delta is not None and not day_delta.empty:
+            day_data = share_table('day', version_id(new_fingerprints[1:]), lambda: concat_tables(old.day_data, day_delta))
+
+        # Indeks filter hanya dibangun ulang untuk tabel yang berubah
+        return DataSnapshot(
+            hour_data, day_data, cube, new_fingerprints, 'incremental',
+            hour_index=old.hour_index if hour_data is old.hour_data else None,
+            day_index=old.day_index if day_data is old.day_data else None,
+            cube_index=old.cube_index if cube is old.cube else None,
+            hour_files=[self.hour_csv_path],
+        )
+
+    def refresh(self, force=False):
+        # Mengembalikan snapshot terbaru; memeriksa perubahan file paling sering tiap `check_interval` detik
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return self.snapshot
+        with self._lock:
+            self._last_check = now
+            old_fingerprints = self.snapshot.fingerprints
+            new_fingerprints = self._fingerprints()
+            if all(is_unchanged(old, new) for old, new in zip(old_fingerprints, new_fingerprints)):
+                return self.snapshot
+            if all(is_append_only(old, new) for old, new in zip(old_fingerprints, new_fingerprints)):
+                self.snapshot = self._incremental_load(new_fingerprints)
+            else:
+                self.snapshot = self._full_load()
+            return self.snapshot
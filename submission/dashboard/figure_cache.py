@@ -0,0 +1,49 @@
+# Cache figure hasil render chart.
+# Figure Matplotlib/Seaborn dirender sekali menjadi byte PNG dengan kunci (id chart, hash filter, 'png'),
+# lalu langsung ditutup agar objek Figure tidak menumpuk di memori proses selama sesi berjalan lama.
+# Figure Plotly disimpan sebagai JSON ('json'); membentuk ulang Figure dari JSON jauh lebih murah
+# daripada membangunnya lewat plotly.express.
+# Penyimpanan memakai AggregationCache (LRU berbatas memori) dari agg_cache.py.
+import hashlib
+import io
+
+from agg_cache import AggregationCache
+from perf import timed
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024 # 128 MB
+# Sama dengan default savefig yang dipakai st.pyplot
+SAVEFIG_KWARGS = {'format': 'png', 'bbox_inches': 'tight', 'dpi': 200}
+
+
+def filter_hash(filter_key):
+    return hashlib.sha1(repr(filter_key).encode('utf-8')).hexdigest()[:16]
+
+
+def figure_to_png(fig):
+    # pyplot diimpor di sini (bukan di awal modul) agar cache PNG bisa dibuat & dibaca tanpa memuat Matplotlib
+    import matplotlib.pyplot as plt
+
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, **SAVEFIG_KWARGS)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class FigureCache(AggregationCache):
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, **kwargs):
+        super().__init__(max_bytes=max_bytes, **kwargs)
+
+    def get_or_render(self, chart_id, filter_key, draw_func, *args, output='png'):
+        # Draw dan serialisasi (PNG/JSON) dicatat sebagai stage terpisah (lihat perf.py)
+        def render():
+            with timed(f'{chart_id}:draw', 'draw'):
+                fig = draw_func(*args)
+            if output == 'json':
+                with timed(f'{chart_id}:to_json', 'serialize'):
+                    return fig.to_json()
+            with timed(f'{chart_id}:savefig', 'savefig'):
+                return figure_to_png(fig)
+
+        return self.get_or_compute((chart_id, filter_hash(filter_key), output), render)
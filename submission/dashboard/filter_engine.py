@@ -0,0 +1,74 @@
+# Filter engine berbasis bitmap untuk filter sidebar.
+# Saat data dimuat, setiap nilai kategori (tahun, musim, cuaca, jam) dibuatkan bitmap (bit per baris,
+# dipadatkan dengan np.packbits) dan kolom tanggal dibuatkan indeks terurut. Pilihan filter
+# digabungkan dengan operasi bit, lalu tabel dipotong sekali saja tanpa DataFrame perantara.
+import numpy as np
+import pandas as pd
+
+# Kolom kategori yang difilter dari sidebar (jam juga bisa dipilih langsung dari chart per jam)
+FILTER_COLUMNS = ['year', 'season_name', 'weather_condition', 'hr']
+
+
+class FilterIndex:
+    def __init__(self, df, date_column='dteday', category_columns=FILTER_COLUMNS):
+        self.n_rows = len(df)
+
+        # Indeks tanggal terurut: posisi baris diurutkan berdasarkan tanggal
+        dates = df[date_column].to_numpy()
+        self._date_order = np.argsort(dates, kind='stable')
+        self._sorted_dates = dates[self._date_order]
+
+        # Satu bitmap per nilai kategori
+        self._bitmaps = {}
+        for col in category_columns:
+            if col not in df:
+                continue
+            codes, uniques = pd.factorize(df[col])
+            self._bitmaps[col] = {
+                value: np.packbits(codes == code) for code, value in enumerate(uniques)
+            }
+
+    def _empty_bitmap(self):
+        return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+
+    def _date_bitmap(self, start_date, end_date):
+        lo = 0 if start_date is None else np.searchsorted(self._sorted_dates, np.datetime64(pd.Timestamp(start_date)), side='left')
+        hi = self.n_rows if end_date is None else np.searchsorted(self._sorted_dates, np.datetime64(pd.Timestamp(end_date)), side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self._date_order[lo:hi]] = True
+        return np.packbits(mask)
+
+    def _category_bitmap(self, col, values):
+        bitmap = self._empty_bitmap()
+        for value in values:
+            if value in self._bitmaps[col]:
+                bitmap |= self._bitmaps[col][value]
+        return bitmap
+
+    def select(self, start_date=None, end_date=None, **selections):
+        # Mengembalikan posisi baris (terurut) yang lolos semua filter.
+        # Pilihan kosong/None berarti kolom tersebut tidak difilter (sama seperti perilaku sidebar).
+        bitmap = None
+        if start_date is not None or end_date is not None:
+            bitmap = self._date_bitmap(start_date, end_date)
+        for col, values in selections.items():
+            if not values or col not in self._bitmaps:
+                continue
+            col_bitmap = self._category_bitmap(col, values)
+            bitmap = col_bitmap if bitmap is None else bitmap & col_bitmap
+
+        if bitmap is None:
+            return None # Tidak ada filter aktif: seluruh baris terpilih
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows))
+
+    def positions(self, start_date=None, end_date=None, **selections):
+        # Seperti select, tetapi selalu berupa array posisi (juga saat tidak ada filter aktif).
+        # Dipakai per sesi di atas tabel bersama agar tidak ada salinan tabel yang dibuat.
+        positions = self.select(start_date, end_date, **selections)
+        return np.arange(self.n_rows) if positions is None else positions
+
+    def apply(self, df, start_date=None, end_date=None, **selections):
+        positions = self.select(start_date, end_date, **selections)
+        if positions is None or len(positions) == self.n_rows:
+            return df
+        return df.take(positions)
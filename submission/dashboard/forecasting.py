@@ -0,0 +1,274 @@
+# Prakiraan permintaan per jam (casual & registered) untuk beberapa hari ke depan.
+# Model linear (SGDRegressor, log1p jumlah penyewaan) dilatih dari hour_data_clean.csv dengan fitur
+# jam x hari kerja, hari dalam seminggu, kondisi cuaca, suhu, dan kelembapan. Model disimpan ke
+# models/forecast.joblib dan dimuat sekali per proses; baris baru (instant lebih besar dari baris
+# terakhir yang dilatih) dipakai untuk melatih ulang secara bertahap dengan partial_fit.
+# Prediksi untuk seluruh grid skenario (cuaca x selisih suhu x jam) dihitung dalam satu perkalian
+# matriks untuk kedua target sekaligus.
+#
+# Latih ulang penuh & evaluasi (dari direktori `submission`):
+#     python dashboard/forecasting.py --retrain
+#     python dashboard/forecasting.py --evaluate-days 30
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+from itertools import product
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDRegressor
+
+from constants import WEATHER_ORDER
+from data_store import SCRIPT_DIR
+
+MODEL_DIR = os.path.join(SCRIPT_DIR, 'models')
+MODEL_PATH = os.path.join(MODEL_DIR, 'forecast.joblib')
+# Naikkan jika susunan fitur berubah, agar model lama tidak dimuat dengan fitur yang berbeda
+FEATURE_VERSION = 1
+TARGETS = ['casual', 'registered']
+INPUT_COLUMNS = ['hr', 'weekday', 'workingday', 'weathersit', 'temp_actual', 'hum_actual']
+
+# Susunan kolom matriks fitur
+HOUR_WORKINGDAY_OFFSET = 0 # 24 jam x 2 (libur/akhir pekan, hari kerja): pola puncak berbeda
+WEEKDAY_OFFSET = 48 # 7 hari (0 = Minggu, seperti kolom weekday pada dataset)
+WEATHER_OFFSET = 55 # 4 kondisi cuaca (weathersit 1-4)
+NUMERIC_OFFSET = 59 # suhu, suhu^2, kelembapan (diskalakan dengan konstanta tetap)
+N_FEATURES = 62
+# Skala tetap (bukan dihitung dari data) agar partial_fit pada data baru memakai fitur yang sama
+TEMP_CENTER, TEMP_SCALE = 15.0, 10.0
+HUM_CENTER, HUM_SCALE = 60.0, 20.0
+
+# Bobot sampel meluruh dengan umur data agar level permintaan mengikuti periode terbaru
+RECENCY_HALF_LIFE_DAYS = 180
+FULL_FIT_MAX_ITER = 200
+INCREMENTAL_EPOCHS = 5
+
+
+def feature_matrix(hr, weekday, workingday, weathersit, temp_actual, hum_actual):
+    # Semua argumen berupa array sepanjang n baris; hasilnya matriks float n x N_FEATURES
+    hr, weekday, workingday = (np.asarray(a, dtype=np.int64) for a in (hr, weekday, workingday))
+    weathersit = np.clip(np.asarray(weathersit, dtype=np.int64), 1, len(WEATHER_ORDER))
+    rows = np.arange(len(hr))
+    X = np.zeros((len(hr), N_FEATURES))
+    X[rows, HOUR_WORKINGDAY_OFFSET + hr + 24 * workingday] = 1.0
+    X[rows, WEEKDAY_OFFSET + weekday] = 1.0
+    X[rows, WEATHER_OFFSET + weathersit - 1] = 1.0
+    temp = (np.asarray(temp_actual, dtype=float) - TEMP_CENTER) / TEMP_SCALE
+    X[:, NUMERIC_OFFSET] = temp
+    X[:, NUMERIC_OFFSET + 1] = temp * temp
+    X[:, NUMERIC_OFFSET + 2] = (np.asarray(hum_actual, dtype=float) - HUM_CENTER) / HUM_SCALE
+    return X
+
+
+def frame_features(df):
+    return feature_matrix(*(df[col].to_numpy() for col in INPUT_COLUMNS))
+
+
+def recency_weights(dates):
+    age_days = (dates.max() - dates).dt.days.to_numpy()
+    return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def new_regressor():
+    return SGDRegressor(
+        loss='squared_error', penalty='l2', alpha=1e-5, learning_rate='invscaling', eta0=0.05,
+        max_iter=FULL_FIT_MAX_ITER, tol=1e-4, random_state=0,
+    )
+
+
+# --- Skenario ---
+def climatology(hour_data):
+    # Rata-rata suhu & kelembapan per (bulan, jam): nilai dasar cuaca untuk hari yang diprakirakan
+    grouped = hour_data.groupby([hour_data['mnth'].astype(int), hour_data['hr'].astype(int)])[['temp_actual', 'hum_actual']].mean()
+    full_index = pd.MultiIndex.from_product([range(1, 13), range(24)])
+    # Bulan yang belum ada di data memakai rata-rata per jam dari seluruh data
+    grouped = grouped.reindex(full_index).fillna(grouped.groupby(level=1).mean().reindex(full_index, level=1))
+    return {col: grouped[col].to_numpy().reshape(12, 24) for col in ['temp_actual', 'hum_actual']}
+
+
+def scenario_grid(start_date, days, weather_conditions, temp_offsets, climate):
+    # Satu baris per (skenario, jam): skenario = kondisi cuaca x selisih suhu terhadap rata-rata bulan/jam.
+    # Hari libur nasional tidak diketahui untuk tanggal mendatang, jadi hari kerja = Senin-Jumat.
+    timestamps = pd.date_range(pd.Timestamp(start_date).normalize(), periods=days * 24, freq='h')
+    scenarios = list(product(weather_conditions, temp_offsets))
+    n_hours = len(timestamps)
+    hr = np.tile(timestamps.hour.to_numpy(), len(scenarios))
+    month = np.tile(timestamps.month.to_numpy(), len(scenarios))
+    weekday = np.tile(((timestamps.dayofweek + 1) % 7).to_numpy(), len(scenarios))
+    offsets = np.repeat([float(offset) for _, offset in scenarios], n_hours)
+    weathersit = np.repeat([WEATHER_ORDER.index(condition) + 1 for condition, _ in scenarios], n_hours).astype(np.int64)
+    return pd.DataFrame({
+        'timestamp': np.tile(timestamps.to_numpy(), len(scenarios)),
+        'scenario': np.repeat([f'{condition} | {offset:+g}°C' for condition, offset in scenarios], n_hours),
+        'weather_condition': np.repeat([condition for condition, _ in scenarios], n_hours),
+        'temp_offset': offsets,
+        'hr': hr,
+        'weekday': weekday,
+        'workingday': ((weekday >= 1) & (weekday <= 5)).astype(np.int64),
+        'weathersit': weathersit,
+        'temp_actual': climate['temp_actual'][month - 1, hr] + offsets,
+        'hum_actual': climate['hum_actual'][month - 1, hr],
+    })
+
+
+# --- Model ---
+class DemandForecaster:
+    def __init__(self, path=MODEL_PATH):
+        self.path = path
+        self.models = None # target -> SGDRegressor
+        self.trained_until = None # instant terakhir yang sudah dipakai melatih
+        self.trained_until_date = None
+        self.rows_seen = 0
+        self.trained_at = None
+        self.last_update = None # 'full' / 'incremental' / 'loaded'
+        self._lock = threading.Lock()
+        self._weights = None # (koefisien n_fitur x n_target, intercept per target) untuk prediksi
+
+    @property
+    def is_trained(self):
+        return self.models is not None
+
+    def load(self):
+        try:
+            state = joblib.load(self.path)
+        except (OSError, EOFError, ValueError):
+            return False
+        if state.get('feature_version') != FEATURE_VERSION:
+            return False
+        self.models = state['models']
+        self.trained_until, self.trained_until_date = state['trained_until'], state['trained_until_date']
+        self.rows_seen, self.trained_at = state['rows_seen'], state['trained_at']
+        self.last_update = 'loaded'
+        self._refresh_weights()
+        return True
+
+    def save(self):
+        # Ditulis ke file sementara lalu di-rename, agar proses lain tidak memuat file setengah jadi
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        joblib.dump({
+            'feature_version': FEATURE_VERSION, 'models': self.models, 'trained_until': self.trained_until,
+            'trained_until_date': self.trained_until_date, 'rows_seen': self.rows_seen, 'trained_at': self.trained_at,
+        }, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def fit(self, hour_data):
+        X = frame_features(hour_data)
+        weights = recency_weights(hour_data['dteday'])
+        self.models = {}
+        for target in TARGETS:
+            model = new_regressor()
+            model.fit(X, np.log1p(hour_data[target].to_numpy(dtype=float)), sample_weight=weights)
+            self.models[target] = model
+        self._mark_trained(hour_data, 'full', rows_seen=len(hour_data))
+
+    def partial_fit(self, new_rows):
+        X = frame_features(new_rows)
+        rng = np.random.default_rng(self.rows_seen)
+        for _ in range(INCREMENTAL_EPOCHS):
+            order = rng.permutation(len(new_rows))
+            for target, model in self.models.items():
+                model.partial_fit(X[order], np.log1p(new_rows[target].to_numpy(dtype=float)[order]))
+        self._mark_trained(new_rows, 'incremental', rows_seen=self.rows_seen + len(new_rows))
+
+    def _mark_trained(self, rows, kind, rows_seen):
+        self.trained_until = int(rows['instant'].max())
+        self.trained_until_date = rows['dteday'].max()
+        self.rows_seen = rows_seen
+        self.trained_at = datetime.now()
+        self.last_update = kind
+        self._refresh_weights()
+
+    def _refresh_weights(self):
+        self._weights = (
+            np.column_stack([self.models[target].coef_ for target in TARGETS]),
+            np.array([self.models[target].intercept_[0] for target in TARGETS]),
+        )
+
+    def sync(self, hour_data):
+        # Memastikan model mengikuti data: dimuat dari file jika ada, dilatih penuh jika belum ada atau
+        # data ditulis ulang (instant terakhir mundur), dan dilatih bertahap jika ada baris baru.
+        # Mengembalikan jenis pembaruan yang terjadi ('full'/'incremental'/'loaded') atau None.
+        with self._lock:
+            latest = int(hour_data['instant'].max())
+            loaded = False
+            if not self.is_trained:
+                loaded = self.load()
+                if not loaded:
+                    self.fit(hour_data)
+                    self.save()
+                    return 'full'
+            if latest < self.trained_until:
+                self.fit(hour_data)
+                self.save()
+                return 'full'
+            if latest > self.trained_until:
+                self.partial_fit(hour_data[hour_data['instant'] > self.trained_until])
+                self.save()
+                return 'incremental'
+            return 'loaded' if loaded else None
+
+    def predict(self, grid):
+        # Satu perkalian matriks untuk semua baris grid dan kedua target
+        coef, intercept = self._weights
+        predicted = np.expm1(frame_features(grid) @ coef + intercept).clip(min=0)
+        result = grid.copy()
+        for i, target in enumerate(TARGETS):
+            result[target] = predicted[:, i]
+        result['cnt'] = result['casual'] + result['registered']
+        return result
+
+
+def scenario_summary(forecast, count_column):
+    # Total per hari dan jam puncak untuk setiap skenario
+    daily = forecast.assign(tanggal=forecast['timestamp'].dt.date)
+    peak_rows = daily.loc[daily.groupby(['scenario', 'tanggal'])[count_column].idxmax()]
+    summary = daily.groupby(['scenario', 'tanggal'], sort=False)[count_column].sum().round().astype(int).rename('total')
+    peaks = peak_rows.set_index(['scenario', 'tanggal'])
+    return pd.DataFrame({
+        'total': summary,
+        'jam_puncak': peaks['hr'],
+        'puncak': peaks[count_column].round().astype(int),
+    }).reset_index()
+
+
+# --- CLI ---
+def evaluate(hour_data, holdout_days):
+    # Latih dengan semua data kecuali `holdout_days` hari terakhir (cuaca aktual diketahui), lalu hitung MAE
+    cutoff = hour_data['dteday'].max() - pd.Timedelta(days=holdout_days - 1)
+    train, test = hour_data[hour_data['dteday'] < cutoff], hour_data[hour_data['dteday'] >= cutoff]
+    forecaster = DemandForecaster(path=None)
+    forecaster.fit(train)
+    predicted = forecaster.predict(test[INPUT_COLUMNS])
+    for target in TARGETS + ['cnt']:
+        actual = test[target].to_numpy(dtype=float)
+        mae = np.abs(predicted[target].to_numpy() - actual).mean()
+        print(f"{target:>10}: MAE {mae:7.1f} per jam (rata-rata aktual {actual.mean():.1f}) pada {holdout_days} hari terakhir")
+
+
+def main():
+    from data_version import LiveDataset
+
+    parser = argparse.ArgumentParser(description="Model prakiraan permintaan per jam (casual & registered).")
+    parser.add_argument('--retrain', action='store_true', help="Latih ulang penuh dari hour_data_clean.csv dan simpan model.")
+    parser.add_argument('--evaluate-days', type=int, help="Evaluasi MAE pada N hari terakhir (model dilatih tanpa hari tersebut).")
+    args = parser.parse_args()
+
+    hour_data = LiveDataset().snapshot.hour_data
+    if args.evaluate_days:
+        evaluate(hour_data, args.evaluate_days)
+    if args.retrain:
+        forecaster = DemandForecaster()
+        start = time.perf_counter()
+        forecaster.fit(hour_data)
+        forecaster.save()
+        print(f"Model dilatih dari {forecaster.rows_seen} baris dalam {time.perf_counter() - start:.1f} detik -> {forecaster.path}")
+    if not args.evaluate_days and not args.retrain:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+# Pipeline ingestion bertahap (chunked) untuk data mentah bike sharing.
+# Mereproduksi langkah cleaning di notebook.ipynb (mapping kategori, denormalisasi suhu/kelembaban/
+# angin, total & proporsi pengguna) sebagai rangkaian generator per chunk, sehingga memori tetap
+# konstan berapa pun ukuran file mentah. Baris yang 'instant'-nya atau jamnya (dteday, hr) sudah pernah
+# di-ingest dilewati, jadi file mentah baru (harian) cukup ditambahkan ke *_clean.csv tanpa memproses
+# ulang histori.
+#
+# Penggunaan (dari direktori `submission`):
+#     python dashboard/ingest.py --hour data/hour.csv --day data/day.csv
+import argparse
+import calendar
+import json
+import os
+
+import pandas as pd
+
+from data_store import DAY_CSV_PATH, HOUR_CSV_PATH, SCRIPT_DIR
+
+DEFAULT_CHUNKSIZE = 50_000
+STATE_PATH = os.path.join(SCRIPT_DIR, 'ingest_state.json')
+
+# Mapping kategori (sama seperti di notebook)
+SEASON_MAP = {1: 'Spring', 2: 'Summer', 3: 'Fall', 4: 'Winter'}
+MONTH_MAP = {i: calendar.month_name[i] for i in range(1, 13)}
+WEEKDAY_MAP = {0: 'Sunday', 1: 'Monday', 2: 'Tuesday', 3: 'Wednesday', 4: 'Thursday', 5: 'Friday', 6: 'Saturday'}
+WEATHER_MAP = {
+    1: 'Clear/Few clouds',
+    2: 'Mist/Cloudy',
+    3: 'Light Snow/Rain',
+    4: 'Heavy Rain/Snow/Fog'
+}
+BASE_YEAR = 2011 # yr = 0 -> 2011, yr = 1 -> 2012, dst.
+
+
+# --- Transformasi per chunk ---
+def clean_chunk(chunk):
+    chunk = chunk.copy()
+
+    # 1. Ubah tipe data kolom datetime
+    chunk['dteday'] = pd.to_datetime(chunk['dteday'])
+
+    # 2. Mapping kolom kategorikal
+    chunk['season_name'] = chunk['season'].map(SEASON_MAP)
+    chunk['year'] = (chunk['yr'] + BASE_YEAR).astype(str)
+    chunk['month_name'] = chunk['mnth'].map(MONTH_MAP)
+    chunk['weekday_name'] = chunk['weekday'].map(WEEKDAY_MAP)
+    chunk['weather_condition'] = chunk['weathersit'].map(WEATHER_MAP)
+
+    # 3. Denormalisasi suhu, kelembaban, dan kecepatan angin
+    chunk['temp_actual'] = chunk['temp'] * (39 - (-8)) + (-8)
+    chunk['atemp_actual'] = chunk['atemp'] * (50 - (-16)) + (-16)
+    chunk['hum_actual'] = chunk['hum'] * 100
+    chunk['windspeed_actual'] = chunk['windspeed'] * 67
+
+    # 4. Tambahkan kolom total pengguna dan proporsi
+    chunk['total_users'] = chunk['casual'] + chunk['registered']
+    chunk['casual_proportion'] = chunk['casual'] / chunk['total_users'] * 100
+    chunk['registered_proportion'] = chunk['registered'] / chunk['total_users'] * 100
+    return chunk
+
+
+# --- Tahapan generator ---
+def read_raw_chunks(paths, chunksize=DEFAULT_CHUNKSIZE):
+    for path in paths:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def row_periods(chunk):
+    # Jam setiap baris (dteday + hr); tabel harian hanya punya dteday
+    periods = pd.to_datetime(chunk['dteday'])
+    if 'hr' in chunk.columns:
+        periods = periods + pd.to_timedelta(chunk['hr'], unit='h')
+    return periods
+
+
+def drop_seen_rows(chunks, table_state, skipped):
+    # 'instant' dan jam data naik monoton, jadi cukup menyimpan watermark instant & jam terakhir (bukan set
+    # semua id). Jam ikut dicek agar file mentah yang diekspor ulang dengan penomoran instant berbeda, atau
+    # baris ganda untuk jam yang sama, tidak ditulis dua kali. Jumlah baris yang dilewati dicatat di `skipped`.
+    last_period = pd.Timestamp(table_state['last_period']) if table_state['last_period'] else pd.Timestamp.min
+    for chunk in chunks:
+        new_instant = chunk['instant'] > table_state['last_instant']
+        periods = row_periods(chunk)
+        # Jam terbesar sebelum setiap baris: watermark atau baris baru sebelumnya (di chunk ini/sebelumnya)
+        previous = periods.where(new_instant).cummax().ffill().shift(1).fillna(last_period)
+        new_period = periods > previous.where(previous > last_period, last_period)
+        skipped['instant'] += int((~new_instant).sum())
+        skipped['period'] += int((new_instant & ~new_period).sum())
+        new_rows = chunk[new_instant & new_period]
+        if not new_rows.empty:
+            last_period = max(last_period, periods[new_rows.index].max())
+            yield new_rows
+
+
+def clean_chunks(chunks):
+    for chunk in chunks:
+        yield clean_chunk(chunk)
+
+
+# --- State ingestion ---
+def scan_output_state(output_path, chunksize=DEFAULT_CHUNKSIZE):
+    # Bootstrap watermark dari file output yang sudah ada (dibaca per chunk, hanya kolom instant & jam)
+    table_state = {'last_instant': 0, 'last_dteday': None, 'last_period': None, 'rows': 0}
+    if not os.path.exists(output_path):
+        return table_state
+    for chunk in pd.read_csv(output_path, usecols=lambda col: col in ('instant', 'dteday', 'hr'), chunksize=chunksize):
+        table_state['rows'] += len(chunk)
+        if chunk['instant'].max() > table_state['last_instant']:
+            table_state['last_instant'] = int(chunk['instant'].max())
+            table_state['last_dteday'] = str(chunk['dteday'].max())
+        last_period = row_periods(chunk).max()
+        if table_state['last_period'] is None or last_period > pd.Timestamp(table_state['last_period']):
+            table_state['last_period'] = last_period.isoformat()
+    return table_state
+
+
+def load_state(state_path=STATE_PATH):
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def save_state(state, state_path=STATE_PATH):
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def ingest_table(table, raw_paths, output_path, state, state_path=STATE_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    # Watermark yang tersimpan hanya valid jika file output masih ada; state lama tanpa watermark jam dibangun ulang
+    if table not in state or not os.path.exists(output_path) or 'last_period' not in state[table]:
+        state[table] = scan_output_state(output_path, chunksize)
+    table_state = state[table]
+
+    appended = 0
+    skipped = {'instant': 0, 'period': 0}
+    for chunk in clean_chunks(drop_seen_rows(read_raw_chunks(raw_paths, chunksize), table_state, skipped)):
+        write_header = not os.path.exists(output_path)
+        chunk.to_csv(output_path, mode='a', header=write_header, index=False)
+
+        # State diperbarui setiap chunk agar proses yang terhenti bisa dilanjutkan tanpa duplikasi
+        appended += len(chunk)
+        table_state['rows'] += len(chunk)
+        table_state['last_instant'] = int(chunk['instant'].max())
+        table_state['last_dteday'] = chunk['dteday'].max().strftime('%Y-%m-%d')
+        table_state['last_period'] = row_periods(chunk).max().isoformat()
+        save_state(state, state_path)
+    return appended, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest data mentah bike sharing secara bertahap ke *_clean.csv.")
+    parser.add_argument('--hour', nargs='*', default=[], help="File hour.csv mentah yang akan di-ingest.")
+    parser.add_argument('--day', nargs='*', default=[], help="File day.csv mentah yang akan di-ingest.")
+    parser.add_argument('--hour-output', default=HOUR_CSV_PATH)
+    parser.add_argument('--day-output', default=DAY_CSV_PATH)
+    parser.add_argument('--state', default=STATE_PATH)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    state = load_state(args.state)
+    for table, raw_paths, output_path in [('hour', args.hour, args.hour_output), ('day', args.day, args.day_output)]:
+        if not raw_paths:
+            continue
+        appended, skipped = ingest_table(table, raw_paths, output_path, state, args.state, args.chunksize)
+        print(
+            f"[{table}] {appended} baris baru ditambahkan ke {output_path} (instant terakhir: {state[table]['last_instant']}); "
+            f"{skipped['instant'] + skipped['period']} baris dilewati ({skipped['instant']} instant sudah di-ingest, "
+            f"{skipped['period']} jam sudah ada)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Cube OLAP pra-agregasi untuk dashboard.
+# Data per jam diringkas sekali menjadi sel (dteday, hr, season, weathersit, workingday, year)
+# yang menyimpan sum dan count tiap measure. Setiap chart dijawab dengan me-rollup cube ini,
+# sehingga biaya rerun bergantung pada jumlah sel cube, bukan jumlah baris mentah.
+import pandas as pd
+
+from data_store import concat_tables
+
+# Dimensi utama cube (season & weathersit disimpan dalam bentuk nama agar langsung cocok dengan filter)
+CUBE_DIMENSIONS = ['dteday', 'hr', 'season_name', 'weather_condition', 'workingday', 'year']
+# Dimensi turunan dari 'dteday' dan 'hr' (tidak menambah jumlah sel, tapi dibutuhkan untuk rollup
+# hari, bulan, dan segmen waktu)
+DERIVED_DIMENSIONS = ['weekday_name', 'month_name', 'time_of_day']
+# Measure yang disimpan sebagai sum & count (mean = sum / count)
+CUBE_MEASURES = ['casual', 'registered', 'cnt', 'temp_actual', 'hum_actual']
+# Jumlah baris mentah per sel (untuk proporsi berbasis jumlah jam)
+ROW_COUNT_COLUMN = 'n_rows'
+
+
+def sum_column(measure):
+    return f'{measure}_sum'
+
+
+def count_column(measure):
+    return f'{measure}_count'
+
+
+def build_cube(hour_data):
+    grouped = hour_data.groupby(CUBE_DIMENSIONS + DERIVED_DIMENSIONS, observed=True)
+    sums = grouped[CUBE_MEASURES].sum().rename(columns=sum_column)
+    counts = grouped[CUBE_MEASURES].count().rename(columns=count_column)
+    cube = pd.concat([sums, counts], axis=1)
+    cube[ROW_COUNT_COLUMN] = grouped.size()
+    return cube.reset_index()
+
+
+def merge_cube(cube, delta_cube):
+    # Menggabungkan cube dari baris baru ke cube lama. Hanya bagian ekor cube lama yang tanggalnya
+    # bertumpuk dengan data baru yang diagregasi ulang; sel lama lainnya tidak disentuh.
+    if delta_cube.empty:
+        return cube
+    overlaps = cube['dteday'] >= delta_cube['dteday'].min()
+    merged_tail = concat_tables(cube[overlaps], delta_cube).groupby(
+        CUBE_DIMENSIONS + DERIVED_DIMENSIONS, observed=True
+    ).sum().reset_index()
+    return concat_tables(cube[~overlaps], merged_tail)
+
+
+def rollup_sums(cube, by, measures=CUBE_MEASURES):
+    # Rollup ke dimensi `by`: menjumlahkan sum & count tiap measure serta jumlah baris mentah.
+    # `cube` juga boleh berupa sumber query lain (lihat query_backend.py) yang punya rollup_sums sendiri.
+    if not isinstance(cube, pd.DataFrame):
+        return cube.rollup_sums(by, measures)
+    columns = [sum_column(m) for m in measures] + [count_column(m) for m in measures] + [ROW_COUNT_COLUMN]
+    return cube.groupby(by, observed=True)[columns].sum()
+
+
+def means_from_sums(sums, measures):
+    return pd.DataFrame(
+        {m: sums[sum_column(m)] / sums[count_column(m)] for m in measures},
+        index=sums.index
+    )
+
+
+def rollup_means(cube, by, measures):
+    return means_from_sums(rollup_sums(cube, by, measures), measures)
+
+
+def rollup_mean(cube, by, measure, name=None):
+    return rollup_means(cube, by, [measure])[measure].rename(name or measure)
+
+
+def rollup_pivot(cube, index, columns, measure):
+    # Setara dengan pivot_table(index, columns, values=measure, aggfunc='mean') pada data mentah
+    return rollup_mean(cube, [index, columns], measure).unstack(columns)
@@ -0,0 +1,342 @@
+# Dataset terpartisi per kota/tahun/bulan untuk banyak sistem bike sharing.
+# Setiap tabel disimpan sebagai Parquet dengan layout
+#     partitions/<hour|day>/city=<kota>/year=<tahun>/month=<bulan>/part.parquet
+# Filter kota, tahun, dan rentang tanggal memangkas partisi hanya dari nama direktori (sebelum ada
+# file yang dibaca). Cube OLAP dibangun per partisi secara paralel di satu process pool per proses
+# server, disimpan per file partisi, lalu digabung (sum & count dijumlahkan) untuk kombinasi partisi yang dipilih.
+#
+# Build step dari *_clean.csv satu kota (dari direktori `submission`):
+#     python dashboard/partitions.py --city washington_dc
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from data_store import DAY_CSV_PATH, HOUR_CSV_PATH, SCRIPT_DIR, optimize_dtypes, read_clean_csv
+from data_version import REFRESH_CHECK_INTERVAL, DataSnapshot, file_fingerprint, version_id
+from olap_cube import CUBE_DIMENSIONS, DERIVED_DIMENSIONS, build_cube
+from shared_tables import share_table
+from time_segments import add_time_of_day
+
+PARTITION_ROOT = os.path.join(SCRIPT_DIR, 'partitions')
+PARTITION_FILE = 'part.parquet'
+PARTITION_TABLES = ['hour', 'day']
+DEFAULT_CITY = 'washington_dc'
+CITY_COLUMN = 'city'
+MAX_CACHED_SNAPSHOTS = 8
+MAX_CACHED_PARTITION_CUBES = 512 # cube per file partisi (satu kota-bulan, beberapa ribu sel)
+MAX_CUBE_WORKERS = min(4, os.cpu_count() or 1)
+# File Arrow bersama per partisi (lihat shared_tables.py): satu per file Parquet, dipangkas terpisah dari tabel dasar
+MAX_SHARED_PARTITION_FILES = 1024
+# Gabungan per pilihan partisi (tabel per jam, harian, dan cube), juga dipangkas per nama tabel
+MAX_SHARED_SELECTION_FILES = 32
+
+
+# --- Penulisan partisi ---
+def partition_dir(root, table, city, year, month):
+    return os.path.join(root, table, f'city={city}', f'year={year}', f'month={month:02d}')
+
+
+def write_partitions(df, table, city, root=PARTITION_ROOT):
+    # Menulis ulang partisi bulan yang ada di `df`; partisi lain (kota/bulan lain) tidak disentuh
+    paths = []
+    dates = df['dteday'].dt
+    for (year, month), part in df.groupby([dates.year, dates.month]):
+        directory = partition_dir(root, table, city, year, month)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, PARTITION_FILE)
+        part.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# --- Katalog & pemangkasan partisi ---
+def _partition_values(name, key):
+    prefix = f'{key}='
+    return name[len(prefix):] if name.startswith(prefix) else None
+
+
+def list_partitions(root=PARTITION_ROOT, table='hour'):
+    # Hanya membaca nama direktori; isi file partisi belum disentuh
+    partitions = []
+    table_dir = os.path.join(root, table)
+    if not os.path.isdir(table_dir):
+        return partitions
+    for city_entry in sorted(os.scandir(table_dir), key=lambda e: e.name):
+        city = _partition_values(city_entry.name, 'city')
+        if city is None or not city_entry.is_dir():
+            continue
+        for year_entry in sorted(os.scandir(city_entry.path), key=lambda e: e.name):
+            year = _partition_values(year_entry.name, 'year')
+            if year is None or not year_entry.is_dir():
+                continue
+            for month_entry in sorted(os.scandir(year_entry.path), key=lambda e: e.name):
+                month = _partition_values(month_entry.name, 'month')
+                path = os.path.join(month_entry.path, PARTITION_FILE)
+                if month is None or not os.path.exists(path):
+                    continue
+                partitions.append({'city': city, 'year': int(year), 'month': int(month), 'path': path})
+    return partitions
+
+
+def has_partitions(root=PARTITION_ROOT):
+    return os.path.isdir(os.path.join(root, 'hour')) and os.path.isdir(os.path.join(root, 'day'))
+
+
+def partition_bounds(partition):
+    start = pd.Timestamp(year=partition['year'], month=partition['month'], day=1)
+    return start, start + pd.offsets.MonthEnd(0)
+
+
+def prune_partitions(partitions, cities=None, years=None, start_date=None, end_date=None):
+    # Pilihan kosong/None berarti tidak difilter (sama seperti filter sidebar)
+    start_date = None if start_date is None else pd.Timestamp(start_date)
+    end_date = None if end_date is None else pd.Timestamp(end_date)
+    years = {int(year) for year in years or []}
+    selected = []
+    for partition in partitions:
+        if cities and partition['city'] not in cities:
+            continue
+        if years and partition['year'] not in years:
+            continue
+        first_day, last_day = partition_bounds(partition)
+        if (start_date is not None and last_day < start_date) or (end_date is not None and first_day > end_date):
+            continue
+        selected.append(partition)
+    return selected
+
+
+# --- Pembacaan partisi ---
+def read_partition(partition, table):
+    df = pd.read_parquet(partition['path'])
+    # Kategori 'year' tiap partisi hanya berisi satu tahun; dikembalikan ke integer agar bisa digabung
+    df['year'] = df['year'].astype(int)
+    df[CITY_COLUMN] = partition['city']
+    if table == 'hour':
+        add_time_of_day(df)
+    return df
+
+
+def shared_partition(partition, table):
+    version = version_id([file_fingerprint(partition['path'])])
+    return share_table(
+        f'partition_{table}', version, lambda: read_partition(partition, table), keep=MAX_SHARED_PARTITION_FILES
+    )
+
+
+def empty_table(path, table):
+    # Tabel kosong dengan skema partisi (hanya metadata Parquet yang dibaca)
+    df = pq.read_schema(path).empty_table().to_pandas()
+    df[CITY_COLUMN] = pd.Series(dtype='category')
+    if table == 'hour':
+        add_time_of_day(df)
+    return df
+
+
+def concat_partitions(frames):
+    # Kolom kategori lain memakai urutan kategori tetap dari data_store, sehingga concat tetap kategori
+    df = pd.concat(frames, ignore_index=True)
+    df[CITY_COLUMN] = df[CITY_COLUMN].astype('category')
+    return optimize_dtypes(df)
+
+
+def partition_cube(partition):
+    # Dijalankan di worker process: cube satu partisi per jam
+    return build_cube(read_partition(partition, 'hour'))
+
+
+# Satu pool untuk seluruh proses server, dibuat saat pertama dipakai. Worker memakai start method 'spawn':
+# fork dari server Streamlit yang multithread bisa mewarisi lock yang sedang dipegang thread lain.
+_cube_pool = None
+_cube_pool_lock = threading.Lock()
+
+
+@contextmanager
+def spawn_main():
+    # Worker 'spawn' mengimpor ulang modul __main__ proses induk, sedangkan Streamlit memasang skrip
+    # dashboard sebagai __main__, jadi worker akan menjalankan seluruh dashboard. Selama tugas dikirim
+    # (saat worker baru dibuat), __main__ diganti modul ini yang hanya berisi definisi.
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = sys.modules[__name__]
+    try:
+        yield
+    finally:
+        if sys.modules['__main__'] is sys.modules[__name__]:
+            sys.modules['__main__'] = main
+
+
+def cube_pool(workers=None):
+    # `workers` hanya berlaku saat pool pertama dibuat dan dibatasi MAX_CUBE_WORKERS
+    global _cube_pool
+    with _cube_pool_lock:
+        if _cube_pool is None:
+            _cube_pool = ProcessPoolExecutor(
+                max_workers=min(workers or MAX_CUBE_WORKERS, MAX_CUBE_WORKERS),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _cube_pool
+
+
+def build_partition_cubes(partitions, workers=None):
+    global _cube_pool
+    if len(partitions) <= 1 or workers == 1:
+        return [partition_cube(p) for p in partitions]
+    pool = cube_pool(workers)
+    try:
+        with _cube_pool_lock, spawn_main():
+            cubes = pool.map(partition_cube, partitions)
+        return list(cubes)
+    except BrokenProcessPool:
+        # Worker mati (mis. kehabisan memori): pool dibuat ulang pada pemanggilan berikutnya
+        with _cube_pool_lock:
+            if _cube_pool is pool:
+                _cube_pool = None
+        return [partition_cube(p) for p in partitions]
+
+
+def merge_partition_cubes(cubes):
+    # Sel dari kota berbeda bisa memiliki dimensi yang sama, jadi digabung dengan menjumlahkan sum & count
+    if len(cubes) == 1:
+        return optimize_dtypes(cubes[0].copy())
+    cube = pd.concat(cubes, ignore_index=True)
+    cube['year'] = cube['year'].astype(int)
+    merged = cube.groupby(CUBE_DIMENSIONS + DERIVED_DIMENSIONS, observed=True).sum().reset_index()
+    return optimize_dtypes(merged)
+
+
+def partition_key(partition):
+    stat = os.stat(partition['path'])
+    return partition['path'], stat.st_size, stat.st_mtime_ns
+
+
+class PartitionedDataset:
+    def __init__(self, root=PARTITION_ROOT, workers=None, check_interval=REFRESH_CHECK_INTERVAL):
+        self.root = root
+        self.workers = workers
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._cube_cache = OrderedDict() # (path, size, mtime) -> cube partisi
+        self._snapshots = OrderedDict() # kunci partisi terpilih -> DataSnapshot
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        # Daftar partisi dibaca ulang dari nama direktori (murah, tanpa membaca isi file),
+        # paling sering tiap `check_interval` detik
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            self.partitions = {table: list_partitions(self.root, table) for table in PARTITION_TABLES}
+            # Cube partisi yang filenya sudah berubah/terhapus tidak akan dipakai lagi
+            current_keys = {partition_key(p) for p in self.partitions['hour']}
+            for key in [key for key in self._cube_cache if key not in current_keys]:
+                del self._cube_cache[key]
+
+    @property
+    def cities(self):
+        return sorted({p['city'] for p in self.partitions['hour']})
+
+    @property
+    def years(self):
+        return sorted({p['year'] for p in self.partitions['hour']})
+
+    def date_bounds(self):
+        bounds = [partition_bounds(p) for p in self.partitions['day']]
+        if not bounds:
+            return None, None
+        return min(b[0] for b in bounds).date(), max(b[1] for b in bounds).date()
+
+    def _partition_cubes(self, partitions):
+        # Hanya akses cache yang memegang lock; cube baru dibangun di luar lock agar sesi lain tidak menunggu
+        keys = [partition_key(p) for p in partitions]
+        with self._lock:
+            cubes = {key: self._cube_cache[key] for key in keys if key in self._cube_cache}
+            for key in cubes:
+                self._cube_cache.move_to_end(key)
+        pending = [(key, p) for key, p in zip(keys, partitions) if key not in cubes]
+        cubes.update(zip([key for key, _ in pending], build_partition_cubes([p for _, p in pending], self.workers)))
+        with self._lock:
+            for key, _ in pending:
+                self._cube_cache[key] = cubes[key]
+            while len(self._cube_cache) > MAX_CACHED_PARTITION_CUBES:
+                self._cube_cache.popitem(last=False)
+        return [cubes[key] for key in keys]
+
+    def _read_tables(self, table, partitions, fingerprints):
+        if not partitions:
+            sample = self.partitions[table][0]['path'] if self.partitions[table] else None
+            return empty_table(sample, table) if sample else pd.DataFrame()
+        # Gabungan pilihan ini juga dibagikan sebagai satu file Arrow (kunci = sidik semua partisi terpilih),
+        # sehingga setiap proses memetakan salinan yang sama, bukan menyimpan gabungan privat per proses.
+        # Jika belum ada, gabungan dibuat dari file Arrow per partisi, jadi hanya partisi yang belum pernah
+        # dibagikan yang dibaca dari Parquet. Membaca Parquet melepas GIL, jadi cukup thread pool untuk I/O.
+        def load():
+            with ThreadPoolExecutor() as executor:
+                frames = list(executor.map(lambda p: shared_partition(p, table), partitions))
+            return concat_partitions(frames)
+        return share_table(f'selection_{table}', version_id(fingerprints), load, keep=MAX_SHARED_SELECTION_FILES)
+
+    def snapshot(self, cities=None, years=None, start_date=None, end_date=None):
+        # Snapshot hanya berisi partisi yang lolos pemangkasan; filter halus (tanggal dalam bulan,
+        # musim, cuaca) tetap dilakukan FilterIndex di atas snapshot ini
+        selected = {
+            table: prune_partitions(self.partitions[table], cities, years, start_date, end_date)
+            for table in PARTITION_TABLES
+        }
+        snapshot_key = tuple(partition_key(p) for table in PARTITION_TABLES for p in selected[table])
+        with self._lock:
+            if snapshot_key in self._snapshots:
+                self._snapshots.move_to_end(snapshot_key)
+                return self._snapshots[snapshot_key]
+
+        # Dibangun di luar lock: sesi dengan pilihan yang sudah ada di cache tidak menunggu pembacaan ini.
+        # Dua sesi yang membangun pilihan yang sama bersamaan memakai snapshot yang selesai lebih dulu.
+        fingerprints = {table: [file_fingerprint(p['path']) for p in selected[table]] for table in PARTITION_TABLES}
+        hour_data = self._read_tables('hour', selected['hour'], fingerprints['hour'])
+        day_data = self._read_tables('day', selected['day'], fingerprints['day'])
+        if selected['hour']:
+            # Cube partisi hanya dibangun jika belum ada proses yang membagikan cube gabungan pilihan ini
+            cube = share_table(
+                'selection_cube', version_id(fingerprints['hour']),
+                lambda: merge_partition_cubes(self._partition_cubes(selected['hour'])), keep=MAX_SHARED_SELECTION_FILES,
+            )
+        else:
+            cube = build_cube(hour_data)
+        snapshot = DataSnapshot(
+            hour_data, day_data, cube, fingerprints['hour'] + fingerprints['day'], 'partitioned',
+            hour_files=[p['path'] for p in selected['hour']],
+        )
+
+        with self._lock:
+            snapshot = self._snapshots.setdefault(snapshot_key, snapshot)
+            self._snapshots.move_to_end(snapshot_key)
+            while len(self._snapshots) > MAX_CACHED_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+            return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tulis *_clean.csv satu kota ke dataset terpartisi kota/tahun/bulan.")
+    parser.add_argument('--city', default=DEFAULT_CITY)
+    parser.add_argument('--hour-csv', default=HOUR_CSV_PATH)
+    parser.add_argument('--day-csv', default=DAY_CSV_PATH)
+    parser.add_argument('--root', default=PARTITION_ROOT)
+    args = parser.parse_args()
+
+    for table, csv_path in [('hour', args.hour_csv), ('day', args.day_csv)]:
+        paths = write_partitions(read_clean_csv(csv_path), table, args.city, args.root)
+        print(f"[{table}] {len(paths)} partisi ditulis untuk kota '{args.city}' di {os.path.join(args.root, table)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+# Instrumentasi performa dashboard.
+# Setiap rerun (atau rerun fragment) dicatat sebagai satu "run" berisi stage bernama: load data,
+# filter, setiap agregasi (beserta hit/miss cache), setiap chart (draw, savefig PNG atau serialisasi
+# JSON Plotly, dan pengiriman gambar/figure), dengan durasi dan selisih RSS proses. Run yang selesai dikumpulkan di
+# PerfMetrics (satu per proses) dan ditampilkan di panel admin, ditulis sebagai log JSON per baris,
+# dan/atau disajikan sebagai metrik format Prometheus di endpoint HTTP lokal.
+#
+# Konfigurasi lewat environment variable:
+#     DASHBOARD_PERF_LOG=perf.jsonl      # log JSON per run ('-' untuk stderr)
+#     DASHBOARD_METRICS_PORT=9464        # endpoint http://127.0.0.1:9464/metrics
+# Jika port sudah dipakai (mis. worker kedua di host yang sama), worker tersebut tetap berjalan tanpa
+# endpoint dan hanya mencatat peringatan; beri port berbeda per worker untuk men-scrape semuanya.
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PERF_LOG_ENV = 'DASHBOARD_PERF_LOG'
+METRICS_PORT_ENV = 'DASHBOARD_METRICS_PORT'
+METRICS_HOST = '127.0.0.1'
+MAX_RECENT_RUNS = 200
+PROFILE_TOP_N = 40
+
+logger = logging.getLogger('dashboard.perf')
+# Peringatan operasional tidak ikut ke log JSON per run
+warning_logger = logging.getLogger('dashboard')
+
+
+def current_rss_bytes():
+    # RSS proses saat ini (Linux); None jika tidak tersedia. Bersifat per proses, jadi pada server
+    # dengan banyak sesi bersamaan selisihnya adalah perkiraan, bukan alokasi stage secara persis.
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+# --- Perekam per run ---
+class PerfRecorder:
+    def __init__(self, run_name, **labels):
+        self.run_name = run_name
+        self.labels = labels
+        self.stages = []
+        self.finished = False
+        self._depth = 0
+        self._started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._start_rss = current_rss_bytes()
+
+    @contextmanager
+    def stage(self, name, kind='stage'):
+        # `entry` boleh dilengkapi pemanggil, mis. entry['cache'] = 'hit'/'miss'
+        entry = {'name': name, 'kind': kind, 'depth': self._depth}
+        self.stages.append(entry)
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield entry
+        finally:
+            self._depth -= 1
+            entry['seconds'] = time.perf_counter() - start
+            rss_after = current_rss_bytes()
+            entry['rss_delta_mb'] = None if rss_before is None or rss_after is None else (rss_after - rss_before) / (1024 * 1024)
+
+    def finish(self):
+        self.finished = True
+        end_rss = current_rss_bytes()
+        cache_results = [entry['cache'] for entry in self.stages if 'cache' in entry]
+        return {
+            'run': self.run_name,
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'seconds': time.perf_counter() - self._start,
+            'rss_mb': None if end_rss is None else end_rss / (1024 * 1024),
+            'rss_delta_mb': None if end_rss is None or self._start_rss is None else (end_rss - self._start_rss) / (1024 * 1024),
+            'cache': {'hits': cache_results.count('hit'), 'misses': cache_results.count('miss')},
+            'labels': self.labels,
+            'stages': self.stages,
+        }
+
+
+# Perekam aktif per thread: Streamlit menjalankan skrip tiap sesi di thread-nya sendiri, sedangkan
+# thread lain (mis. warm-up di latar belakang) tidak punya perekam sehingga timed() tidak mencatat apa pun
+_active = threading.local()
+
+
+def start_run(run_name, **labels):
+    _active.recorder = PerfRecorder(run_name, **labels)
+    return _active.recorder
+
+
+def active_recorder():
+    recorder = getattr(_active, 'recorder', None)
+    return None if recorder is None or recorder.finished else recorder
+
+
+@contextmanager
+def timed(name, kind='stage'):
+    recorder = active_recorder()
+    if recorder is None:
+        yield {}
+        return
+    with recorder.stage(name, kind) as entry:
+        yield entry
+
+
+@contextmanager
+def perf_run(run_name, metrics, **labels):
+    # Untuk fragment: jika dijalankan di dalam rerun penuh, dicatat sebagai stage dari run tersebut;
+    # jika fragment dijalankan ulang sendiri, dicatat sebagai run baru
+    if active_recorder() is not None:
+        with timed(run_name, 'fragment'):
+            yield
+        return
+    recorder = start_run(run_name, **labels)
+    try:
+        yield
+    finally:
+        metrics.observe(recorder.finish())
+
+
+# --- Kumpulan metrik per proses ---
+class PerfMetrics:
+    def __init__(self, max_recent_runs=MAX_RECENT_RUNS):
+        self._lock = threading.Lock()
+        self.recent_runs = deque(maxlen=max_recent_runs)
+        self._stage_totals = OrderedDict() # (kind, name) -> [jumlah, total detik, detik terakhir]
+        self._run_totals = OrderedDict() # nama run -> [jumlah, total detik]
+        self._cache_totals = {'hit': 0, 'miss': 0}
+
+    def observe(self, record):
+        with self._lock:
+            self.recent_runs.append(record)
+            run_totals = self._run_totals.setdefault(record['run'], [0, 0.0])
+            run_totals[0] += 1
+            run_totals[1] += record['seconds']
+            for entry in record['stages']:
+                totals = self._stage_totals.setdefault((entry['kind'], entry['name']), [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += entry['seconds']
+                totals[2] = entry['seconds']
+            self._cache_totals['hit'] += record['cache']['hits']
+            self._cache_totals['miss'] += record['cache']['misses']
+        if logger.handlers:
+            logger.info(json.dumps(record, default=str))
+
+    def last_run(self):
+        with self._lock:
+            return self.recent_runs[-1] if self.recent_runs else None
+
+    def stage_means_by_version(self, label='data_version'):
+        # Rata-rata detik per stage untuk setiap versi data (urut kemunculan), untuk melihat chart
+        # mana yang melambat setelah data diperbarui
+        means = OrderedDict()
+        with self._lock:
+            for record in self.recent_runs:
+                version = record['labels'].get(label)
+                for entry in record['stages']:
+                    totals = means.setdefault(version, {}).setdefault((entry['kind'], entry['name']), [0, 0.0])
+                    totals[0] += 1
+                    totals[1] += entry['seconds']
+        return OrderedDict(
+            (version, {key: total / count for key, (count, total) in stages.items()})
+            for version, stages in means.items()
+        )
+
+    def prometheus_text(self):
+        lines = [
+            '# HELP dashboard_stage_seconds Durasi stage dashboard (load, filter, agregasi, chart).',
+            '# TYPE dashboard_stage_seconds summary',
+        ]
+        with self._lock:
+            stage_totals = list(self._stage_totals.items())
+            run_totals = list(self._run_totals.items())
+            cache_totals = dict(self._cache_totals)
+        for (kind, name), (count, total, _) in stage_totals:
+            labels = _prometheus_labels(kind=kind, stage=name)
+            lines.append(f'dashboard_stage_seconds_count{labels} {count}')
+            lines.append(f'dashboard_stage_seconds_sum{labels} {total:.6f}')
+        lines += ['# HELP dashboard_stage_last_seconds Durasi stage pada run terakhir.', '# TYPE dashboard_stage_last_seconds gauge']
+        for (kind, name), (_, _, last) in stage_totals:
+            lines.append(f'dashboard_stage_last_seconds{_prometheus_labels(kind=kind, stage=name)} {last:.6f}')
+        lines += ['# HELP dashboard_run_seconds Durasi satu rerun/fragment.', '# TYPE dashboard_run_seconds summary']
+        for run_name, (count, total) in run_totals:
+            labels = _prometheus_labels(run=run_name)
+            lines.append(f'dashboard_run_seconds_count{labels} {count}')
+            lines.append(f'dashboard_run_seconds_sum{labels} {total:.6f}')
+        lines += ['# HELP dashboard_cache_lookups_total Lookup cache agregasi & figure per hasil.', '# TYPE dashboard_cache_lookups_total counter']
+        for result, count in cache_totals.items():
+            lines.append(f'dashboard_cache_lookups_total{_prometheus_labels(result=result)} {count}')
+        rss = current_rss_bytes()
+        if rss is not None:
+            lines += ['# HELP dashboard_process_rss_bytes RSS proses server.', '# TYPE dashboard_process_rss_bytes gauge', f'dashboard_process_rss_bytes {rss}']
+        return '\n'.join(lines) + '\n'
+
+
+def stage_rows(record):
+    # Baris tabel (urutan eksekusi, stage bersarang diindentasi) untuk panel admin
+    return [
+        {
+            'stage': '\u00a0\u00a0' * entry['depth'] + entry['name'],
+            'jenis': entry['kind'],
+            'ms': round(entry['seconds'] * 1000, 1),
+            'Δ RSS (MB)': None if entry['rss_delta_mb'] is None else round(entry['rss_delta_mb'], 2),
+            'cache': entry.get('cache', ''),
+        }
+        for entry in record['stages']
+    ]
+
+
+def version_comparison_rows(metrics, label='data_version'):
+    # Stage yang paling melambat antara dua versi data terakhir (rata-rata dari run terbaru)
+    means = metrics.stage_means_by_version(label)
+    if len(means) < 2:
+        return []
+    (old_version, old_means), (new_version, new_means) = list(means.items())[-2:]
+    rows = [
+        {
+            'stage': name, 'jenis': kind,
+            f'ms ({old_version})': round(old_means[(kind, name)] * 1000, 1),
+            f'ms ({new_version})': round(seconds * 1000, 1),
+            'rasio': round(seconds / old_means[(kind, name)], 2) if old_means[(kind, name)] > 0 else None,
+        }
+        for (kind, name), seconds in new_means.items() if (kind, name) in old_means
+    ]
+    return sorted(rows, key=lambda row: row['rasio'] or 0, reverse=True)
+
+
+def _prometheus_labels(**labels):
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+# --- Output: log JSON & endpoint metrik ---
+def configure_json_log(target):
+    # Satu baris JSON per run; '-' berarti stderr
+    handler = logging.StreamHandler(sys.stderr) if target == '-' else logging.FileHandler(target, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def start_metrics_server(metrics, port, host=METRICS_HOST):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Scrape berkala tidak perlu memenuhi log server
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='perf-metrics', daemon=True).start()
+    return server
+
+
+def metrics_from_env():
+    # PerfMetrics untuk proses ini, dengan log JSON & endpoint metrik sesuai environment variable
+    metrics = PerfMetrics()
+    if os.environ.get(PERF_LOG_ENV):
+        configure_json_log(os.environ[PERF_LOG_ENV])
+    if os.environ.get(METRICS_PORT_ENV):
+        port = int(os.environ[METRICS_PORT_ENV])
+        try:
+            start_metrics_server(metrics, port)
+        except OSError as error:
+            warning_logger.warning("Endpoint metrik di %s:%s tidak dapat dibuka (%s); dashboard berjalan tanpa endpoint.", METRICS_HOST, port, error)
+    return metrics
+
+
+# --- cProfile untuk satu rerun ---
+def profile_report(profiler, top_n=PROFILE_TOP_N):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats('cumulative').print_stats(top_n)
+    return stream.getvalue()
+
+
+# Profiler yang masih aktif per thread skrip. Rerun yang berakhir lebih awal (st.stop, st.rerun, atau
+# exception) tidak sampai ke stop_profiler(), jadi profilernya dimatikan saat rerun berikutnya dimulai
+_profilers = {}
+_profilers_lock = threading.Lock()
+
+
+def stop_stale_profilers():
+    # Milik thread ini (rerun sebelumnya di thread yang sama) atau milik thread skrip yang sudah selesai
+    current = threading.current_thread()
+    with _profilers_lock:
+        for thread in [thread for thread in _profilers if thread is current or not thread.is_alive()]:
+            _profilers.pop(thread).disable()
+
+
+def start_profiler(enabled=True):
+    # Dipanggil di awal setiap rerun; mengembalikan None jika rerun ini tidak diprofil
+    stop_stale_profilers()
+    if not enabled:
+        return None
+    profiler = cProfile.Profile()
+    with _profilers_lock:
+        _profilers[threading.current_thread()] = profiler
+    profiler.enable()
+    return profiler
+
+
+def stop_profiler(profiler):
+    profiler.disable()
+    with _profilers_lock:
+        if _profilers.get(threading.current_thread()) is profiler:
+            del _profilers[threading.current_thread()]
@@ -0,0 +1,207 @@
+# Fungsi pembentuk chart Plotly (interaktif, dirender di browser).
+# Setiap fungsi figure_<id chart> menerima data hasil agregasi yang sama dengan draw_<id chart> di
+# charts.py (mis. 24 titik untuk pola per jam, 24x7 sel untuk heatmap jam vs hari) dan mengembalikan
+# Figure Plotly; yang dikirim ke browser hanya seri kecil tersebut, bukan gambar PNG. Hover, zoom, dan
+# pemilihan titik ditangani di browser tanpa rerun server. Pemilihan backend chart dan penerapan
+# rentang yang dipilih di chart sebagai filter ada di chart_backend.py.
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from constants import SEASON_ORDER, TIME_OF_DAY_ORDER, WEATHER_ORDER, WEEKDAY_ORDER
+
+USER_TYPE_COLORS = {'Casual': 'skyblue', 'Registered': 'darkblue'}
+
+
+# --- Helper tata letak ---
+def _layout(fig, title, x_title=None, y_title=None, height=420):
+    fig.update_layout(
+        title=title, xaxis_title=x_title, yaxis_title=y_title, height=height,
+        margin=dict(l=10, r=10, t=50, b=10), legend_title_text=None,
+    )
+    return fig
+
+
+def _brushable(fig):
+    # Seret untuk memilih rentang sumbu x (bukan zoom); zoom tetap tersedia dari toolbar
+    fig.update_layout(dragmode='select', selectdirection='h')
+    return fig
+
+
+def _ordered(data, column, order):
+    return [value for value in order if value in set(data[column])]
+
+
+def _bar(data, x, title, x_title, user_type, order, colors):
+    fig = px.bar(
+        data, x=x, y='cnt_display', color=x, color_discrete_sequence=colors,
+        category_orders={x: order},
+    )
+    fig.update_layout(showlegend=False)
+    return _layout(fig, title, x_title, f'Rata-rata Penyewaan ({user_type})')
+
+
+def _heatmap(data, title, x_title, user_type, colorscale, annotate=False):
+    fig = go.Heatmap(
+        z=data.to_numpy(), x=[str(col) for col in data.columns], y=list(data.index), colorscale=colorscale,
+        colorbar=dict(title=f'Rata-rata ({user_type})'), hovertemplate='Jam %{y}<br>%{x}: %{z:.0f}<extra></extra>',
+        texttemplate='%{z:.0f}' if annotate else None, xgap=1, ygap=1,
+    )
+    fig = go.Figure(fig)
+    # Jam 0 di atas, seperti heatmap seaborn
+    fig.update_yaxes(autorange='reversed', dtick=1)
+    return _layout(fig, title, x_title, 'Jam dalam Sehari', height=560)
+
+
+# --- Pola Waktu & Musiman ---
+def figure_hourly_pattern(data, user_type):
+    fig = px.line(data, x='hr', y='cnt_display', markers=True, color_discrete_sequence=['dodgerblue'])
+    fig.update_xaxes(dtick=1)
+    return _brushable(_layout(fig, 'Rata-rata Penyewaan Sepeda berdasarkan Jam', 'Jam dalam Sehari', f'Rata-rata Penyewaan ({user_type})'))
+
+
+def figure_daily_trend(data, user_type):
+    fig = px.line(data, x='dteday', y='cnt_display', color_discrete_sequence=['dodgerblue'])
+    return _brushable(_layout(fig, 'Total Penyewaan Sepeda per Hari', 'Tanggal', f'Total Penyewaan ({user_type})', height=360))
+
+
+def figure_season_pattern(data, user_type):
+    return _bar(data, 'season_name', 'Rata-rata Penyewaan Sepeda berdasarkan Musim', 'Musim', user_type,
+                _ordered(data, 'season_name', SEASON_ORDER), px.colors.sequential.Viridis[::3])
+
+
+def figure_weekday_pattern(data, user_type):
+    return _bar(data, 'weekday_name', 'Rata-rata Penyewaan Sepeda berdasarkan Hari dalam Seminggu', 'Hari', user_type,
+                _ordered(data, 'weekday_name', WEEKDAY_ORDER), px.colors.sequential.Tealgrn)
+
+
+def figure_month_pattern(data, user_type):
+    fig = px.line(data, x='month_name', y='cnt_display', markers=True, color_discrete_sequence=['mediumseagreen'])
+    return _layout(fig, 'Rata-rata Penyewaan Sepeda berdasarkan Bulan', 'Bulan', f'Rata-rata Penyewaan ({user_type})')
+
+
+def figure_hour_weekday_heatmap(data, user_type):
+    return _heatmap(data, 'Heatmap Rata-rata Penyewaan Sepeda: Jam vs Hari dalam Seminggu', 'Hari dalam Seminggu', user_type, 'Viridis')
+
+
+def figure_hour_month_heatmap(data, user_type):
+    return _heatmap(data, 'Heatmap Rata-rata Penyewaan Sepeda: Jam vs Bulan', 'Bulan', user_type, 'YlGnBu')
+
+
+def figure_hour_season_heatmap(data, user_type):
+    return _heatmap(data, 'Heatmap Rata-rata Penyewaan Sepeda: Jam vs Musim', 'Musim', user_type, 'RdBu_r', annotate=True)
+
+
+# --- Pengaruh Cuaca ---
+def figure_weather_impact(data, user_type):
+    return _bar(data, 'weather_condition', 'Pengaruh Kondisi Cuaca terhadap Rata-rata Penyewaan', 'Kondisi Cuaca', user_type,
+                _ordered(data, 'weather_condition', WEATHER_ORDER), px.colors.diverging.RdBu_r[1::3])
+
+
+def figure_hour_weather_heatmap(data, user_type):
+    return _heatmap(data, 'Heatmap Rata-rata Penyewaan Sepeda: Jam vs Kondisi Cuaca', 'Kondisi Cuaca', user_type, 'Magma_r', annotate=True)
+
+
+# --- Analisis Pengguna ---
+def figure_user_proportion_pie(data):
+    fig = go.Figure(go.Pie(
+        labels=['Casual', 'Registered'], values=[data['casual'], data['registered']],
+        marker=dict(colors=['#ff9999', '#66b3ff'], line=dict(color='grey', width=1)), sort=False,
+    ))
+    return _layout(fig, 'Proporsi Total Penyewaan: Casual vs Registered')
+
+
+def figure_user_type_hourly(data):
+    fig = go.Figure([
+        go.Scatter(x=data['hr'], y=data['avg_casual'], name='Casual', mode='lines+markers', line=dict(color='skyblue', width=2)),
+        go.Scatter(x=data['hr'], y=data['avg_registered'], name='Registered', mode='lines+markers', line=dict(color='darkblue', width=2)),
+    ])
+    fig.update_xaxes(dtick=2)
+    return _layout(fig, 'Rata-rata Penyewaan per Jam', 'Jam', 'Rata-rata Jumlah Penyewaan')
+
+
+def _user_type_bars(data, x, title, x_title, order=None):
+    fig = px.bar(
+        data, x=x, y='rata_penyewaan', color='tipe_pengguna', barmode='group',
+        color_discrete_map=USER_TYPE_COLORS, category_orders={x: order} if order else None,
+    )
+    return _layout(fig, title, x_title, 'Rata-rata Jumlah Penyewaan')
+
+
+def figure_user_type_workingday(data):
+    return _user_type_bars(data, 'workingday_label', 'Penyewaan di Hari Kerja vs Akhir Pekan', 'Status Hari')
+
+
+def figure_user_type_season(data):
+    return _user_type_bars(data, 'season_name', 'Rata-rata Penyewaan per Musim', 'Musim', _ordered(data, 'season_name', SEASON_ORDER))
+
+
+def figure_user_specific_hourly(data, user_type):
+    fig = px.line(data, x='hr', y='cnt_display', markers=True)
+    fig.update_xaxes(dtick=1)
+    return _brushable(_layout(fig, f'Rata-rata Penyewaan per Jam ({user_type})', 'Jam', 'Rata-rata Jumlah Penyewaan'))
+
+
+# --- Analisis Lanjutan (Segmen Waktu) ---
+def figure_time_of_day_summary(data, weather_proportions_by_time, user_type):
+    segments = [t for t in TIME_OF_DAY_ORDER if t in data.index]
+    data = data.reindex(segments)
+    fig = make_subplots(rows=2, cols=2, vertical_spacing=0.18, subplot_titles=[
+        'Rata-rata Total Penyewaan per Segmen Waktu', 'Rata-rata Pengguna Casual vs Registered per Segmen Waktu',
+        'Rata-rata Suhu Aktual (°C) per Segmen Waktu', 'Proporsi Kondisi Cuaca (%) per Segmen Waktu',
+    ])
+    fig.add_trace(go.Bar(x=segments, y=data['avg_total_users'], marker_color='steelblue', showlegend=False), row=1, col=1)
+    if user_type == "Semua":
+        fig.add_trace(go.Bar(x=segments, y=data['avg_casual_users'], name='Casual', marker_color='lightcoral', legendgroup='user'), row=1, col=2)
+        fig.add_trace(go.Bar(x=segments, y=data['avg_registered_users'], name='Registered', marker_color='steelblue', legendgroup='user'), row=1, col=2)
+    else:
+        fig.add_annotation(text=f'Menampilkan data untuk {user_type}', showarrow=False, row=1, col=2, x=0.5, y=0.5, xref='x2 domain', yref='y2 domain')
+    fig.add_trace(go.Bar(x=segments, y=data['avg_temp_actual'], marker_color='darkorange', showlegend=False), row=2, col=1)
+    if not weather_proportions_by_time.empty and not weather_proportions_by_time.isnull().all().all():
+        colors = px.colors.diverging.Spectral[::max(1, len(px.colors.diverging.Spectral) // len(weather_proportions_by_time.columns))]
+        for color, weather in zip(colors, weather_proportions_by_time.columns):
+            fig.add_trace(go.Bar(
+                x=list(weather_proportions_by_time.index), y=weather_proportions_by_time[weather], name=weather,
+                marker_color=color, legendgroup='weather',
+            ), row=2, col=2)
+    else:
+        fig.add_annotation(text='Tidak ada data proporsi cuaca', showarrow=False, row=2, col=2, x=0.5, y=0.5, xref='x4 domain', yref='y4 domain')
+    # barmode berlaku untuk semua subplot: grup untuk casual/registered, tumpuk untuk proporsi cuaca
+    fig.update_layout(barmode='group')
+    fig.update_traces(selector=dict(legendgroup='weather'), offsetgroup='weather')
+    fig.update_yaxes(title_text=f'Rata-rata Penyewaan ({user_type})', row=1, col=1)
+    fig.update_yaxes(title_text='Rata-rata Penyewaan (Semua)', row=1, col=2)
+    fig.update_yaxes(title_text='Rata-rata Suhu (°C)', row=2, col=1)
+    fig.update_yaxes(title_text='Persentase (%)', row=2, col=2)
+    return _layout(fig, f'Karakteristik Penyewaan Sepeda per Segmen Waktu Harian ({user_type})', height=820)
+
+
+# --- Prakiraan Permintaan ---
+def figure_demand_forecast(data, count_column, user_type):
+    fig = px.line(data, x='timestamp', y=count_column, color='scenario')
+    _layout(fig, f'Prakiraan Penyewaan per Jam ({user_type})', 'Waktu', 'Prakiraan Jumlah Penyewaan')
+    fig.update_layout(legend_title_text='Skenario')
+    return fig
+
+
+
+# --- Deteksi Anomali ---
+def figure_anomaly_events(data):
+    # Garis dari perkiraan normal ke nilai aktual digambar sebagai satu trace (segmen dipisah None)
+    segments = [(x, y) for t, low, high in zip(data['timestamp'], data['expected'], data['cnt']) for x, y in ((t, low), (t, high), (None, None))]
+    fig = go.Figure(go.Scatter(
+        x=[x for x, _ in segments], y=[y for _, y in segments], mode='lines', line=dict(color='grey', width=1),
+        opacity=0.5, showlegend=False, hoverinfo='skip',
+    ))
+    fig.add_trace(go.Scatter(
+        x=data['timestamp'], y=data['expected'], name='Perkiraan normal', mode='markers',
+        marker=dict(symbol='line-ew-open', color='grey', size=12), hoverinfo='skip',
+    ))
+    for direction, color in [('lonjakan', 'crimson'), ('penurunan', 'darkorange')]:
+        rows = data[data['direction'] == direction]
+        fig.add_trace(go.Scatter(
+            x=rows['timestamp'], y=rows['cnt'], name=direction.capitalize(), mode='markers', marker=dict(color=color, size=8),
+            customdata=rows[['expected', 'z_score', 'weather_condition']].to_numpy(),
+            hovertemplate='%{x|%d %b %Y %H:00}<br>Aktual %{y} vs normal %{customdata[0]}<br>z = %{customdata[1]}<br>%{customdata[2]}<extra></extra>',
+        ))
+    return _layout(fig, 'Jam dengan Penyewaan Tidak Biasa', 'Waktu', 'Jumlah Penyewaan')
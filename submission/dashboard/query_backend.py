@@ -0,0 +1,203 @@
+# Backend query untuk agregasi chart: pandas (cube OLAP di memori) atau DuckDB (langsung di atas file).
+# Semua fungsi di aggregations.py bertumpu pada olap_cube.rollup_sums. Backend DuckDB menyediakan
+# rollup_sums yang sama sebagai satu query GROUP BY atas file Parquet/CSV per jam (multi-core,
+# tanpa harus memuat tabel ke memori), dengan filter sidebar sebagai klausa WHERE. Hasilnya diberi
+# tipe kategori & urutan yang sama dengan cube pandas, sehingga sisa pipeline chart tidak berubah.
+#
+# Backend dipilih lewat environment variable, mis.:
+#     DASHBOARD_QUERY_BACKEND=duckdb streamlit run dashboard/dashboard.py
+# Cek paritas kedua backend terhadap output chart saat ini (dari direktori `submission`):
+#     python dashboard/query_backend.py --check-parity
+import argparse
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from constants import TIME_OF_DAY_SEGMENTS
+from data_store import CATEGORY_ORDERS
+from olap_cube import ROW_COUNT_COLUMN, count_column, sum_column
+from time_segments import build_hour_lookup, segment_labels
+
+QUERY_BACKEND_ENV = 'DASHBOARD_QUERY_BACKEND'
+QUERY_BACKENDS = ['pandas', 'duckdb']
+DEFAULT_QUERY_BACKEND = 'pandas'
+
+
+def selected_backend():
+    backend = os.environ.get(QUERY_BACKEND_ENV, DEFAULT_QUERY_BACKEND).strip().lower()
+    if backend not in QUERY_BACKENDS:
+        raise ValueError(f"{QUERY_BACKEND_ENV}='{backend}' tidak dikenal. Pilihan: {', '.join(QUERY_BACKENDS)}.")
+    return backend
+
+
+# --- SQL ---
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def time_of_day_sql(segments=TIME_OF_DAY_SEGMENTS, column='hr'):
+    # Lookup 24 jam yang sama dengan time_segments.py, ditulis sebagai CASE
+    labels = segment_labels(segments)
+    cases = ' '.join(
+        f"WHEN {hour} THEN '{labels[code]}'" for hour, code in enumerate(build_hour_lookup(segments))
+    )
+    return f'CASE {_quote(column)} {cases} END'
+
+
+def file_scan_sql(files):
+    file_list = ', '.join("'" + path.replace("'", "''") + "'" for path in files)
+    if all(path.endswith('.parquet') for path in files):
+        return f'read_parquet([{file_list}])'
+    return f'read_csv([{file_list}], header=true, dateformat=\'%Y-%m-%d\')'
+
+
+def where_sql(start_date=None, end_date=None, max_instant=None, **selections):
+    # Semantik sama dengan FilterIndex.select: pilihan kosong/None berarti kolom tidak difilter.
+    # `max_instant` membatasi baris ke isi snapshot (CSV live bisa sudah bertambah sejak snapshot dimuat)
+    clauses, params = [], []
+    if max_instant is not None:
+        clauses.append('instant <= ?')
+        params.append(int(max_instant))
+    if start_date is not None:
+        clauses.append('CAST(dteday AS DATE) >= ?')
+        params.append(pd.Timestamp(start_date).date())
+    if end_date is not None:
+        clauses.append('CAST(dteday AS DATE) <= ?')
+        params.append(pd.Timestamp(end_date).date())
+    for col, values in selections.items():
+        if not values:
+            continue
+        clauses.append(f'{_quote(col)} IN ({", ".join("?" for _ in values)})')
+        params.extend(int(v) if isinstance(v, (int, np.integer)) else v for v in values)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+# --- Sumber query DuckDB ---
+_local = threading.local()
+
+
+def _connection():
+    # Satu koneksi in-memory per thread (thread latar belakang warm-up memakai koneksinya sendiri)
+    if not hasattr(_local, 'connection'):
+        import duckdb
+        _local.connection = duckdb.connect()
+    return _local.connection
+
+
+class DuckDBSource:
+    def __init__(self, files, filter_selection=None, max_instant=None):
+        self.files = list(files)
+        self.filter_selection = filter_selection or {}
+        self.max_instant = max_instant
+
+    def rollup_sums(self, by, measures):
+        # Setara olap_cube.rollup_sums(cube_terfilter, by, measures), dihitung langsung dari file
+        by = [by] if isinstance(by, str) else list(by)
+        aggregates = [f'SUM({_quote(m)})::DOUBLE AS {_quote(sum_column(m))}' for m in measures]
+        aggregates += [f'COUNT({_quote(m)}) AS {_quote(count_column(m))}' for m in measures]
+        aggregates.append(f'COUNT(*) AS {_quote(ROW_COUNT_COLUMN)}')
+        where, params = where_sql(max_instant=self.max_instant, **self.filter_selection)
+        query = (
+            f"SELECT {', '.join(_quote(col) for col in by)}, {', '.join(aggregates)} "
+            f"FROM (SELECT *, {time_of_day_sql()} AS time_of_day FROM {file_scan_sql(self.files)}){where} "
+            f"GROUP BY ALL"
+        )
+        result = _connection().execute(query, params).df()
+        return self._as_cube_index(result, by)
+
+    def _as_cube_index(self, result, by):
+        # Kolom dimensi diberi tipe kategori yang sama dengan cube pandas, lalu diurutkan seperti groupby
+        for col in by:
+            if col == 'time_of_day':
+                result[col] = pd.Categorical(result[col], categories=segment_labels())
+            elif col in CATEGORY_ORDERS and CATEGORY_ORDERS[col] is not None:
+                result[col] = pd.Categorical(result[col], categories=CATEGORY_ORDERS[col])
+        return result.sort_values(by).set_index(by if len(by) > 1 else by[0])
+
+
+def aggregation_source(backend, snapshot, cube_filtered, filter_selection):
+    # Objek yang diteruskan ke fungsi di aggregations.py sesuai backend yang dipilih.
+    # Snapshot tanpa file (mis. tidak ada partisi terpilih) tetap memakai cube yang kosong.
+    if backend == 'duckdb' and snapshot.hour_files:
+        return DuckDBSource(snapshot.hour_files, filter_selection, max_instant=snapshot.hour_data['instant'].max())
+    return cube_filtered
+
+
+# --- Cek paritas ---
+def parity_cases(snapshot):
+    years = sorted(snapshot.hour_data['year'].unique())
+    first_day = snapshot.day_data['dteday'].min()
+    return [
+        ('semua', {}),
+        ('tahun_musim', {'year': [years[-1]], 'season_name': ['Summer', 'Fall']}),
+        ('rentang_cuaca', {
+            'start_date': first_day + pd.Timedelta(days=60), 'end_date': first_day + pd.Timedelta(days=240),
+            'weather_condition': ['Clear/Few clouds', 'Mist/Cloudy'],
+        }),
+        ('satu_hari', {'start_date': snapshot.data_until, 'end_date': snapshot.data_until}),
+        # Rentang jam (seperti slider jam / box select chart per jam) bersama jendela tanggal
+        ('jam_rentang_tanggal', {
+            'start_date': first_day + pd.Timedelta(days=90), 'end_date': first_day + pd.Timedelta(days=180),
+            'hr': list(range(7, 10)),
+        }),
+        ('jam_malam_tahun', {'year': [years[0]], 'hr': list(range(18, 24))}),
+    ]
+
+
+def check_parity(snapshot, rtol=1e-9):
+    # Membandingkan setiap agregasi chart: pandas (cube terfilter) vs DuckDB (langsung dari file snapshot)
+    from aggregations import USER_TYPE_COUNT_COLUMNS, report_aggregates
+
+    failures = []
+    for case_name, selection in parity_cases(snapshot):
+        selection = {'start_date': None, 'end_date': None, **selection}
+        cube_filtered = snapshot.cube_index.apply(snapshot.cube, **selection)
+        duckdb_source = aggregation_source('duckdb', snapshot, cube_filtered, selection)
+        for user_type, count_column_name in USER_TYPE_COUNT_COLUMNS.items():
+            for name, (agg_func, args) in report_aggregates(count_column_name).items():
+                expected = agg_func(cube_filtered, *args)
+                actual = agg_func(duckdb_source, *args)
+                try:
+                    assert_same_result(expected, actual, rtol)
+                except AssertionError as error:
+                    failures.append((case_name, user_type, name, str(error).strip().splitlines()[0]))
+    return failures
+
+
+def assert_same_result(expected, actual, rtol):
+    options = dict(check_dtype=False, check_categorical=False, check_index_type=False, check_names=False, rtol=rtol)
+    if isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(expected, actual, **options)
+    else:
+        pd.testing.assert_frame_equal(expected, actual, check_column_type=False, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend query agregasi dashboard (pandas/DuckDB).")
+    parser.add_argument('--check-parity', action='store_true', help="Bandingkan hasil semua agregasi chart di kedua backend.")
+    parser.add_argument('--partitioned', action='store_true', help="Cek di atas dataset terpartisi (semua kota) alih-alih *_clean.csv.")
+    args = parser.parse_args()
+
+    if not args.check_parity:
+        parser.print_help()
+        return
+    if args.partitioned:
+        from partitions import PartitionedDataset
+        snapshot = PartitionedDataset().snapshot()
+    else:
+        from data_version import LiveDataset
+        snapshot = LiveDataset().snapshot
+    print(f"Snapshot {snapshot.version}: {len(snapshot.hour_data)} baris per jam dari {len(snapshot.hour_files)} file")
+    failures = check_parity(snapshot)
+    for case_name, user_type, name, message in failures:
+        print(f"BEDA [{case_name} | {user_type}] {name}: {message}")
+    if failures:
+        sys.exit(1)
+    print("Paritas OK: semua agregasi chart sama di backend pandas dan DuckDB.")
+
+
+if __name__ == '__main__':
+    main()
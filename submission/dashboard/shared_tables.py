@@ -0,0 +1,83 @@
+# Tabel dasar bersama yang di-memory-map (Arrow IPC tanpa kompresi).
+# Setiap versi tabel per jam/harian (dan cube OLAP-nya) ditulis sekali ke shared/<tabel>_<kunci>.arrow,
+# lalu dipetakan read-only oleh setiap proses server. Kolom pandas hasil pemetaan menunjuk ke buffer file
+# (zero-copy), sehingga salinan fisiknya hanya ada satu di page cache OS dan dipakai bersama oleh
+# semua sesi & proses, alih-alih satu salinan privat per proses. Filter per sesi cukup menyimpan
+# array posisi baris di atas tabel ini (lihat FilterIndex.positions). Dataset terpartisi dibagikan per
+# file partisi dan per gabungan pilihan partisi (lihat partitions.py); setiap nama tabel dipangkas
+# terpisah sehingga banyaknya partisi & pilihan tidak menggeser file tabel dasar.
+import hashlib
+import os
+
+import pyarrow as pa
+
+from constants import TIME_OF_DAY_SEGMENTS
+from data_store import SCRIPT_DIR
+
+SHARED_DIR = os.path.join(SCRIPT_DIR, 'shared')
+SHARED_SUFFIX = '.arrow'
+MAX_SHARED_FILES = 32 # per nama tabel
+
+
+def shared_key(version):
+    # Kolom time_of_day ikut tersimpan, jadi konfigurasi segmen menjadi bagian dari kunci file
+    raw = f'{version}|{TIME_OF_DAY_SEGMENTS}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def shared_table_path(name, version, directory=SHARED_DIR):
+    return os.path.join(directory, f'{name}_{shared_key(version)}{SHARED_SUFFIX}')
+
+
+def write_shared_table(df, path):
+    # Ditulis ke file sementara lalu di-rename (atomik), sehingga proses lain tidak pernah memetakan
+    # file setengah jadi; proses yang menulis kunci yang sama menghasilkan isi yang identik
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def map_shared_table(path):
+    # split_blocks mencegah pandas menggabungkan kolom menjadi blok baru, sehingga setiap kolom
+    # (numerik, datetime, kode kategori) tetap berupa view read-only ke memory map
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def prune_shared_files(name, directory=SHARED_DIR, keep=MAX_SHARED_FILES):
+    # Menghapus versi lama tabel `name` (yang paling lama tidak dipakai). Proses yang masih memetakannya
+    # tidak terganggu di POSIX; jika OS menolak menghapus file yang sedang dipetakan, file dilewati saja.
+    # Kunci file berupa hex tanpa '_', jadi awalan '<name>_' tidak cocok dengan nama tabel lain.
+    entries = [
+        e for e in os.scandir(directory)
+        if e.name.startswith(f'{name}_') and e.name.endswith(SHARED_SUFFIX) and '_' not in e.name[len(name) + 1:]
+    ]
+    entries.sort(key=lambda e: e.stat().st_mtime_ns, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def share_table(name, version, load, directory=SHARED_DIR, keep=MAX_SHARED_FILES):
+    # Mengembalikan tabel `name` versi `version` yang dipetakan dari file bersama. `load` (tanpa
+    # argumen) hanya dipanggil jika belum ada proses lain yang menulis versi ini. Jika direktori
+    # tidak bisa ditulis, tabel privat di memori dipakai seperti sebelumnya.
+    path = shared_table_path(name, version, directory)
+    if os.path.exists(path):
+        try:
+            os.utime(path) # Menandai versi ini masih dipakai (untuk prune_shared_files)
+            return map_shared_table(path)
+        except OSError:
+            pass
+    df = load()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        write_shared_table(df, path)
+        prune_shared_files(name, directory, keep)
+        return map_shared_table(path)
+    except OSError:
+        return df
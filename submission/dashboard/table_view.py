@@ -0,0 +1,147 @@
+# Tabel data terfilter dengan paginasi di sisi server.
+# Tabel dasar tidak pernah disalin: filter sidebar, pencarian, dan pengurutan hanya menghasilkan array
+# posisi baris di atas tabel (bersama) tersebut, lalu hanya satu halaman yang diambil dan diproyeksikan
+# ke kolom yang ditampilkan sebelum dikirim ke browser.
+# Ekspor penuh ditulis per chunk ke file sementara (CSV atau Parquet) di exports/ dan diunduh sebagai
+# file, bukan disisipkan ke halaman. File ekspor lama (mis. dari sesi yang sudah ditinggalkan) dihapus
+# berdasarkan umur dan jumlah setiap kali ekspor baru dibuat.
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_store import SCRIPT_DIR
+
+HOUR_TABLE_COLUMNS = ['dteday', 'season_name', 'year', 'month_name', 'hr', 'weekday_name', 'weather_condition', 'temp_actual', 'hum_actual', 'casual', 'registered']
+DAY_TABLE_COLUMNS = ['dteday', 'season_name', 'year', 'month_name', 'weekday_name', 'weather_condition', 'temp_actual', 'hum_actual', 'casual', 'registered']
+DISPLAY_COLUMN = 'cnt_display'
+PAGE_SIZES = [25, 50, 100, 250]
+EXPORT_FORMATS = ['csv', 'parquet']
+EXPORT_CHUNKSIZE = 100_000
+EXPORT_DIR = os.path.join(SCRIPT_DIR, 'exports')
+EXPORT_PREFIX = 'bike_sharing_'
+MAX_EXPORT_FILES = 16
+MAX_EXPORT_AGE = 3600 # detik
+
+
+# --- Pencarian & pengurutan (menghasilkan posisi baris) ---
+def _matching_values(values, query):
+    # Nilai unik (kategori/tanggal) dicocokkan sekali, bukan per baris
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    if pd.api.types.is_datetime64_any_dtype(uniques):
+        labels = pd.Index(uniques).strftime('%Y-%m-%d')
+    else:
+        labels = pd.Index(uniques).astype(str)
+    matched = np.flatnonzero(labels.str.contains(query, case=False, regex=False))
+    return np.isin(codes, matched)
+
+
+def search_positions(df, query, columns, positions=None):
+    # Teks dicocokkan (substring, tanpa beda huruf besar/kecil) ke kolom kategori/teks dan tanggal;
+    # jika query berupa angka, juga dicocokkan persis ke kolom integer (mis. jam atau jumlah penyewaan).
+    # `positions` (mis. hasil filter sidebar) membatasi pencarian; hasilnya tetap posisi di `df`.
+    positions = np.arange(len(df)) if positions is None else positions
+    query = (query or '').strip()
+    if not query:
+        return positions
+    mask = np.zeros(len(positions), dtype=bool)
+    for col in columns:
+        values = df[col].take(positions) # Hanya satu kolom baris terpilih, sementara
+        if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            mask |= _matching_values(values, query)
+        elif pd.api.types.is_integer_dtype(values) and query.lstrip('-').isdigit():
+            mask |= values.to_numpy() == int(query)
+    return positions[mask]
+
+
+def sort_positions(df, positions, sort_column=None, ascending=True):
+    if sort_column is None:
+        return positions
+    values = df[sort_column]
+    # Kolom kategori diurutkan menurut urutan kategorinya (mis. Januari..Desember), bukan alfabet
+    keys = values.cat.codes.to_numpy() if isinstance(values.dtype, pd.CategoricalDtype) else values.to_numpy()
+    keys = keys[positions]
+    if ascending:
+        order = np.argsort(keys, kind='stable')
+    else:
+        # argsort stabil pada array terbalik lalu dibalik lagi: urutan menurun, tetapi baris dengan
+        # nilai sama tetap pada urutan aslinya
+        order = len(keys) - 1 - np.argsort(keys[::-1], kind='stable')[::-1]
+    return positions[order]
+
+
+# --- Halaman & proyeksi kolom ---
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def project_rows(df, positions, columns, count_column):
+    # Hanya baris pada `positions` dan kolom yang ditampilkan yang diambil dari tabel
+    rows = df.take(positions)
+    return rows[columns].assign(**{DISPLAY_COLUMN: rows[count_column]}).reset_index(drop=True)
+
+
+def page_rows(df, positions, columns, count_column, page, page_size):
+    start = (page - 1) * page_size
+    return project_rows(df, positions[start:start + page_size], columns, count_column)
+
+
+# --- Ekspor ---
+def prune_export_files(directory=EXPORT_DIR, keep=MAX_EXPORT_FILES, max_age=MAX_EXPORT_AGE):
+    # Menghapus ekspor yang lebih tua dari `max_age` detik atau di luar `keep` file terbaru
+    # File yang sudah dihapus sesi/proses lain di tengah jalan dilewati saja
+    entries = []
+    for entry in os.scandir(directory):
+        try:
+            if entry.name.startswith(EXPORT_PREFIX):
+                entries.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            pass
+    entries.sort(reverse=True)
+    now = time.time()
+    for i, (mtime, path) in enumerate(entries):
+        if i >= keep or now - mtime > max_age:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def export_table(df, positions, columns, count_column, export_format='csv', chunksize=EXPORT_CHUNKSIZE, directory=EXPORT_DIR):
+    # Menulis baris terpilih per chunk ke file sementara; memori puncak sebanding dengan satu chunk
+    os.makedirs(directory, exist_ok=True)
+    prune_export_files(directory)
+    fd, path = tempfile.mkstemp(suffix=f'.{export_format}', prefix=EXPORT_PREFIX, dir=directory)
+    os.close(fd)
+    writer = None
+    try:
+        try:
+            for start in range(0, max(len(positions), 1), chunksize):
+                chunk = project_rows(df, positions[start:start + chunksize], columns, count_column)
+                if export_format == 'csv':
+                    chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False, date_format='%Y-%m-%d')
+                else:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(path, table.schema)
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    except Exception:
+        os.remove(path) # File setengah jadi tidak boleh ditawarkan untuk diunduh
+        raise
+    return path
+
+
+def read_export(path):
+    # Data tertunda st.download_button: dibaca hanya saat tombol unduh diklik, di luar rerun skrip
+    with open(path, 'rb') as f:
+        return f.read()
@@ -0,0 +1,42 @@
+# Segmentasi waktu harian (Pagi/Siang/Sore/Malam) yang tervektorisasi.
+# Batas segmen dikonfigurasi di constants.TIME_OF_DAY_SEGMENTS sebagai (label, jam_mulai, jam_selesai)
+# inklusif; segmen boleh melewati tengah malam (mis. 21-04). Setiap konfigurasi diubah menjadi
+# tabel lookup 24 entri, sehingga penugasan segmen cukup satu operasi indexing NumPy per kolom
+# tanpa pemanggilan fungsi Python per baris.
+import numpy as np
+import pandas as pd
+
+from constants import TIME_OF_DAY_SEGMENTS
+
+HOURS_PER_DAY = 24
+
+
+def segment_labels(segments=TIME_OF_DAY_SEGMENTS):
+    return [label for label, _, _ in segments]
+
+
+def build_hour_lookup(segments=TIME_OF_DAY_SEGMENTS):
+    # lookup[jam] = indeks segmen; setiap jam harus masuk tepat satu segmen
+    lookup = np.full(HOURS_PER_DAY, -1, dtype=np.int8)
+    for code, (label, start_hr, end_hr) in enumerate(segments):
+        if not (0 <= start_hr < HOURS_PER_DAY and 0 <= end_hr < HOURS_PER_DAY):
+            raise ValueError(f"Jam segmen '{label}' harus di antara 0 dan 23.")
+        hours = np.arange(start_hr, end_hr + 1) if start_hr <= end_hr else np.r_[start_hr:HOURS_PER_DAY, 0:end_hr + 1]
+        if (lookup[hours] != -1).any():
+            raise ValueError(f"Segmen '{label}' tumpang tindih dengan segmen lain.")
+        lookup[hours] = code
+    if (lookup == -1).any():
+        missing = np.flatnonzero(lookup == -1).tolist()
+        raise ValueError(f"Jam {missing} tidak masuk ke segmen mana pun.")
+    return lookup
+
+
+def assign_time_of_day(hr_values, segments=TIME_OF_DAY_SEGMENTS):
+    codes = build_hour_lookup(segments)[np.asarray(hr_values, dtype=np.intp)]
+    return pd.Categorical.from_codes(codes, categories=segment_labels(segments))
+
+
+def add_time_of_day(df, segments=TIME_OF_DAY_SEGMENTS, column='time_of_day'):
+    # Menambahkan kolom segmen (kategori) langsung ke tabel saat data dimuat
+    df[column] = assign_time_of_day(df['hr'].to_numpy(), segments)
+    return df
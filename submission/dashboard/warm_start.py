@@ -0,0 +1,137 @@
+# Snapshot warm-start untuk cold start worker baru.
+# Dibangun sekali saat build/deploy: dataset dimuat sehingga tabel per jam, harian, dan cube tersimpan
+# sebagai file Arrow bersama yang sudah diparse (lihat shared_tables.py), lalu dashboard dijalankan
+# tanpa browser (Streamlit AppTest) untuk setiap tampilan dengan filter default, sekali per backend chart.
+# Agregasi, PNG, dan JSON Plotly untuk filter default yang dihasilkan disimpan ke warm_start/<versi data>.pkl.
+# Worker baru memetakan tabel tersebut dan mengisi cache agregasi & figure dari file ini, sehingga tampilan
+# default langsung dirender tanpa parsing CSV, agregasi, plotly.express, maupun import Matplotlib/Seaborn.
+#
+# Build step (dari direktori `submission`, setelah data/data store siap dan di lokasi deploy, karena
+# versi data memakai mtime file):
+#     python dashboard/warm_start.py
+import argparse
+import os
+import pickle
+import time
+from datetime import datetime
+
+from chart_backend import CHART_BACKEND_ENV, CHART_BACKENDS
+from data_store import SCRIPT_DIR
+from figure_cache import filter_hash
+
+WARM_START_DIR = os.path.join(SCRIPT_DIR, 'warm_start')
+WARM_START_BUILD_ENV = 'DASHBOARD_WARM_START_BUILD'
+DASHBOARD_PATH = os.path.join(SCRIPT_DIR, 'dashboard.py')
+MAX_WARM_START_FILES = 4
+BUILD_TIMEOUT = 600 # detik per rerun AppTest
+
+
+def warm_start_path(version, directory=WARM_START_DIR):
+    return os.path.join(directory, f'{version}.pkl')
+
+
+def is_building():
+    return bool(os.environ.get(WARM_START_BUILD_ENV))
+
+
+def default_entries(filter_key, aggregation_cache, figure_cache):
+    # Entri cache milik filter default: kunci agregasi (nama, kunci filter, *argumen) dan kunci figure
+    # (id chart, hash kunci filter, format). Posisi tabel & chart prakiraan punya kunci lain dan tidak ikut.
+    figure_hash = filter_hash(filter_key)
+    return {
+        'aggregates': [(key, value) for key, value in aggregation_cache.items() if len(key) > 1 and key[1] == filter_key],
+        'figures': [(key, value) for key, value in figure_cache.items() if key[1] == figure_hash],
+    }
+
+
+def save_entries(version, filter_key, aggregation_cache, figure_cache, directory=WARM_START_DIR):
+    # Dipanggil dashboard di akhir setiap rerun selama build; cache terus bertambah antar tampilan,
+    # jadi file terakhir berisi entri semua tampilan yang sudah dibuka
+    entries = dict(default_entries(filter_key, aggregation_cache, figure_cache), version=version, created_at=datetime.now())
+    os.makedirs(directory, exist_ok=True)
+    path = warm_start_path(version, directory)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_entries(version, directory=WARM_START_DIR):
+    # File dibuat oleh build step di server sendiri (bukan input pengguna), jadi aman di-unpickle
+    try:
+        with open(warm_start_path(version, directory), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def seed_caches(version, aggregation_cache, figure_cache, directory=WARM_START_DIR):
+    # Mengisi cache dari snapshot versi data ini (tanpa mengubah statistik hit/miss); 0 jika tidak ada
+    entries = load_entries(version, directory)
+    if entries is None:
+        return 0
+    for key, value in entries['aggregates']:
+        aggregation_cache.put(key, value)
+    for key, value in entries['figures']:
+        figure_cache.put(key, value)
+    return len(entries['aggregates']) + len(entries['figures'])
+
+
+def prune_warm_start_files(directory=WARM_START_DIR, keep=MAX_WARM_START_FILES):
+    entries = sorted(
+        (e for e in os.scandir(directory) if e.name.endswith('.pkl')), key=lambda e: e.stat().st_mtime_ns, reverse=True
+    )
+    for entry in entries[keep:]:
+        os.remove(entry.path)
+
+
+def run_view(app, backend, view):
+    # Diperiksa setelah setiap rerun: exception di satu tampilan tidak terlihat lagi setelah tampilan berikutnya
+    if app.exception:
+        raise RuntimeError(f"Dashboard gagal dijalankan saat build warm-start ({backend}, tampilan {view}): {app.exception[0].value}")
+
+
+def build(directory=WARM_START_DIR):
+    from streamlit.testing.v1 import AppTest
+
+    from data_version import LiveDataset
+    from partitions import PartitionedDataset, has_partitions
+
+    # Memuat dataset menulis tabel per jam, harian, dan cube ke file Arrow bersama. Versi harus sama dengan
+    # snapshot yang dipakai dashboard untuk filter default: dengan partisi, semua kota & tahun di seluruh
+    # rentang tanggal; tanpa partisi, *_clean.csv.
+    if has_partitions():
+        dataset = PartitionedDataset()
+        snapshot = dataset.snapshot(dataset.cities, dataset.years, *dataset.date_bounds())
+    else:
+        snapshot = LiveDataset().snapshot
+    # Cache dashboard (st.cache_resource) bertahan antar AppTest dalam satu proses, jadi menjalankan semua
+    # tampilan di tiap backend mengumpulkan PNG dan JSON Plotly di snapshot yang sama
+    os.environ[WARM_START_BUILD_ENV] = '1'
+    for backend in CHART_BACKENDS:
+        os.environ[CHART_BACKEND_ENV] = backend
+        app = AppTest.from_file(DASHBOARD_PATH, default_timeout=BUILD_TIMEOUT)
+        run_view(app.run(), backend, 'awal')
+        for view in app.radio(key="active_view").options[1:]:
+            run_view(app.radio(key="active_view").set_value(view).run(), backend, view)
+    prune_warm_start_files(directory)
+    return snapshot.version, load_entries(snapshot.version, directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun snapshot warm-start (tabel, agregasi & figure filter default).")
+    parser.parse_args()
+    start = time.perf_counter()
+    version, entries = build()
+    if entries is None:
+        raise SystemExit("Snapshot warm-start tidak tertulis.")
+    formats = [key[-1] for key, _ in entries['figures']]
+    print(
+        f"Warm-start versi {version}: {len(entries['aggregates'])} agregasi, {formats.count('png')} PNG, "
+        f"{formats.count('json')} figure Plotly "
+        f"dalam {time.perf_counter() - start:.1f} detik -> {warm_start_path(version)}"
+    )
+
+
+if __name__ == '__main__':
+    main()